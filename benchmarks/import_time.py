@@ -0,0 +1,154 @@
+"""
+Import time of ragaai_catalyst and of the entry points built on it.
+
+Every scenario runs one import statement in a fresh interpreter, `--repeat`
+times, and records the median wall time and which of the heavy third-party
+frameworks the statement loaded. The package, the distributed decorators
+used by tracing-only workers and the Tracer should load none of them; the
+frameworks are imported when a feature or tracer type that needs them is used.
+
+Reported per scenario:
+    ms          median wall time of the statement
+    frameworks  heavy frameworks in sys.modules afterwards
+
+Usage:
+    python benchmarks/import_time.py                  # run everything
+    python benchmarks/import_time.py -k tracer        # scenarios matching all filters
+    python benchmarks/import_time.py --output benchmarks/baselines/import_time.json
+    python benchmarks/import_time.py --compare benchmarks/baselines/import_time.json
+
+With --compare, the exit status is 1 when a scenario is slower than the
+baseline by more than --tolerance, or loads a framework the baseline did not.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+FRAMEWORKS = (
+    "litellm",
+    "openai",
+    "langchain_core",
+    "llama_index.core",
+    "google.genai",
+    "groq",
+    "pandas",
+    "numpy",
+    "IPython",
+)
+
+SCENARIOS = {
+    "package": "import ragaai_catalyst",
+    "client": "from ragaai_catalyst import RagaAICatalyst",
+    "distributed_decorators": "from ragaai_catalyst import init_tracing, trace_tool, trace_llm",
+    "tracer": "from ragaai_catalyst import Tracer",
+    "tracer/langchain": "from ragaai_catalyst.tracers.langchain_callback import LangchainTracer",
+    "tracer/llamaindex": "from ragaai_catalyst.tracers.llamaindex_instrumentation import LlamaIndexInstrumentationTracer",
+    "dataset": "from ragaai_catalyst import Dataset",
+    "synthetic_data_generation": "from ragaai_catalyst import SyntheticDataGeneration",
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "frameworks": [m for m in {frameworks!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, repeat):
+    # Benchmarks must not depend on the network
+    env = dict(os.environ, LITELLM_LOCAL_MODEL_COST_MAP="True")
+    code = PROBE.format(statement=statement, frameworks=FRAMEWORKS)
+    timings = []
+    frameworks = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-c", code], env=env,
+                                   capture_output=True, text=True, check=True)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        frameworks = result["frameworks"]
+    return {"ms": round(statistics.median(timings), 1), "frameworks": frameworks}
+
+
+def run(filters, repeat):
+    results = {}
+    for name, statement in SCENARIOS.items():
+        if not all(f in name for f in filters):
+            continue
+        # Once untimed, so that every timed run finds the bytecode cache written
+        measure(statement, 1)
+        results[name] = measure(statement, repeat)
+        print(format_row(name, results[name]), file=sys.stderr)
+    return results
+
+
+def format_row(name, result, baseline=None):
+    row = f"{name:<28} {result['ms']:>9,.1f} ms  {', '.join(result['frameworks']) or '-'}"
+    if baseline is not None:
+        row += f"  x{result['ms'] / max(baseline['ms'], 0.1):.2f} vs baseline"
+    return row
+
+
+def compare(results, baseline_results, tolerance):
+    """Print scenarios against the baseline; returns the names that regressed"""
+    regressions = []
+    for name, result in results.items():
+        baseline = baseline_results.get(name)
+        if baseline is None:
+            continue
+        print(format_row(name, result, baseline))
+        new_frameworks = set(result["frameworks"]) - set(baseline["frameworks"])
+        if new_frameworks:
+            print(f"  now loads {', '.join(sorted(new_frameworks))}")
+        if result["ms"] > baseline["ms"] * tolerance or new_frameworks:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="filters", action="append", default=[],
+                        help="only run scenarios whose name contains this; repeatable")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="slowdown factor against the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.filters, args.repeat)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "date": datetime.now().astimezone().isoformat(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed against the baseline:")
+            for name in regressions:
+                print(f"  {name}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+Instrumentation overhead of the tracer decorators and LLM patches.
+
+Every scenario decorates a no-op or a realistic function, sync or async, and
+calls it `--calls` times on a fresh tracer after `--warmup` calls, with a new
+tracer for each of `--repeats` repeats. Scenarios cover the
+ToolTracerMixin/AgentTracerMixin/LLMTracerMixin/CustomTracerMixin decorators,
+the decorators in ragaai_catalyst.tracers.distributed and the auto
+instrumented OpenAI/LiteLLM patches (driven by a fake client that never
+touches the network), each with the network, file_io and user_interaction
+instrumentation off, one at a time, and all on. An undecorated run of the
+same function, or of the unpatched fake client, is the reference.
+
+Reported per scenario:
+    ns_per_call          wall time per call, in the fastest repeat
+    median_ns_per_call   wall time per call, in the median repeat
+    overhead_ns_per_call ns_per_call minus that of the undecorated function
+    relative_overhead    overhead_ns_per_call divided by the ns_per_call of the
+                         undecorated realistic function, sync or async
+    blocks_per_call      memory blocks still allocated afterwards, per call
+    peak_kib_per_10k     peak traced memory, scaled to 10,000 spans
+
+Usage:
+    python benchmarks/tracer_overhead.py                  # run everything
+    python benchmarks/tracer_overhead.py -k tool -k async # scenarios matching all filters
+    python benchmarks/tracer_overhead.py --output benchmarks/baselines/tracer_overhead.json
+    python benchmarks/tracer_overhead.py --compare benchmarks/baselines/tracer_overhead.json
+
+With --compare, the exit status is 1 when the relative overhead of a scenario
+is higher than in the baseline by more than --tolerance. Comparing overhead
+relative to the undecorated realistic function of the same run, rather than
+absolute times, keeps the comparison meaningful on a faster or slower machine.
+The no-op function and the fake client are too cheap to time steadily enough
+to be that unit.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime
+from unittest.mock import patch
+
+# Benchmarks must not depend on the network
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from openai.types.chat import ChatCompletion
+
+from ragaai_catalyst.tracers import distributed
+from ragaai_catalyst.tracers.agentic_tracing import AgenticTracing
+
+DECORATORS = ("tool", "agent", "llm", "custom")
+TOGGLES = {
+    "off": (),
+    "network": ("network",),
+    "file_io": ("file_io",),
+    "user_interaction": ("user_interaction",),
+    "all": ("network", "file_io", "user_interaction"),
+}
+SPANS_FOR_PEAK = 10_000
+
+COMPLETION = {
+    "id": "chatcmpl-benchmark",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": "The answer is 42."},
+    }],
+    "usage": {"prompt_tokens": 12, "completion_tokens": 6, "total_tokens": 18},
+}
+MESSAGES = [{"role": "user", "content": "What is the answer?"}]
+
+
+class FakeCompletions:
+    """Stands in for openai's chat Completions resource"""
+
+    def create(self, model, messages, **kwargs):
+        return ChatCompletion.model_validate(COMPLETION)
+
+
+class FakeAsyncCompletions:
+    async def create(self, model, messages, **kwargs):
+        return ChatCompletion.model_validate(COMPLETION)
+
+
+def fake_litellm_module():
+    module = types.ModuleType("fake_litellm")
+
+    def completion(model, messages, **kwargs):
+        return ChatCompletion.model_validate(COMPLETION)
+
+    async def acompletion(model, messages, **kwargs):
+        return ChatCompletion.model_validate(COMPLETION)
+
+    module.completion = completion
+    module.acompletion = acompletion
+    return module
+
+
+def make_workloads(scratch_file):
+    """No-op and realistic function bodies, sync and async"""
+
+    def noop(query):
+        return query
+
+    def realistic(query):
+        # Prompt building, a local file read and a print, like a typical tool
+        prompt = json.dumps({"query": query, "history": [query] * 8})
+        with open(scratch_file) as f:
+            context = f.read()
+        print(f"retrieved {len(context)} characters")
+        return json.loads(prompt)["history"][:2] + [context[:16]]
+
+    async def anoop(query):
+        return query
+
+    async def arealistic(query):
+        return realistic(query)
+
+    def llm_call(query):
+        return FakeCompletions().create(model="gpt-4o-mini", messages=MESSAGES)
+
+    async def allm_call(query):
+        return await FakeAsyncCompletions().create(model="gpt-4o-mini", messages=MESSAGES)
+
+    return {
+        ("noop", "sync"): noop,
+        ("realistic", "sync"): realistic,
+        ("llm_client", "sync"): llm_call,
+        ("noop", "async"): anoop,
+        ("realistic", "async"): arealistic,
+        ("llm_client", "async"): allm_call,
+    }
+
+
+def make_tracer(toggles, llm=False):
+    user_detail = {
+        "project_name": "benchmark",
+        "project_id": "benchmark",
+        "dataset_name": "benchmark",
+        "trace_name": "benchmark",
+        "interval_time": 1,
+        "trace_user_detail": {},
+    }
+    auto_instrumentation = {
+        "llm": llm,
+        "tool": True,
+        "agent": True,
+        "custom": True,
+        "network": "network" in toggles,
+        "file_io": "file_io" in toggles,
+        "user_interaction": "user_interaction" in toggles,
+    }
+    tracer = AgenticTracing(user_detail, auto_instrumentation=auto_instrumentation)
+    # Set by Tracer, which builds on AgenticTracing
+    tracer.model_custom_cost = {}
+    return tracer
+
+
+def decorate(tracer, api, decorator, func):
+    if api == "mixin":
+        return {
+            "tool": lambda: tracer.trace_tool("bench_tool"),
+            "agent": lambda: tracer.trace_agent("bench_agent"),
+            "llm": lambda: tracer.trace_llm("bench_llm"),
+            "custom": lambda: tracer.trace_custom("bench_custom", trace_variables=False),
+        }[decorator]()(func)
+    return {
+        "tool": lambda: distributed.trace_tool("bench_tool"),
+        "agent": lambda: distributed.trace_agent("bench_agent"),
+        "llm": lambda: distributed.trace_llm("bench_llm"),
+        "custom": lambda: distributed.trace_custom("bench_custom"),
+    }[decorator]()(func)
+
+
+def llm_client(tracer, client, mode):
+    """The call an application makes on an auto-instrumented client"""
+    if client == "openai":
+        completions_class = FakeAsyncCompletions if mode == "async" else FakeCompletions
+        # The same registry patch wrap_openai_client_methods installs on openai's class
+        tracer.wrap_method(completions_class, "create", is_async=mode == "async")
+        create = completions_class().create
+    else:
+        module = fake_litellm_module()
+        tracer.patch_litellm_methods(module)
+        create = module.acompletion if mode == "async" else module.completion
+    return lambda query: create(model="gpt-4o-mini", messages=MESSAGES)
+
+
+class Scenario:
+    __slots__ = ("name", "kind", "api", "target", "workload", "mode", "toggle")
+
+    def __init__(self, kind, api, target, workload, mode, toggle):
+        self.kind = kind
+        self.api = api
+        self.target = target
+        self.workload = workload
+        self.mode = mode
+        self.toggle = toggle
+        self.name = "/".join(part for part in (kind, api, target, workload, mode, toggle) if part)
+
+    @property
+    def reference(self):
+        return "/".join(("undecorated", self.workload, self.mode))
+
+    @property
+    def unit(self):
+        """The scenario whose time relative_overhead is expressed in"""
+        return "/".join(("undecorated", "realistic", self.mode))
+
+
+def scenarios():
+    for workload in ("noop", "realistic"):
+        for mode in ("sync", "async"):
+            yield Scenario("undecorated", "", "", workload, mode, "")
+            for api in ("mixin", "distributed"):
+                for decorator in DECORATORS:
+                    for toggle in TOGGLES:
+                        yield Scenario("decorator", api, decorator, workload, mode, toggle)
+    for mode in ("sync", "async"):
+        yield Scenario("undecorated", "", "", "llm_client", mode, "")
+        for client in ("openai", "litellm"):
+            for toggle in TOGGLES:
+                yield Scenario("patched_llm", "", client, "llm_client", mode, toggle)
+
+
+@contextlib.contextmanager
+def running_tracer(scenario):
+    """A started tracer for `scenario` that is stopped without uploading"""
+    if scenario.kind == "undecorated":
+        yield None
+        return
+    tracer = make_tracer(TOGGLES[scenario.toggle], llm=scenario.kind == "patched_llm")
+    base = "ragaai_catalyst.tracers.agentic_tracing.tracers.base"
+    with patch(f"{base}.submit_upload_task", return_value="benchmark"), \
+            patch(f"{base}.zip_list_of_unique_files", return_value=("benchmark", "benchmark.zip")), \
+            patch.object(distributed, "_global_tracer", tracer):
+        tracer.start()
+        try:
+            yield tracer
+        finally:
+            tracer.stop()
+
+
+def build_call(scenario, tracer, workloads):
+    if scenario.kind == "patched_llm":
+        return llm_client(tracer, scenario.target, scenario.mode)
+    func = workloads[(scenario.workload, scenario.mode)]
+    if scenario.kind == "undecorated":
+        return func
+    return decorate(tracer, scenario.api, scenario.target, func)
+
+
+def call_many(call, mode, calls):
+    if mode == "async":
+        async def run():
+            for i in range(calls):
+                await call("query")
+        asyncio.run(run())
+    else:
+        for i in range(calls):
+            call("query")
+
+
+def measure(scenario, workloads, calls, warmup, repeats):
+    """
+    Time `repeats` runs of `calls` calls, each on a new tracer after `warmup`
+    calls, then trace memory over another `calls` calls
+    """
+    elapsed = []
+    blocks = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        # A new tracer per repeat, since the cost of a call grows with the spans
+        # the tracer already holds
+        for _ in range(repeats):
+            with running_tracer(scenario) as tracer:
+                call = build_call(scenario, tracer, workloads)
+                call_many(call, scenario.mode, warmup)
+                gc.collect()
+                allocated = sys.getallocatedblocks()
+                # Like timeit, without collections whose cost depends on what ran before
+                gc.disable()
+                try:
+                    started = time.perf_counter_ns()
+                    call_many(call, scenario.mode, calls)
+                    elapsed.append(time.perf_counter_ns() - started)
+                finally:
+                    gc.enable()
+                gc.collect()
+                blocks += sys.getallocatedblocks() - allocated
+
+        with running_tracer(scenario) as tracer:
+            call = build_call(scenario, tracer, workloads)
+            call_many(call, scenario.mode, warmup)
+            tracemalloc.start()
+            try:
+                baseline, _ = tracemalloc.get_traced_memory()
+                call_many(call, scenario.mode, calls)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+    # The fastest repeat is the one least disturbed by other work on the machine
+    elapsed.sort()
+    return {
+        "ns_per_call": round(elapsed[0] / calls),
+        "median_ns_per_call": round(elapsed[len(elapsed) // 2] / calls),
+        "blocks_per_call": round(blocks / (calls * repeats), 2),
+        "peak_kib_per_10k": round((peak - baseline) * SPANS_FOR_PEAK / calls / 1024, 1),
+    }
+
+
+def run(filters, calls, warmup, repeats):
+    results = {}
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as scratch:
+        scratch.write("retrieved context " * 64)
+    try:
+        workloads = make_workloads(scratch.name)
+        # Keep the heap of the imported libraries out of every collection
+        gc.collect()
+        gc.freeze()
+        # Undecorated scenarios first, as every other one is measured against them
+        for scenario in sorted(scenarios(), key=lambda s: s.kind != "undecorated"):
+            if not all(f in scenario.name for f in filters) and scenario.kind != "undecorated":
+                continue
+            result = measure(scenario, workloads, calls, warmup, repeats)
+            reference = results.get(scenario.reference)
+            if reference is not None:
+                result["overhead_ns_per_call"] = result["ns_per_call"] - reference["ns_per_call"]
+                result["relative_overhead"] = round(
+                    result["overhead_ns_per_call"] / results[scenario.unit]["ns_per_call"], 2
+                )
+            results[scenario.name] = result
+            print(format_row(scenario.name, result), file=sys.stderr)
+    finally:
+        os.unlink(scratch.name)
+    return results
+
+
+def format_row(name, result, baseline=None):
+    row = (f"{name:<58} {result['ns_per_call']:>11,} ns/call "
+           f"{result['blocks_per_call']:>8} blocks/call "
+           f"{result['peak_kib_per_10k']:>10,} KiB/10k spans")
+    if baseline is not None:
+        ratio = result["relative_overhead"] / max(baseline["relative_overhead"], 0.01)
+        row += f"  overhead x{ratio:.2f} vs baseline"
+    return row
+
+
+def compare(results, baseline_results, tolerance):
+    """
+    Print the decorated scenarios against the baseline; returns the names whose
+    overhead, relative to the undecorated realistic function, regressed
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baseline_results.get(name)
+        if baseline is None or "relative_overhead" not in result or "relative_overhead" not in baseline:
+            continue
+        print(format_row(name, result, baseline))
+        if result["relative_overhead"] > baseline["relative_overhead"] * tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="filters", action="append", default=[],
+                        help="only run scenarios whose name contains this; repeatable")
+    parser.add_argument("--calls", type=int, default=1000, help="calls per timed repeat")
+    parser.add_argument("--repeats", type=int, default=7, help="timed repeats per scenario")
+    parser.add_argument("--warmup", type=int, default=500, help="calls before measuring")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="slowdown factor against the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+    # Tracer start/stop log at INFO, which would interleave with the report
+    logging.disable(logging.INFO)
+
+    results = run(args.filters, args.calls, args.warmup, args.repeats)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calls": args.calls,
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "date": datetime.now().astimezone().isoformat(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) slower than {args.tolerance}x the baseline:")
+            for name in regressions:
+                print(f"  {name}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,42 @@
-from .experiment import Experiment
-from .ragaai_catalyst import RagaAICatalyst
-from .utils import response_checker
-from .dataset import Dataset
-from .prompt_manager import PromptManager
-from .evaluation import Evaluation
-from .synthetic_data_generation import SyntheticDataGeneration
-from .redteaming import RedTeaming
-from .guardrails_manager import GuardrailsManager
-from .guard_executor import GuardExecutor
-from .tracers import Tracer, init_tracing, trace_agent, trace_llm, trace_tool, current_span, trace_custom
-from .redteaming import RedTeaming
+import importlib
 
+# Public names and the submodules that define them. They are imported on first
+# access, so that `import ragaai_catalyst` does not pull in pandas, litellm,
+# google-genai or the tracing frameworks for code that never uses them.
+_LAZY_ATTRIBUTES = {
+    "Experiment": ".experiment",
+    "RagaAICatalyst": ".ragaai_catalyst",
+    "response_checker": ".utils",
+    "Dataset": ".dataset",
+    "PromptManager": ".prompt_manager",
+    "Evaluation": ".evaluation",
+    "SyntheticDataGeneration": ".synthetic_data_generation",
+    "RedTeaming": ".redteaming",
+    "GuardrailsManager": ".guardrails_manager",
+    "GuardExecutor": ".guard_executor",
+    "Tracer": ".tracers",
+    "init_tracing": ".tracers",
+    "trace_agent": ".tracers",
+    "trace_llm": ".tracers",
+    "trace_tool": ".tracers",
+    "current_span": ".tracers",
+    "trace_context": ".tracers",
+    "trace_custom": ".tracers",
+}
 
 
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
     "Experiment", 
@@ -29,6 +53,6 @@ __all__ = [
     "trace_llm",
     "trace_tool",
     "current_span",
-    "trace_custom"
-    "RedTeaming"
+    "trace_context",
+    "trace_custom",
 ]
@@ -7,6 +7,7 @@ from .utils import response_checker
 from typing import Union
 import logging
 from .ragaai_catalyst import RagaAICatalyst
+from .name_resolver import name_resolver
 import pandas as pd
 logger = logging.getLogger(__name__)
 get_token = RagaAICatalyst.get_token
@@ -25,33 +26,15 @@ class Dataset:
         self.num_projects = 99999
         Dataset.BASE_URL = RagaAICatalyst.BASE_URL
         self.jobId = None
-        headers = {
-            "Authorization": f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}',
-        }
         try:
-            response = requests.get(
-                f"{Dataset.BASE_URL}/v2/llm/projects?size={self.num_projects}",
-                headers=headers,
-                timeout=self.TIMEOUT,
-            )
-            response.raise_for_status()
-            logger.debug("Projects list retrieved successfully")
-            
-            project_list = [
-                project["name"] for project in response.json()["data"]["content"]
-            ]
-
-            if project_name not in project_list:
-                raise ValueError("Project not found. Please enter a valid project name")
-
-            self.project_id = [
-                project["id"] for project in response.json()["data"]["content"] if project["name"] == project_name
-            ][0]
-
+            self.project_id = name_resolver.project_id(project_name, timeout=self.TIMEOUT)
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to retrieve projects list: {e}")
             raise
 
+        if self.project_id is None:
+            raise ValueError("Project not found. Please enter a valid project name")
+
     def list_datasets(self):
         """
         Retrieves a list of datasets for a given project.
@@ -294,20 +277,66 @@ class Dataset:
         # Get existing dataset columns
         existing_columns = self.get_dataset_columns(dataset_name)
 
-        # Read the CSV file to check columns
+        # Read only the header row of the CSV file to check columns
         try:
-            import pandas as pd
-            df = pd.read_csv(csv_path)
-            csv_columns = df.columns.tolist()
+            csv_columns = self._read_csv_header(csv_path)
         except Exception as e:
             logger.error(f"Failed to read CSV file: {e}")
             raise ValueError(f"Unable to read CSV file: {e}")
 
-        # Check column compatibility
-        for column in existing_columns:
-            if column not in csv_columns:
-                df[column] = None  
+        # Check column compatibility; dataset columns missing from the CSV are added empty
+        missing_columns = [column for column in existing_columns if column not in csv_columns]
+        upload_path = csv_path
+        if missing_columns:
+            upload_path = self._add_empty_columns(csv_path, missing_columns)
+
+        try:
+            self._add_rows_from_csv(upload_path, dataset_name)
+        finally:
+            if upload_path != csv_path:
+                try:
+                    os.remove(upload_path)
+                except OSError as e:
+                    logger.error(f"Error removing temporary CSV file: {e}")
+
+    @staticmethod
+    def _read_csv_header(csv_path):
+        """Column names from the first row of a CSV file, without reading the rest"""
+        with open(csv_path, 'r', newline='', encoding='utf-8-sig') as file:
+            header = next(csv.reader(file), None)
+        if not header:
+            raise ValueError("No columns to parse from file")
+        return header
+
+    @staticmethod
+    def _add_empty_columns(csv_path, columns):
+        """
+        Copy a CSV file to a temporary file with empty `columns` appended,
+        one row at a time. Blank lines are skipped and short rows are padded
+        to the header width first. Returns the path of the copy.
+        """
+        fd, tmp_csv_path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with open(csv_path, 'r', newline='', encoding='utf-8-sig') as infile, \
+                    os.fdopen(fd, 'w', newline='', encoding='utf-8') as outfile:
+                reader = csv.reader(infile)
+                writer = csv.writer(outfile)
+                header = next(reader)
+                writer.writerow(header + list(columns))
+                width = len(header)
+                padding = [''] * len(columns)
+                for row in reader:
+                    if not row:
+                        continue
+                    if len(row) < width:
+                        row += [''] * (width - len(row))
+                    writer.writerow(row + padding)
+        except Exception:
+            os.remove(tmp_csv_path)
+            raise
+        return tmp_csv_path
 
+    def _add_rows_from_csv(self, csv_path, dataset_name):
         # Get presigned URL for the CSV
         def get_presignedUrl():
             headers = {
@@ -344,6 +373,7 @@ class Dataset:
                 'x-ms-blob-type': 'BlockBlob',
             }
             try:
+                # Passing the open file streams the body in blocks instead of loading it into memory
                 with open(csv_path, 'rb') as file:
                     response = requests.put(
                         url,
@@ -3,6 +3,7 @@ import requests
 import pandas as pd
 import io
 from .ragaai_catalyst import RagaAICatalyst
+from .name_resolver import name_resolver
 import logging
 import json
 
@@ -24,58 +25,23 @@ class Evaluation:
         self.num_projects=99999
 
         try:
-            response = requests.get(
-                f"{self.base_url}/v2/llm/projects?size={self.num_projects}",
-                headers={
-                    "Authorization": f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}',
-                },
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            logger.debug("Projects list retrieved successfully")
-
-            project_list = [
-                project["name"] for project in response.json()["data"]["content"]
-            ]
-            if project_name not in project_list:
-                raise ValueError("Project not found. Please enter a valid project name")
-            
-            self.project_id = [
-                project["id"] for project in response.json()["data"]["content"] if project["name"] == project_name
-            ][0]
-
+            self.project_id = name_resolver.project_id(project_name, timeout=self.timeout)
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to retrieve projects list: {e}")
             raise
 
-        try:
-
-            headers = {
-                'Content-Type': 'application/json',
-                "Authorization": f"Bearer {os.getenv('RAGAAI_CATALYST_TOKEN')}",
-                "X-Project-Id": str(self.project_id),
-            }
-            json_data = {"size": 12, "page": "0", "projectId": str(self.project_id), "search": ""}
-            response = requests.post(
-                f"{self.base_url}/v2/llm/dataset",
-                headers=headers,
-                json=json_data,
-                timeout=self.timeout,
-            )
-            
-            response.raise_for_status()
-            datasets_content = response.json()["data"]["content"]
-            dataset_list = [dataset["name"] for dataset in datasets_content]
-
-            if dataset_name not in dataset_list:
-                raise ValueError("Dataset not found. Please enter a valid dataset name")
-                
-            self.dataset_id = [dataset["id"] for dataset in datasets_content if dataset["name"]==dataset_name][0]
+        if self.project_id is None:
+            raise ValueError("Project not found. Please enter a valid project name")
 
+        try:
+            self.dataset_id = name_resolver.dataset_id(self.project_id, dataset_name, timeout=self.timeout)
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to retrieve dataset list: {e}")
             raise
 
+        if self.dataset_id is None:
+            raise ValueError("Dataset not found. Please enter a valid dataset name")
+
     
     def list_metrics(self):
         headers = {
@@ -4,6 +4,7 @@ import logging
 import pandas as pd
 from .utils import response_checker
 from .ragaai_catalyst import RagaAICatalyst
+from .name_resolver import name_resolver
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -105,31 +106,7 @@ class Experiment:
 
 
     def _check_if_project_exists(self,project_name,num_projects=100):
-        # TODO: 1. List All projects
-        params = {
-            "size": str(num_projects),
-            "page": "0",
-            "type": "llm",
-        }
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}',
-        }
-        response = requests.get(
-            f"{RagaAICatalyst.BASE_URL}/projects",
-            params=params,
-            headers=headers,
-            timeout=self.TIMEOUT,
-        )
-        response.raise_for_status()
-        logger.debug("Projects list retrieved successfully")
-        project_list = [
-            project["name"] for project in response.json()["data"]["content"]
-        ]
-        
-        # TODO: 2. Check if the given project_name exists
-        # TODO: 3. Return bool (True / False output)
-        exists = project_name in project_list
+        exists = name_resolver.project_id(project_name, timeout=self.TIMEOUT) is not None
         if exists:
             logger.info(f"Project '{project_name}' exists.")
         else:
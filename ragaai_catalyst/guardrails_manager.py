@@ -5,6 +5,7 @@ import logging
 logger = logging.getLogger(__name__)
 from .utils import response_checker
 from .ragaai_catalyst import RagaAICatalyst
+from .name_resolver import name_resolver
 
 
 class GuardrailsManager:
@@ -20,25 +21,9 @@ class GuardrailsManager:
         self.deployment_name = "NA"
         self.deployment_id = "NA"
         self.base_url = f"{RagaAICatalyst.BASE_URL}"
-        list_projects, project_name_with_id = self._get_project_list()
-        if project_name not in list_projects:
+        self.project_id = name_resolver.project_id(project_name, timeout=self.timeout)
+        if self.project_id is None:
             raise ValueError(f"Project '{self.project_name}' does not exists")
-        
-        self.project_id = [_["id"] for _ in project_name_with_id if _["name"]==self.project_name][0]
-
-
-    def _get_project_list(self):
-        """
-        Retrieve the list of projects and their IDs from the API.
-        
-        :return: A tuple containing a list of project names and a list of dictionaries with project IDs and names.
-        """
-        headers = {'Authorization': f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}'}
-        response = requests.request("GET", f"{self.base_url}/v2/llm/projects?size={self.num_projects}", headers=headers, timeout=self.timeout)
-        project_content = response.json()["data"]["content"]
-        list_project = [_["name"] for _ in project_content]
-        project_name_with_id = [{"id": _["id"], "name": _["name"]} for _ in project_content]
-        return list_project, project_name_with_id
 
 
     def list_deployment_ids(self):
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional
+
+import requests
+
+from .ragaai_catalyst import RagaAICatalyst
+
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+DEFAULT_TTL = 300
+NUM_PROJECTS = 99999
+TIMEOUT = 10
+
+
+class NameResolver:
+    """
+    Resolves project and dataset names to ids, shared by every client in the process.
+
+    The project list and each project's dataset list are fetched once and kept
+    for `ttl` seconds. A name that is not in a cached list is looked up again
+    once, so newly created projects and datasets are found right away.
+    Entries are kept per base URL and account (a hash of the access key, or of
+    the token when no access key is set) and, when `cache_path` is set, also in
+    that JSON file, readable by the owner only, so that new processes (serverless cold starts, CLI runs) skip the
+    listing while it is fresh.
+
+    Defaults come from the environment: RAGAAI_CATALYST_RESOLVER_TTL (seconds)
+    and RAGAAI_CATALYST_RESOLVER_CACHE (file path, no disk cache if unset).
+    """
+
+    def __init__(self, ttl: Optional[float] = None, cache_path: Optional[str] = None):
+        if ttl is None:
+            ttl = float(os.getenv("RAGAAI_CATALYST_RESOLVER_TTL", DEFAULT_TTL))
+        self.ttl = ttl
+        self.cache_path = cache_path if cache_path is not None else os.getenv("RAGAAI_CATALYST_RESOLVER_CACHE")
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._disk_loaded = False
+
+    def project_id(self, project_name: str, timeout: float = TIMEOUT):
+        """
+        Id of `project_name`, or None if there is no such project.
+
+        Raises requests.exceptions.RequestException if the project list cannot be fetched.
+        """
+        return self._resolve(("projects",), project_name, lambda: self._fetch_projects(timeout))
+
+    def dataset_id(self, project_id, dataset_name: str, timeout: float = TIMEOUT):
+        """
+        Id of `dataset_name` in the project, or None if there is no such dataset.
+
+        Raises requests.exceptions.RequestException if the dataset list cannot be fetched.
+        """
+        return self._resolve(("datasets", str(project_id)), dataset_name,
+                             lambda: self._fetch_datasets(project_id, timeout))
+
+    def cached_project_id(self, project_name: str):
+        """Id of `project_name` if it was resolved before, however long ago, without any request"""
+        with self._lock:
+            entry = self._entry(("projects",))
+            return entry["ids"].get(project_name) if entry else None
+
+    def invalidate(self, key=None) -> None:
+        """Drop one cached list, ("projects",) or ("datasets", project_id), or everything when `key` is None"""
+        with self._lock:
+            self._load_disk()
+            scope = self._entries.get(self._scope(), {})
+            if key is None:
+                scope.clear()
+            else:
+                scope.pop("/".join(key), None)
+            self._save_disk()
+
+    def _resolve(self, key, name, fetch):
+        with self._lock:
+            entry = self._entry(key)
+            fresh = entry is not None and time.time() - entry["fetched_at"] < self.ttl
+            if fresh and name in entry["ids"]:
+                return entry["ids"][name]
+            if fresh:
+                logger.debug(f"{name} not in cached {key[0]} list, fetching it again")
+            ids = fetch()
+            self._store(key, ids)
+            return ids.get(name)
+
+    def _entry(self, key):
+        self._load_disk()
+        return self._entries.get(self._scope(), {}).get("/".join(key))
+
+    def _store(self, key, ids: Dict[str, str]):
+        self._entries.setdefault(self._scope(), {})["/".join(key)] = {
+            "fetched_at": time.time(),
+            "ids": ids,
+        }
+        self._save_disk()
+
+    @staticmethod
+    def _scope():
+        """Cache scope: the base URL and a hash of the credentials, so accounts never share ids"""
+        credential = os.getenv("RAGAAI_CATALYST_ACCESS_KEY") or os.getenv("RAGAAI_CATALYST_TOKEN") or ""
+        account = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+        return f"{RagaAICatalyst.BASE_URL}#{account}"
+
+    @staticmethod
+    def _headers(**extra):
+        return {"Authorization": f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}', **extra}
+
+    def _fetch_projects(self, timeout):
+        response = requests.get(
+            f"{RagaAICatalyst.BASE_URL}/v2/llm/projects?size={NUM_PROJECTS}",
+            headers=self._headers(),
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        logger.debug("Projects list retrieved successfully")
+        return {project["name"]: project["id"] for project in response.json()["data"]["content"]}
+
+    def _fetch_datasets(self, project_id, timeout):
+        response = requests.post(
+            f"{RagaAICatalyst.BASE_URL}/v2/llm/dataset",
+            headers=self._headers(**{"Content-Type": "application/json", "X-Project-Id": str(project_id)}),
+            json={"size": 12, "page": "0", "projectId": str(project_id), "search": ""},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        logger.debug("Dataset list retrieved successfully")
+        return {dataset["name"]: dataset["id"] for dataset in response.json()["data"]["content"]}
+
+    def _load_disk(self):
+        if self._disk_loaded:
+            return
+        self._disk_loaded = True
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable resolver cache {self.cache_path}: {e}")
+
+    def _save_disk(self):
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            # Written to a temporary file first so concurrent processes never read half a file
+            with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+                os.chmod(f.name, 0o600)
+                json.dump(self._entries, f)
+            os.replace(f.name, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write resolver cache {self.cache_path}: {e}")
+
+
+# Shared by Tracer, Dataset, Evaluation, Experiment, GuardrailsManager and PromptManager
+name_resolver = NameResolver()
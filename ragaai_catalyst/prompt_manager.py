@@ -3,6 +3,7 @@ import requests
 import json
 import re
 from .ragaai_catalyst import RagaAICatalyst
+from .name_resolver import name_resolver
 import copy
 
 class PromptManager:
@@ -26,27 +27,11 @@ class PromptManager:
         self.size = 99999 #Number of projects to fetch
 
         try:
-            response = requests.get(
-                f"{RagaAICatalyst.BASE_URL}/v2/llm/projects?size={self.size}",
-                headers={
-                    "Authorization": f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}',
-                },
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            # logger.debug("Projects list retrieved successfully")
-
-            project_list = [
-                project["name"] for project in response.json()["data"]["content"]
-            ]
-            self.project_id = [
-            project["id"] for project in response.json()["data"]["content"] if project["name"]==project_name
-            ][0]
-
+            self.project_id = name_resolver.project_id(project_name, timeout=self.timeout)
         except (KeyError, json.JSONDecodeError) as e:
             raise ValueError(f"Error parsing project list: {str(e)}")
 
-        if self.project_name not in project_list:
+        if self.project_id is None:
             raise ValueError("Project not found. Please enter a valid project name")
 
 
@@ -1,12 +1,31 @@
-from .tracer import Tracer
-from .distributed import (
-    init_tracing,
-    trace_agent,
-    trace_llm,
-    trace_tool,
-    current_span,
-    trace_custom,
-)
+import importlib
+
+# Imported on first access, so that the distributed decorators can be used
+# without loading the Tracer and the frameworks it integrates with
+_LAZY_ATTRIBUTES = {
+    "Tracer": ".tracer",
+    "init_tracing": ".distributed",
+    "trace_agent": ".distributed",
+    "trace_llm": ".distributed",
+    "trace_tool": ".distributed",
+    "current_span": ".distributed",
+    "trace_context": ".distributed",
+    "trace_custom": ".distributed",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
     "Tracer",
@@ -15,5 +34,6 @@ __all__ = [
     "trace_llm",
     "trace_tool",
     "current_span",
+    "trace_context",
     "trace_custom"
 ]
@@ -1,5 +1,26 @@
-from .tracers.main_tracer import AgenticTracing
+import importlib
+
 from .utils.file_name_tracker import TrackName
 from .utils.unique_decorator import generate_unique_hash_simple, mydecorator
 
-__all__ = ['AgenticTracing', 'TrackName', 'generate_unique_hash_simple', 'mydecorator']
\ No newline at end of file
+# AgenticTracing is imported on first access, so that the distributed
+# decorators can use the hashing utilities above without loading the tracers
+_LAZY_ATTRIBUTES = {
+    "AgenticTracing": ".tracers.main_tracer",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+__all__ = ['AgenticTracing', 'TrackName', 'generate_unique_hash_simple', 'mydecorator']
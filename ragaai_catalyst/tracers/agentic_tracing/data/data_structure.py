@@ -3,14 +3,14 @@ from typing import List, Dict, Optional, Any, Union
 from datetime import datetime
 import uuid
 
-@dataclass
+@dataclass(slots=True)
 class OSInfo:
     name: str
     version: str
     platform: str
     kernel_version: str
 
-@dataclass
+@dataclass(slots=True)
 class EnvironmentInfo:
     name: str
     version: str
@@ -18,75 +18,77 @@ class EnvironmentInfo:
     env_path: str
     command_to_run: str
 
-@dataclass
+@dataclass(slots=True)
 class SystemInfo:
     id: str
     os: OSInfo
     environment: EnvironmentInfo
     source_code: str
 
-@dataclass
+@dataclass(slots=True)
 class ResourceInfo:
     name: str
     cores: int
     threads: int
 
-@dataclass
+@dataclass(slots=True)
 class CPUResource:
     info: ResourceInfo
     interval: str
     values: List[float]
 
-@dataclass
+@dataclass(slots=True)
 class MemoryInfo:
     total: float
     free: float
 
-@dataclass
+@dataclass(slots=True)
 class MemoryResource:
     info: MemoryInfo
     interval: str
     values: List[float]
 
-@dataclass
+@dataclass(slots=True)
 class DiskInfo:
     total: float
     free: float
 
-@dataclass
+@dataclass(slots=True)
 class DiskResource:
     info: DiskInfo
     interval: str
     read: List[float]
     write: List[float]
 
-@dataclass
+@dataclass(slots=True)
 class NetworkInfo:
     upload_speed: float
     download_speed: float
 
-@dataclass
+@dataclass(slots=True)
 class NetworkResource:
     info: NetworkInfo
     interval: str
     uploads: List[float]
     downloads: List[float]
 
-@dataclass
+@dataclass(slots=True)
 class Resources:
     cpu: CPUResource
     memory: MemoryResource
     disk: DiskResource
     network: NetworkResource
 
-@dataclass
+@dataclass(slots=True)
 class Metadata:
     cost: Dict[str, Any]
     tokens: Dict[str, Any]
     system_info: SystemInfo
     resources: Resources
+    total_cost: Optional[float] = None
+    total_tokens: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class NetworkCall:
     url: str
     method: str
@@ -101,6 +103,8 @@ class NetworkCall:
     response: Dict[str, Any]
 
 class Interaction:
+    __slots__ = ("id", "type", "content", "timestamp")
+
     def __init__(self, id, type: str, content: str, timestamp: str):
         self.id = id
         self.type = type
@@ -115,51 +119,51 @@ class Interaction:
             "timestamp": self.timestamp
         }
 
-@dataclass
+@dataclass(slots=True)
 class Error:
     code: int
     type: str
     message: str
     details: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class LLMParameters:
     temperature: float
     top_p: float
     max_tokens: int
 
-@dataclass
+@dataclass(slots=True)
 class TokenUsage:
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
 
-@dataclass
+@dataclass(slots=True)
 class Cost:
     prompt_cost: float
     completion_cost: float
     total_cost: float
 
-@dataclass
+@dataclass(slots=True)
 class LLMInfo:
     model: str
     parameters: LLMParameters
     token_usage: TokenUsage
     cost: Cost
 
-@dataclass
+@dataclass(slots=True)
 class AgentInfo:
     agent_type: str
     version: str
     capabilities: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class ToolInfo:
     tool_type: str
     version: str
     memory_used: int
 
-@dataclass
+@dataclass(slots=True)
 class LLMCall:
     name: str
     model_name: str
@@ -172,7 +176,39 @@ class LLMCall:
     end_time: float = field(default=0)
     duration: float = field(default=0)
 
+_COMPONENT_FIELDS = (
+    "id",
+    "hash_id",
+    "source_hash_id",
+    "type",
+    "name",
+    "start_time",
+    "end_time",
+    "parent_id",
+    "info",
+    "extra_info",
+    "error",
+    "data",
+    "metadata",
+    "metrics",
+    "feedback",
+    "network_calls",
+    "interactions",
+)
+_COMPONENT_FIELD_SET = frozenset(_COMPONENT_FIELDS)
+
+
 class Component:
+    """
+    A top-level span of the trace.
+
+    Besides attribute access, a component can be read like the span dict it
+    serializes to (`span["data"]`, `span.get("type")`, `"hash_id" in span`),
+    so code handling spans does not need to convert it first.
+    """
+
+    __slots__ = _COMPONENT_FIELDS + ("_content_digest",)
+
     def __init__(
         self,
         id: str,
@@ -205,11 +241,12 @@ class Component:
         self.extra_info = extra_info
         self.data = data
         self.metadata = metadata or {}
-        self.metrics = metrics or []
+        self.metrics = metrics if metrics is not None else []  # Deferred local metrics are appended to the caller's list
         self.feedback = feedback
         self.network_calls = network_calls or []
         self.interactions = []
         self.error = error
+        self._content_digest = None  # Dedup key, set by the tracer for LLM spans
         if interactions:
             for interaction in interactions:
                 if isinstance(interaction, dict):
@@ -224,7 +261,27 @@ class Component:
                 else:
                     self.interactions.append(interaction)
 
+    def keys(self):
+        return _COMPONENT_FIELDS
+
+    def __getitem__(self, key):
+        if key not in _COMPONENT_FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in _COMPONENT_FIELD_SET
+
+    def get(self, key, default=None):
+        if key not in _COMPONENT_FIELD_SET:
+            return default
+        return getattr(self, key)
+
     def to_dict(self):
+        """Serialization view; nested values are referenced, not copied"""
+        network_calls = self.network_calls
+        if any(hasattr(call, 'to_dict') for call in network_calls):
+            network_calls = [call.to_dict() if hasattr(call, 'to_dict') else call for call in network_calls]
         return {
             "id": self.id,
             "hash_id": self.hash_id,
@@ -241,24 +298,30 @@ class Component:
             "metadata": self.metadata,
             "metrics": self.metrics,
             "feedback": self.feedback,
-            "network_calls": [call.to_dict() if hasattr(call, 'to_dict') else call for call in self.network_calls],
+            "network_calls": network_calls,
             "interactions": self.interactions
         }
 
 class LLMComponent(Component):
+    __slots__ = ()
+
     def __init__(self, id: str, hash_id: str, source_hash_id: str, type: str, name: str, start_time: str, end_time: str, parent_id: int, info: Dict[str, Any], extra_info: Optional[Dict[str, Any]] = None, data: Dict[str, Any]={}, metadata: Optional[Dict[str, Any]] = None, metrics: Optional[List[Dict[str, Any]]] = None, feedback: Optional[Any] = None, network_calls: Optional[List[NetworkCall]] = None, interactions: Optional[List[Union[Interaction, Dict]]] = None, error: Optional[Dict[str, Any]] = None):
         super().__init__(id, hash_id, source_hash_id, type, name, start_time, end_time, parent_id, info, extra_info, data, metadata, metrics, feedback, network_calls, interactions, error)
 
 class AgentComponent(Component):
+    __slots__ = ()
+
     def __init__(self, id: str, hash_id: str, source_hash_id: str, type: str, name: str, start_time: str, end_time: str, parent_id: int, info: Dict[str, Any], extra_info: Optional[Dict[str, Any]] = None, data: Dict[str, Any]={}, metadata: Optional[Dict[str, Any]] = None, metrics: Optional[List[Dict[str, Any]]] = None, feedback: Optional[Any] = None, network_calls: Optional[List[NetworkCall]] = None, interactions: Optional[List[Union[Interaction, Dict]]] = None, error: Optional[Dict[str, Any]] = None):
         super().__init__(id, hash_id, source_hash_id, type, name, start_time, end_time, parent_id, info, extra_info, data, metadata, metrics, feedback, network_calls, interactions, error)
 
 class ToolComponent(Component):
+    __slots__ = ()
+
     def __init__(self, id: str, hash_id: str, source_hash_id: str, type: str, name: str, start_time: str, end_time: str, parent_id: int, info: Dict[str, Any], extra_info: Optional[Dict[str, Any]] = None, data: Dict[str, Any]={}, metadata: Optional[Dict[str, Any]] = None, metrics: Optional[List[Dict[str, Any]]] = None, feedback: Optional[Any] = None, network_calls: Optional[List[NetworkCall]] = None, interactions: Optional[List[Union[Interaction, Dict]]] = None, error: Optional[Dict[str, Any]] = None):
         super().__init__(id, hash_id, source_hash_id, type, name, start_time, end_time, parent_id, info, extra_info, data, metadata, metrics, feedback, network_calls, interactions, error)
 
 
-@dataclass
+@dataclass(slots=True)
 class ComponentInfo:
     tool_type: Optional[str] = None
     agent_type: Optional[str] = None
@@ -271,6 +334,8 @@ class ComponentInfo:
     cost: Optional[Dict[str, float]] = None
 
 class Trace:
+    __slots__ = ("id", "trace_name", "project_name", "start_time", "end_time", "metadata", "data", "replays", "metrics")
+
     def __init__(self, id: str, trace_name: str, project_name: str, start_time: str, end_time: str, metadata: Optional[Metadata] = None, data: Optional[List[Dict[str, Any]]] = None, replays: Optional[Dict[str, Any]] = None, metrics: Optional[List[Dict[str, Any]]] = None):
         self.id = id
         self.trace_name = trace_name
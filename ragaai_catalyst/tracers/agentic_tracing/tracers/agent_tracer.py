@@ -2,7 +2,6 @@ import os
 import functools
 import uuid
 from datetime import datetime
-import psutil
 from typing import Optional, Any, Dict, List
 from ..utils.unique_decorator import mydecorator, generate_unique_hash_simple
 import contextvars
@@ -40,8 +39,6 @@ class AgentTracerMixin:
         self.input_data = contextvars.ContextVar("input_data", default=None)
         self.gt = None
 
-        self.span_attributes_dict = {}
-
         # Add auto instrument flags
         self.auto_instrument_agent = False
         self.auto_instrument_user_interaction = False
@@ -309,7 +306,7 @@ class AgentTracerMixin:
         start_time = datetime.now().astimezone().isoformat()
         self.start_time = start_time
         self.input_data = self._sanitize_input(args, kwargs)
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(name)
         component_id = str(uuid.uuid4())
 
         # Extract ground truth if present
@@ -337,8 +334,7 @@ class AgentTracerMixin:
             result = func(*args, **kwargs)
 
             # Calculate resource usage
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # Get children components collected during execution
             children = self.agent_children.get()
@@ -396,7 +392,7 @@ class AgentTracerMixin:
                 version=version,
                 capabilities=capabilities or [],
                 start_time=start_time,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 input_data=self.input_data,
                 output_data=None,
                 error=error_component,
@@ -435,7 +431,7 @@ class AgentTracerMixin:
             return await func(*args, **kwargs)
 
         start_time = datetime.now().astimezone().isoformat()
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(name)
         component_id = str(uuid.uuid4())
 
         # Extract ground truth if present
@@ -461,8 +457,7 @@ class AgentTracerMixin:
             result = await func(*args, **kwargs)
 
             # Calculate resource usage
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # Get children components collected during execution
             children = self.agent_children.get()
@@ -519,7 +514,7 @@ class AgentTracerMixin:
                 version=version,
                 capabilities=capabilities or [],
                 start_time=start_time,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 input_data=self._sanitize_input(args, kwargs),
                 output_data=None,
                 error=error_component,
@@ -591,10 +586,8 @@ class AgentTracerMixin:
                 metric["name"] = metric_name
                 metrics.append(metric)
 
-        # TODO agent_trace execute metric
-        formatted_metrics = BaseTracer.get_formatted_metric(self.span_attributes_dict, self.project_id, name)
-        if formatted_metrics:
-            metrics.extend(formatted_metrics)
+        # Local metrics are calculated in batches and attached before upload
+        self.queue_span_metrics(name, metrics)
 
         component = {
             "id": kwargs["component_id"],
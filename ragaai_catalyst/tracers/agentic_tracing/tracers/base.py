@@ -1,16 +1,23 @@
+import contextvars
+import copy
+import dataclasses
+import functools
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import List, Any, Dict, Optional
 import uuid
+import hashlib
 import sys
 import tempfile
 import threading
 import time
 
-from ragaai_catalyst.tracers.agentic_tracing.upload.upload_local_metric import calculate_metric
+from ragaai_catalyst.tracers.agentic_tracing.upload.upload_local_metric import calculate_metric, _metric_request
 from ragaai_catalyst import RagaAICatalyst
+from ragaai_catalyst.name_resolver import name_resolver
 from ragaai_catalyst.tracers.agentic_tracing.data.data_structure import (
     Trace,
     Metadata,
@@ -22,6 +29,16 @@ from ragaai_catalyst.tracers.agentic_tracing.utils.file_name_tracker import Trac
 from ragaai_catalyst.tracers.agentic_tracing.utils.zip_list_of_unique_files import zip_list_of_unique_files
 from ragaai_catalyst.tracers.agentic_tracing.utils.span_attributes import SpanAttributes
 from ragaai_catalyst.tracers.agentic_tracing.utils.system_monitor import SystemMonitor
+from ragaai_catalyst.tracers.agentic_tracing.utils.memory_tracker import MemoryTracker
+from ragaai_catalyst.tracers.agentic_tracing.utils.jsonl_spool import JsonlSpool
+from ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor import DeferredMetricExecutor
+from ragaai_catalyst.tracers.agentic_tracing.utils.variable_tracer import DEFAULT_MAX_VARIABLE_EVENTS
+from ragaai_catalyst.tracers.agentic_tracing.utils.trace_utils import (
+    build_workflow,
+    iter_span_interactions,
+    iter_workflow,
+    process_child_interactions,
+)
 from ragaai_catalyst.tracers.agentic_tracing.upload.trace_uploader import submit_upload_task, get_task_status, ensure_uploader_running
 
 import logging
@@ -32,6 +49,45 @@ logging_level = (
 )
 
 
+def span_content_digest(data) -> str:
+    """Stable digest of a span's input and output, used as the LLM span dedup key"""
+    data = data if isinstance(data, dict) else {}
+    hasher = hashlib.md5(str(data.get("input")).encode("utf-8"))
+    hasher.update(b"\x00")
+    hasher.update(str(data.get("output")).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def format_local_metric(metric, result) -> Dict[str, Any]:
+    """Span metric entry for one calculate-metric result of a local `metric`"""
+    config = result['metric_config']
+    metric_config = {
+        "job_id": config.get("job_id"),
+        "metric_name": config.get("displayName"),
+        "model": config.get("model"),
+        "org_domain": config.get("orgDomain"),
+        "provider": config.get("provider"),
+        "reason": config.get("reason"),
+        "request_id": config.get("request_id"),
+        "user_id": config.get("user_id"),
+        "threshold": {
+            "is_editable": config.get("threshold").get("isEditable"),
+            "lte": config.get("threshold").get("lte")
+        }
+    }
+    return {
+        "name": metric.get("displayName"),
+        "displayName": metric.get("displayName"),
+        "score": result.get("score"),
+        "reason": result.get("reason", ""),
+        "source": "user",
+        "cost": result.get("cost"),
+        "latency": result.get("latency"),
+        "mappings": [],
+        "config": metric_config
+    }
+
+
 class TracerJSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, datetime):
@@ -43,6 +99,13 @@ class TracerJSONEncoder(json.JSONEncoder):
                 return str(obj)  # Fallback to string representation
         if hasattr(obj, "to_dict"):  # Handle objects with to_dict method
             return obj.to_dict()
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            # Slotted dataclasses have no __dict__; same filtering as below
+            return {
+                f.name: getattr(obj, f.name)
+                for f in dataclasses.fields(obj)
+                if getattr(obj, f.name) is not None and not f.name.startswith("_")
+            }
         if hasattr(obj, "__dict__"):
             # Filter out None values and handle nested serialization
             return {
@@ -57,8 +120,79 @@ class TracerJSONEncoder(json.JSONEncoder):
             return None  # Last resort: return None instead of failing
 
 
+class TraceState:
+    """The data of one trace: the tracer's own, or one opened with `BaseTracer.trace_context`"""
+
+    __slots__ = (
+        "trace",  # Unset until the trace is started
+        "trace_id",
+        "data_key",
+        "components",
+        "visited_metrics",
+        "trace_metrics",
+        "_component_spool",
+        "upload_task_id",
+        "span_attributes_dict",
+    )
+
+    def __init__(self):
+        self.trace_id = None
+        self.data_key = None
+        self.components: List[Component] = []
+        self.visited_metrics = []
+        self.trace_metrics = []
+        self._component_spool = None
+        self.upload_task_id = None
+        self.span_attributes_dict = {}
+
+
+class TraceField:
+    """
+    Tracer attribute stored on the current TraceState.
+
+    Inside `trace_context()` the attribute reads and writes the context's trace,
+    everywhere else the tracer's own. `fallback` is returned while the field is
+    unset, for subclasses that also use the name for a method.
+    """
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, tracer, owner=None):
+        if tracer is None:
+            return self
+        try:
+            return getattr(tracer._trace_state(), self.name)
+        except AttributeError:
+            if self.fallback is None:
+                raise
+            return self.fallback.__get__(tracer, owner)
+
+    def __set__(self, tracer, value):
+        setattr(tracer._trace_state(), self.name, value)
+
+    def __delete__(self, tracer):
+        delattr(tracer._trace_state(), self.name)
+
+
 class BaseTracer:
+    # Kept per trace, see trace_context()
+    trace = TraceField()
+    trace_id = TraceField()
+    data_key = TraceField()
+    components = TraceField()
+    visited_metrics = TraceField()
+    trace_metrics = TraceField()
+    _component_spool = TraceField()
+    upload_task_id = TraceField()
+    span_attributes_dict = TraceField()
+
     def __init__(self, user_details):
+        self._default_trace = TraceState()
+        self._trace_context = contextvars.ContextVar("trace_context", default=None)
         self.user_details = user_details
         self.project_name = self.user_details["project_name"]
         self.dataset_name = self.user_details["dataset_name"]
@@ -83,8 +217,33 @@ class BaseTracer:
         self.tracking_thread = None
         self.tracking = False
         self.system_monitor = None
+        self._system_info = None
+        self._resources = None
         self.gt = None
 
+        # Per-component memory accounting, off by default
+        self.memory_tracker = MemoryTracker(
+            mode=self.user_details.get("memory_tracking", "off"),
+            span_names=self.user_details.get("memory_tracking_spans"),
+        )
+
+        # Cap on the variable trace entries recorded for one trace_custom span
+        self.max_variable_events = self.user_details.get("max_variable_events", DEFAULT_MAX_VARIABLE_EVENTS)
+
+        # Stream finished components to a JSONL segment instead of keeping them in memory
+        self.spool_components = bool(self.user_details.get("spool_components", False))
+        self._component_spool = None
+
+        # Local span metrics are queued and calculated in batches, off the traced call
+        self.metric_executor = DeferredMetricExecutor(resolve_project_id=self._resolve_project_id)
+        # While spooling: id of each span metric list still waiting for results, with their count
+        self._queued_metric_lists = {}
+        self._queued_metric_lock = threading.Lock()
+
+        # Source code zip shared by the traces of trace_context(), made once per start()
+        self._context_code = None
+        self._context_code_lock = threading.Lock()
+
         # For upload tracking
         self.upload_task_id = None
         
@@ -142,30 +301,49 @@ class BaseTracer:
             except Exception as e:
                 logger.warning(f"Sleep interrupted in network tracking: {str(e)}")
 
+    def _resolve_project_id(self):
+        """Project id, looked up on first use when the tracer was created offline"""
+        if self.project_id is None:
+            project_id = name_resolver.project_id(self.project_name)
+            if project_id is None:
+                raise ValueError(f"Project '{self.project_name}' not found. Please enter a valid project name")
+            self.project_id = project_id
+        return self.project_id
+
+    def _trace_state(self):
+        return self._trace_context.get() or self._default_trace
+
     def start(self):
         """Initialize a new trace"""
         self.tracking = True
         self.trace_id = str(uuid.uuid4())
         self.file_tracker.trace_main_file()
         self.system_monitor = SystemMonitor(self.trace_id)
+        self._system_info = None
+        self._context_code = None
         threading.Thread(target=self._track_memory_usage).start()
         threading.Thread(target=self._track_cpu_usage).start()
         threading.Thread(target=self._track_disk_usage).start()
         threading.Thread(target=self._track_network_usage).start()
 
+        # Get the start time
+        self.start_time = datetime.now().astimezone().isoformat()
+
+        self._begin_trace(self.trace_name)
+
+    def _begin_trace(self, trace_name):
+        """Set up the trace of the current TraceState; `trace_id` must be set"""
         # Reset metrics
         self.visited_metrics = []
         self.trace_metrics = []
 
-        metadata = Metadata(
-            cost={},
-            tokens={},
-            system_info=self._get_system_info(),
-            resources=self._get_resources(),
-        )
+        metadata = self._new_metadata()
 
-        # Get the start time
-        self.start_time = datetime.now().astimezone().isoformat()
+        if self.spool_components:
+            self._component_spool = JsonlSpool(
+                os.path.join(tempfile.gettempdir(), f"{self.trace_id}.components.jsonl"),
+                encoder_cls=TracerJSONEncoder,
+            )
 
         self.data_key = [
             {
@@ -177,7 +355,7 @@ class BaseTracer:
 
         self.trace = Trace(
             id=self.trace_id,
-            trace_name=self.trace_name,
+            trace_name=trace_name,
             project_name=self.project_name,
             start_time=datetime.now().astimezone().isoformat(),
             end_time="",  # Will be set when trace is stopped
@@ -187,6 +365,66 @@ class BaseTracer:
             metrics=[]  # Initialize empty metrics list
         )
 
+    def _new_metadata(self):
+        """Trace metadata; system info is collected once per start() and copied for each trace"""
+        if self._system_info is None:
+            monitor = self.system_monitor or SystemMonitor(self.trace_id)
+            self._system_info = monitor.get_system_info()
+            self._resources = monitor.get_resources()
+        return Metadata(
+            cost={},
+            tokens={},
+            system_info=dataclasses.replace(self._system_info, id=f"sys_{self.trace_id}"),
+            resources=copy.deepcopy(self._resources),
+        )
+
+    @contextmanager
+    def trace_context(self, name=None):
+        """
+        Record the calls made inside the block as a trace of their own.
+
+        The trace is kept in a context variable, so concurrent requests, each in
+        its own thread or asyncio task, get separate traces from one tracer. Tasks
+        created inside the block inherit its trace; threads started inside it do
+        not, unless run with `contextvars.copy_context()`. Instrumentation and the
+        uploader are shared with the tracer, which should already be started.
+        Span attributes set with `span()` inside the block belong to its trace,
+        starting from a copy of the tracer's own. When the block exits the trace is saved and submitted for upload.
+
+        Args:
+            name (str, optional): Trace name. Defaults to the tracer's trace name.
+
+        Yields:
+            TraceState: The trace, with its `trace_id` and, once the block has
+            exited, the `upload_task_id` of its upload.
+
+        Example:
+            with tracer.trace_context(name="chat-request") as trace:
+                handle_request()
+        """
+        state = TraceState()
+        # Span attributes set on the tracer apply to every request, changes stay in the request
+        state.span_attributes_dict = copy.deepcopy(self._default_trace.span_attributes_dict)
+        token = self._trace_context.set(state)
+        try:
+            self.trace_id = str(uuid.uuid4())
+            self._begin_trace(name or self.trace_name)
+            yield state
+        finally:
+            try:
+                self._end_trace(code=self._shared_context_code)
+            finally:
+                self._trace_context.reset(token)
+
+    def _shared_context_code(self):
+        """Zip the traced source files once, for all the traces of trace_context()"""
+        with self._context_code_lock:
+            if self._context_code is None or not os.path.exists(self._context_code[1]):
+                self._context_code = zip_list_of_unique_files(
+                    self.file_tracker.get_unique_files(), output_dir=self.traces_dir
+                )
+            return self._context_code
+
     def on_upload_completed(self, callback_fn):
         """
         Register a callback function to be called when all uploads are completed.
@@ -258,38 +496,61 @@ class BaseTracer:
     def stop(self):
         """Stop the trace and save to JSON file, then submit to background uploader"""
         if hasattr(self, "trace"):
-            # Set end times
-            self.trace.data[0]["end_time"] = datetime.now().astimezone().isoformat()
-            self.trace.end_time = datetime.now().astimezone().isoformat()
-
             # Stop tracking metrics
             self.tracking = False
-            
-            # Process and aggregate metrics
-            self._process_resource_metrics()
-            
-            # Process trace spans
-            self.trace = self._change_span_ids_to_int(self.trace)
-            self.trace = self._change_agent_input_output(self.trace)
-            self.trace = self._extract_cost_tokens(self.trace)
 
-            # Create traces directory and prepare file paths
-            self.traces_dir = tempfile.gettempdir()
-            filename = self.trace.id + ".json"
-            filepath = f"{self.traces_dir}/{filename}"
+            self._end_trace()
 
-            # Process source files
+        # Cleanup local resources
+        self.components = []
+        self.file_tracker.reset()
+        
+    def _end_trace(self, code=None):
+        """
+        Save the trace of the current TraceState and submit it for upload.
+
+        Args:
+            code (callable, optional): Returns the (hash_id, zip_path) of the source
+                code to upload with the trace. Defaults to zipping the tracked files.
+        """
+        # Set end times
+        self.trace.data[0]["end_time"] = datetime.now().astimezone().isoformat()
+        self.trace.end_time = datetime.now().astimezone().isoformat()
+
+        # Attach the results of the queued span metrics before saving
+        self.metric_executor.flush()
+
+        # Process and aggregate metrics
+        self._process_resource_metrics()
+
+        # Create traces directory and prepare file paths
+        self.traces_dir = tempfile.gettempdir()
+        filename = self.trace.id + ".json"
+        filepath = f"{self.traces_dir}/{filename}"
+
+        # Process source files
+        if code is None:
             list_of_unique_files = self.file_tracker.get_unique_files()
             hash_id, zip_path = zip_list_of_unique_files(
                 list_of_unique_files, output_dir=self.traces_dir
             )
-            self.trace.metadata.system_info.source_code = hash_id
+        else:
+            hash_id, zip_path = code()
+        self.trace.metadata.system_info.source_code = hash_id
+
+        if self._component_spool is not None:
+            self._save_spooled_trace(filepath)
+        else:
+            # Process trace spans
+            self.trace = self._change_span_ids_to_int(self.trace)
+            self.trace = self._change_agent_input_output(self.trace)
+            self.trace = self._extract_cost_tokens(self.trace)
 
             # Prepare trace data for saving
             trace_data = self.trace.to_dict()
             trace_data["metrics"] = self.trace_metrics
             cleaned_trace_data = self._clean_trace(trace_data)
-            
+
             # Add interactions
             interactions = self.format_interactions()
             cleaned_trace_data["workflow"] = interactions["workflow"]
@@ -298,56 +559,52 @@ class BaseTracer:
             with open(filepath, "w") as f:
                 json.dump(cleaned_trace_data, f, cls=TracerJSONEncoder, indent=2)
 
-            logger.info("Traces saved successfully.")
-            logger.debug(f"Trace saved to {filepath}")
-            
-            # Make sure uploader process is available
-            ensure_uploader_running()
+        logger.info("Traces saved successfully.")
+        logger.debug(f"Trace saved to {filepath}")
 
-            logger.debug("Base URL used for uploading: {}".format(self.base_url))
-            
-            # Submit to background process for uploading using futures
-            self.upload_task_id = submit_upload_task(
-                filepath=filepath,
-                hash_id=hash_id,
-                zip_path=zip_path,
-                project_name=self.project_name,
-                project_id=self.project_id,
-                dataset_name=self.dataset_name,
-                user_details=self.user_details,
-                base_url=self.base_url,
-                timeout=self.timeout
-            )
-            
-            # For backward compatibility
-            self._is_uploading = True
-            
-            # Start checking for completion if a callback is registered
-            if self._upload_completed_callback:
-                # Start a thread to check status and call callback when complete
-                def check_status_and_callback():
-                    status = self.get_upload_status()
-                    if status.get("status") in ["completed", "failed"]:
-                        self._is_uploading = False
-                        # Execute callback
-                        try:
-                            self._upload_completed_callback(self)
-                        except Exception as e:
-                            logger.error(f"Error in upload completion callback: {e}")
-                        return
-                    
-                    # Check again after a delay
-                    threading.Timer(5.0, check_status_and_callback).start()
-                
-                # Start checking
+        logger.debug("Base URL used for uploading: {}".format(self.base_url))
+
+        # Submit to background process for uploading using futures
+        self.upload_task_id = submit_upload_task(
+            filepath=filepath,
+            hash_id=hash_id,
+            zip_path=zip_path,
+            project_name=self.project_name,
+            project_id=self.project_id,
+            dataset_name=self.dataset_name,
+            user_details=self.user_details,
+            base_url=self.base_url,
+            timeout=self.timeout
+        )
+
+        # For backward compatibility
+        self._is_uploading = True
+
+        # Start checking for completion if a callback is registered
+        if self._upload_completed_callback:
+            # The timer threads do not see the trace context, so keep the task id
+            upload_task_id = self.upload_task_id
+
+            # Start a thread to check status and call callback when complete
+            def check_status_and_callback():
+                status = get_task_status(upload_task_id) if upload_task_id else {"status": "not_started"}
+                if status.get("status") in ["completed", "failed"]:
+                    self._is_uploading = False
+                    # Execute callback
+                    try:
+                        self._upload_completed_callback(self)
+                    except Exception as e:
+                        logger.error(f"Error in upload completion callback: {e}")
+                    return
+
+                # Check again after a delay
                 threading.Timer(5.0, check_status_and_callback).start()
-            
-            logger.info(f"Submitted upload task with ID: {self.upload_task_id}")
 
-        # Cleanup local resources
-        self.components = []
-        self.file_tracker.reset()
-        
+            # Start checking
+            threading.Timer(5.0, check_status_and_callback).start()
+
+        logger.info(f"Submitted upload task with ID: {self.upload_task_id}")
+
     def get_upload_status(self):
         """
         Get the status of the upload task.
@@ -405,8 +662,156 @@ class BaseTracer:
     
     def add_component(self, component: Component):
         """Add a component to the trace"""
+        if self._component_spool is not None:
+            # Spooled components are serialized right away, so their metrics must be final
+            queued = self._queued_metrics_of(component)
+            if queued:
+                self.metric_executor.flush()
+                with self._queued_metric_lock:
+                    for key in queued:
+                        # Also forgets lists whose results failed and never arrived
+                        self._queued_metric_lists.pop(key, None)
+            self._component_spool.append(component)
+            return
         self.components.append(component)
 
+    def _queued_metrics_of(self, component):
+        """Ids of the metric lists of `component` and its children that wait for queued results"""
+        queued = []
+        stack = [component]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                metrics, data = item.get("metrics"), item.get("data")
+            else:
+                metrics, data = getattr(item, "metrics", None), getattr(item, "data", None)
+            if metrics is not None and id(metrics) in self._queued_metric_lists:
+                queued.append(id(metrics))
+            if isinstance(data, dict):
+                stack.extend(data.get("children") or [])
+        return queued
+
+    def iter_components(self):
+        """Iterate over the top-level components recorded so far, spooled or in memory"""
+        if self._component_spool is not None:
+            return self._iter_spooled_components()
+        return iter(self.components)
+
+    def _iter_spooled_components(self, indexes=None):
+        records = (
+            iter(self._component_spool)
+            if indexes is None
+            else self._component_spool.read(indexes)
+        )
+        for record in records:
+            yield Component(**record)
+
+    def _save_spooled_trace(self, filepath):
+        """
+        Write the trace file from the component spool without loading all spans.
+
+        A planning pass keeps only span ids, dedup keys, model names and cost/token
+        totals. The writing pass then processes and writes one span at a time, with
+        the same steps as the in-memory path. Workflow interactions are spooled too
+        and written in timestamp order from (timestamp, sequence) keys.
+        """
+        spool = self._component_spool
+        spool.close()
+
+        # Planning pass
+        start_ids = []
+        next_id = 1
+        cost, tokens = {}, {}
+        plan = []  # Spool index written at each output position
+        llm_positions = {}  # Dedup key -> output position
+        llm_models = {}  # Spool index -> (name, model) for LLM spans
+        for index, span in enumerate(self._iter_spooled_components()):
+            start_ids.append(next_id)
+            next_id = self._assign_span_ids(span, next_id)
+            self._accumulate_cost_tokens([span], cost, tokens)
+
+            if span.type == "llm":
+                span_key = (span.hash_id, span_content_digest(span.data))
+                if span_key not in llm_positions:
+                    llm_positions[span_key] = len(plan)
+                    plan.append(index)
+                elif span.interactions:
+                    # A duplicate with interactions replaces the first occurrence
+                    plan[llm_positions[span_key]] = index
+                info = span.info if isinstance(span.info, dict) else {}
+                llm_models[index] = (span.name, info.get("model"))
+            else:
+                plan.append(index)
+        llm_positions.clear()
+
+        # LLM spans sharing a name with a non-default model are written as custom spans
+        models_by_name = {}
+        for position, index in enumerate(plan):
+            if index in llm_models and llm_models[index][0]:
+                name, model = llm_models[index]
+                models_by_name.setdefault(name, []).append((position, model))
+        custom_positions = set()
+        for entries in models_by_name.values():
+            if len(entries) > 1 and any(model != "default" for _, model in entries):
+                custom_positions.update(
+                    position for position, model in entries if model == "default"
+                )
+
+        self.trace.metadata.cost = cost
+        self.trace.metadata.tokens = tokens
+
+        # Serialize everything but the spans and the workflow, then stream those in
+        spans_marker = f"__spans_{uuid.uuid4().hex}__"
+        workflow_marker = f"__workflow_{uuid.uuid4().hex}__"
+        trace_data = self.trace.to_dict()
+        trace_data["data"] = [dict(self.trace.data[0], spans=spans_marker)]
+        trace_data["metrics"] = self.trace_metrics
+        trace_data["workflow"] = workflow_marker
+        skeleton = json.dumps(trace_data, cls=TracerJSONEncoder, indent=2)
+        head, rest = skeleton.split(json.dumps(spans_marker), 1)
+        middle, tail = rest.split(json.dumps(workflow_marker), 1)
+
+        workflow_spool = JsonlSpool(f"{filepath}.workflow.jsonl", encoder_cls=TracerJSONEncoder)
+        sort_keys = []
+        try:
+            with open(filepath, "w") as f:
+                # Writing pass
+                f.write(head)
+                f.write("[")
+                for position, span in enumerate(self._iter_spooled_components(plan)):
+                    self._assign_span_ids(span, start_ids[plan[position]])
+                    self._change_agent_span_input_output(span)
+                    # Deduplicates the children of this span
+                    self._clean_trace({"data": [{"spans": [span]}]})
+                    if position in custom_positions:
+                        span.type = "custom"
+
+                    if position:
+                        f.write(", ")
+                    json.dump(span, f, cls=TracerJSONEncoder, indent=2)
+
+                    for interaction in iter_span_interactions(span):
+                        sort_keys.append((interaction["timestamp"] or "", len(sort_keys)))
+                        workflow_spool.append(interaction)
+                f.write("]")
+                f.write(middle)
+
+                # Workflow in timestamp order; the sequence keeps the sort stable
+                sort_keys.sort()
+                f.write("[")
+                records = workflow_spool.read(sequence for _, sequence in sort_keys)
+                for idx, interaction in enumerate(records, 1):
+                    interaction["id"] = str(idx)
+                    if idx > 1:
+                        f.write(", ")
+                    json.dump(interaction, f, cls=TracerJSONEncoder, indent=2)
+                f.write("]")
+                f.write(tail)
+        finally:
+            workflow_spool.remove()
+            spool.remove()
+            self._component_spool = None
+
     def __enter__(self):
         self.start()
         return self
@@ -425,51 +830,66 @@ class BaseTracer:
                 current_id = self._process_children(child["data"]["children"], child["id"], current_id)
         return current_id
 
+    def _assign_span_ids(self, span, id, parent_id=0):
+        """Give a top-level span and its children sequential int ids, return the next id"""
+        span.id = id
+        span.parent_id = parent_id
+        id += 1
+        if span.type == "agent" and "children" in span.data:
+            id = self._process_children(span.data["children"], span.id, id)
+        return id
+
     def _change_span_ids_to_int(self, trace):
-        id, parent_id = 1, 0
+        id = 1
         for span in trace.data[0]["spans"]:
-            span.id = id
-            span.parent_id = parent_id
-            id += 1
-            if span.type == "agent" and "children" in span.data:
-                id = self._process_children(span.data["children"], span.id, id)
+            id = self._assign_span_ids(span, id)
         return trace
 
+    def _change_agent_span_input_output(self, span):
+        if span.type == "agent":
+            childrens = span.data["children"]
+            span.data["input"] = None
+            span.data["output"] = None
+            if childrens:
+                # Find first non-null input going forward
+                for child in childrens:
+                    if "data" not in child:
+                        continue
+                    input_data = child["data"].get("input")
+
+                    if input_data:
+                        span.data["input"] = (
+                            input_data["args"]
+                            if hasattr(input_data, "args")
+                            else input_data
+                        )
+                        break
+
+                # Find first non-null output going backward
+                for child in reversed(childrens):
+                    if "data" not in child:
+                        continue
+                    output_data = child["data"].get("output")
+
+                    if output_data and output_data != "" and output_data != "None":
+                        span.data["output"] = output_data
+                        break
+
     def _change_agent_input_output(self, trace):
         for span in trace.data[0]["spans"]:
-            if span.type == "agent":
-                childrens = span.data["children"]
-                span.data["input"] = None
-                span.data["output"] = None
-                if childrens:
-                    # Find first non-null input going forward
-                    for child in childrens:
-                        if "data" not in child:
-                            continue
-                        input_data = child["data"].get("input")
-
-                        if input_data:
-                            span.data["input"] = (
-                                input_data["args"]
-                                if hasattr(input_data, "args")
-                                else input_data
-                            )
-                            break
-
-                    # Find first non-null output going backward
-                    for child in reversed(childrens):
-                        if "data" not in child:
-                            continue
-                        output_data = child["data"].get("output")
-
-                        if output_data and output_data != "" and output_data != "None":
-                            span.data["output"] = output_data
-                            break
+            self._change_agent_span_input_output(span)
         return trace
 
     def _extract_cost_tokens(self, trace):
         cost = {}
         tokens = {}
+        self._accumulate_cost_tokens(trace.data[0]["spans"], cost, tokens)
+        trace.metadata.cost = cost
+        trace.metadata.tokens = tokens
+        return trace
+
+    def _accumulate_cost_tokens(self, spans, cost, tokens):
+        """Add the cost and token counts of LLM spans (including agent children) to `cost`/`tokens`"""
 
         def process_span_info(info):
             if not isinstance(info, dict):
@@ -507,63 +927,40 @@ class BaseTracer:
                         elif child_type == "agent":
                             process_spans([child])
 
-        process_spans(trace.data[0]["spans"])
-        trace.metadata.cost = cost
-        trace.metadata.tokens = tokens
-        return trace
+        process_spans(spans)
 
     def _clean_trace(self, trace):
-        # Convert span to dict if it has to_dict method
-        def _to_dict_if_needed(obj):
-            if hasattr(obj, "to_dict"):
-                return obj.to_dict()
-            return obj
+        def content_digest(span, span_dict):
+            # Digest computed when the component was added, if available
+            digest = getattr(span, "_content_digest", None)
+            if digest is None:
+                digest = span_content_digest(span_dict.get("data"))
+            return digest
 
         def deduplicate_spans(spans):
-            seen_llm_spans = {}  # Dictionary to track unique LLM spans
+            seen_llm_spans = {}  # Dedup key -> position in unique_spans
             unique_spans = []
 
             for span in spans:
-                # Convert span to dictionary if needed
-                span_dict = _to_dict_if_needed(span)
+                # Components can be read like span dicts
+                span_dict = span
 
                 # Skip spans without hash_id
                 if "hash_id" not in span_dict:
                     continue
 
                 if span_dict.get("type") == "llm":
-                    # Create a unique key based on hash_id, input, and output
-                    span_key = (
-                        span_dict.get("hash_id"),
-                        str(span_dict.get("data", {}).get("input")),
-                        str(span_dict.get("data", {}).get("output")),
-                    )
+                    # Create a unique key based on hash_id and a digest of input and output
+                    span_key = (span_dict.get("hash_id"), content_digest(span, span_dict))
 
                     # Check if we've seen this span before
-                    if span_key not in seen_llm_spans:
-                        seen_llm_spans[span_key] = True
+                    position = seen_llm_spans.get(span_key)
+                    if position is None:
+                        seen_llm_spans[span_key] = len(unique_spans)
                         unique_spans.append(span)
-                    else:
-                        # If we have interactions in the current span, replace the existing one
-                        current_interactions = span_dict.get("interactions", [])
-                        if current_interactions:
-                            # Find and replace the existing span with this one that has interactions
-                            for i, existing_span in enumerate(unique_spans):
-                                existing_dict = (
-                                    existing_span
-                                    if isinstance(existing_span, dict)
-                                    else existing_span.__dict__
-                                )
-                                if (
-                                        existing_dict.get("hash_id")
-                                        == span_dict.get("hash_id")
-                                        and str(existing_dict.get("data", {}).get("input"))
-                                        == str(span_dict.get("data", {}).get("input"))
-                                        and str(existing_dict.get("data", {}).get("output"))
-                                        == str(span_dict.get("data", {}).get("output"))
-                                ):
-                                    unique_spans[i] = span
-                                    break
+                    elif span_dict.get("interactions", []):
+                        # Replace the existing span with this one that has interactions
+                        unique_spans[position] = span
                 
                 else:
                     # For non-LLM spans, process their children if they exist
@@ -580,7 +977,7 @@ class BaseTracer:
             # Process spans to update model information for LLM spans with same name
             llm_spans_by_name = {}
             for i, span in enumerate(unique_spans):
-                span_dict = span if isinstance(span, dict) else span.__dict__
+                span_dict = span
                 
                 if span_dict.get('type') == 'llm':
                     span_name = span_dict.get('name')
@@ -638,167 +1035,19 @@ class BaseTracer:
         Returns:
             int: Next interaction ID to use
         """
-        child_type = child.get("type")
-
-        if child_type == "tool":
-            # Tool call start
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": "tool_call_start",
-                    "name": child.get("name"),
-                    "content": {
-                        "parameters": [
-                            child.get("data", {}).get("input", {}).get("args"),
-                            child.get("data", {}).get("input", {}).get("kwargs"),
-                        ]
-                    },
-                    "timestamp": child.get("start_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
+        return process_child_interactions(child, interaction_id, interactions)
 
-            # Tool call end
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": "tool_call_end",
-                    "name": child.get("name"),
-                    "content": {
-                        "returns": child.get("data", {}).get("output"),
-                    },
-                    "timestamp": child.get("end_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
-
-        elif child_type == "llm":
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": "llm_call_start",
-                    "name": child.get("name"),
-                    "content": {
-                        "prompt": child.get("data", {}).get("input"),
-                    },
-                    "timestamp": child.get("start_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
-
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": "llm_call_end",
-                    "name": child.get("name"),
-                    "content": {"response": child.get("data", {}).get("output")},
-                    "timestamp": child.get("end_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
-
-        elif child_type == "agent":
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": "agent_call_start",
-                    "name": child.get("name"),
-                    "content": None,
-                    "timestamp": child.get("start_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
-
-            # Process nested children recursively
-            if "children" in child.get("data", {}):
-                for nested_child in child["data"]["children"]:
-                    interaction_id = self._process_child_interactions(
-                        nested_child, interaction_id, interactions
-                    )
-
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": "agent_call_end",
-                    "name": child.get("name"),
-                    "content": child.get("data", {}).get("output"),
-                    "timestamp": child.get("end_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
-
-        else:
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": f"{child_type}_call_start",
-                    "name": child.get("name"),
-                    "content": child.get("data", {}),
-                    "timestamp": child.get("start_time"),
-                    "error": child.get("error"),
-                }
-            )
-            interaction_id += 1
+    def _append_span_interactions(self, span, interaction_id, interactions):
+        """
+        Append the workflow interactions of one top-level span (and its children).
 
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": child.get("id"),
-                    "interaction_type": f"{child_type}_call_end",
-                    "name": child.get("name"),
-                    "content": child.get("data", {}),
-                    "timestamp": child.get("end_time"),
-                    "error": child.get("error"),
-                }
-            )
+        Returns:
+            int: Next interaction ID to use
+        """
+        for interaction in iter_span_interactions(span):
+            interaction["id"] = str(interaction_id)
+            interactions.append(interaction)
             interaction_id += 1
-
-        # Process additional interactions and network calls
-        if "interactions" in child:
-            for interaction in child["interactions"]:
-                interaction["id"] = str(interaction_id)
-                interaction["span_id"] = child.get("id")
-                interaction["error"] = None
-                interactions.append(interaction)
-                interaction_id += 1
-
-        if "network_calls" in child:
-            for child_network_call in child["network_calls"]:
-                network_call = {}
-                network_call["id"] = str(interaction_id)
-                network_call["span_id"] = child.get("id")
-                network_call["interaction_type"] = "network_call"
-                network_call["name"] = None
-                network_call["content"] = {
-                    "request": {
-                        "url": child_network_call.get("url"),
-                        "method": child_network_call.get("method"),
-                        "headers": child_network_call.get("headers"),
-                    },
-                    "response": {
-                        "status_code": child_network_call.get("status_code"),
-                        "headers": child_network_call.get("response_headers"),
-                        "body": child_network_call.get("response_body"),
-                    },
-                }
-                network_call["timestamp"] = child_network_call.get("start_time")
-                network_call["error"] = child_network_call.get("error")
-                interactions.append(network_call)
-                interaction_id += 1
-
         return interaction_id
 
     def format_interactions(self) -> dict:
@@ -814,186 +1063,10 @@ class BaseTracer:
             dict: A dictionary with "workflow" key containing a list of interactions
                   sorted by timestamp.
         """
-        interactions = []
-        interaction_id = 1
-
         if not hasattr(self, "trace") or not self.trace.data:
             return {"workflow": []}
 
-        for span in self.trace.data[0]["spans"]:
-            # Process agent spans
-            if span.type == "agent":
-                # Add agent_start interaction
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": "agent_call_start",
-                        "name": span.name,
-                        "content": None,
-                        "timestamp": span.start_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-                # Process children of agent recursively
-                if "children" in span.data:
-                    for child in span.data["children"]:
-                        interaction_id = self._process_child_interactions(
-                            child, interaction_id, interactions
-                        )
-
-                # Add agent_end interaction
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": "agent_call_end",
-                        "name": span.name,
-                        "content": span.data.get("output"),
-                        "timestamp": span.end_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-            elif span.type == "tool":
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": "tool_call_start",
-                        "name": span.name,
-                        "content": {
-                            "prompt": span.data.get("input"),
-                            "response": span.data.get("output"),
-                        },
-                        "timestamp": span.start_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": "tool_call_end",
-                        "name": span.name,
-                        "content": {
-                            "prompt": span.data.get("input"),
-                            "response": span.data.get("output"),
-                        },
-                        "timestamp": span.end_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-            elif span.type == "llm":
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": "llm_call_start",
-                        "name": span.name,
-                        "content": {
-                            "prompt": span.data.get("input"),
-                        },
-                        "timestamp": span.start_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": "llm_call_end",
-                        "name": span.name,
-                        "content": {"response": span.data.get("output")},
-                        "timestamp": span.end_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-            else:
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": f"{span.type}_call_start",
-                        "name": span.name,
-                        "content": span.data,
-                        "timestamp": span.start_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-                interactions.append(
-                    {
-                        "id": str(interaction_id),
-                        "span_id": span.id,
-                        "interaction_type": f"{span.type}_call_end",
-                        "name": span.name,
-                        "content": span.data,
-                        "timestamp": span.end_time,
-                        "error": span.error,
-                    }
-                )
-                interaction_id += 1
-
-            # Process interactions from span.data if they exist
-            if span.interactions:
-                for span_interaction in span.interactions:
-                    interaction = {}
-                    interaction["id"] = str(interaction_id)
-                    interaction["span_id"] = span.id
-                    interaction["interaction_type"] = span_interaction.type
-                    interaction["content"] = span_interaction.content
-                    interaction["timestamp"] = span_interaction.timestamp
-                    interaction["error"] = span.error
-                    interactions.append(interaction)
-                    interaction_id += 1
-
-            if span.network_calls:
-                for span_network_call in span.network_calls:
-                    network_call = {}
-                    network_call["id"] = str(interaction_id)
-                    network_call["span_id"] = span.id
-                    network_call["interaction_type"] = "network_call"
-                    network_call["name"] = None
-                    network_call["content"] = {
-                        "request": {
-                            "url": span_network_call.get("url"),
-                            "method": span_network_call.get("method"),
-                            "headers": span_network_call.get("headers"),
-                        },
-                        "response": {
-                            "status_code": span_network_call.get("status_code"),
-                            "headers": span_network_call.get("response_headers"),
-                            "body": span_network_call.get("response_body"),
-                        },
-                    }
-                    network_call["timestamp"] = span_network_call.get("timestamp")
-                    network_call["error"] = span_network_call.get("error")
-                    interactions.append(network_call)
-                    interaction_id += 1
-
-        # Sort interactions by timestamp
-        sorted_interactions = sorted(
-            interactions, key=lambda x: x["timestamp"] if x["timestamp"] else ""
-        )
-
-        # Reassign IDs to maintain sequential order after sorting
-        for idx, interaction in enumerate(sorted_interactions, 1):
-            interaction["id"] = str(idx)
-
-        return {"workflow": sorted_interactions}
+        return {"workflow": build_workflow(iter_workflow(self.trace.data[0]["spans"]))}
 
     # TODO: Add support for execute metrics. Maintain list of all metrics to be added for this span
 
@@ -1033,30 +1106,18 @@ class BaseTracer:
                     metric_name = f"{metric_name}_{count + 1}"
                 self.visited_metrics.append(metric_name)
 
-                result = calculate_metric(project_id=self.project_id,
-                                          metric_name=metric_name,
+                request = _metric_request(metric_name=metric_name,
                                           model=model,
-                                          org_domain="raga",
                                           provider=provider,
+                                          org_domain="raga",
                                           user_id="1",  # self.user_details['id'],
                                           prompt=prompt,
                                           context=context,
                                           response=response
                                           )
-
-                result = result['data']
-                formatted_metric = {
-                    "name": metric_name,
-                    "score": result.get("score"),
-                    "reason": result.get("reason", ""),
-                    "source": "user",
-                    "cost": result.get("cost"),
-                    "latency": result.get("latency"),
-                    "mappings": [],
-                    "config": result.get("metric_config", {})
-                }
-
-                logger.debug(f"Executed metric: {formatted_metric}")
+                self.metric_executor.submit(
+                    self.project_id, request, functools.partial(self._log_executed_metric, metric_name)
+                )
 
         except ValueError as e:
             logger.error(f"Validation Error: {e}")
@@ -1151,8 +1212,58 @@ class BaseTracer:
             self.span_attributes_dict[span_name] = SpanAttributes(span_name, self.project_id)
         return self.span_attributes_dict[span_name]
 
+    @staticmethod
+    def _log_executed_metric(metric_name, result):
+        formatted_metric = {
+            "name": metric_name,
+            "score": result.get("score"),
+            "reason": result.get("reason", ""),
+            "source": "user",
+            "cost": result.get("cost"),
+            "latency": result.get("latency"),
+            "mappings": [],
+            "config": result.get("metric_config", {})
+        }
+        logger.debug(f"Executed metric: {formatted_metric}")
+
+    def queue_span_metrics(self, name, metrics):
+        """Queue the local metrics registered for span `name`.
+
+        Each result is appended to `metrics`, the span's metric list, when the
+        metric executor is flushed, at the latest when the trace is stopped.
+        """
+        if name not in self.span_attributes_dict:
+            return
+        for metric in self.span_attributes_dict[name].local_metrics or []:
+            request = _metric_request(metric_name=metric.get("name"),
+                                      model=metric.get("model"),
+                                      provider=metric.get("provider"),
+                                      **metric.get("mapping", {})
+                                      )
+            if self._component_spool is not None:
+                with self._queued_metric_lock:
+                    key = id(metrics)
+                    self._queued_metric_lists[key] = self._queued_metric_lists.get(key, 0) + 1
+            self.metric_executor.submit(
+                self.project_id,
+                request,
+                functools.partial(self._append_local_metric, metrics, metric),
+            )
+
+    def _append_local_metric(self, metrics, metric, result):
+        metrics.append(format_local_metric(metric, result))
+        with self._queued_metric_lock:
+            key = id(metrics)
+            count = self._queued_metric_lists.get(key)
+            if count is not None:
+                if count > 1:
+                    self._queued_metric_lists[key] = count - 1
+                else:
+                    del self._queued_metric_lists[key]
+
     @staticmethod
     def get_formatted_metric(span_attributes_dict, project_id, name):
+        """Calculate the local metrics of span `name` right away, one request per metric"""
         if name in span_attributes_dict:
             local_metrics = span_attributes_dict[name].local_metrics or []
             local_metrics_results = []
@@ -1168,34 +1279,7 @@ class BaseTracer:
                                               **mapping
                                               )
 
-                    result = result['data']['data'][0]
-                    config = result['metric_config']
-                    metric_config = {
-                        "job_id": config.get("job_id"),
-                        "metric_name": config.get("displayName"),
-                        "model": config.get("model"),
-                        "org_domain": config.get("orgDomain"),
-                        "provider": config.get("provider"),
-                        "reason": config.get("reason"),
-                        "request_id": config.get("request_id"),
-                        "user_id": config.get("user_id"),
-                        "threshold": {
-                            "is_editable": config.get("threshold").get("isEditable"),
-                            "lte": config.get("threshold").get("lte")
-                        }
-                    }
-                    formatted_metric = {
-                        "name": metric.get("displayName"),
-                        "displayName": metric.get("displayName"),
-                        "score": result.get("score"),
-                        "reason": result.get("reason", ""),
-                        "source": "user",
-                        "cost": result.get("cost"),
-                        "latency": result.get("latency"),
-                        "mappings": [],
-                        "config": metric_config
-                    }
-                    local_metrics_results.append(formatted_metric)
+                    local_metrics_results.append(format_local_metric(metric, result['data']['data'][0]))
                 except ValueError as e:
                     logger.error(f"Validation Error: {e}")
                 except Exception as e:
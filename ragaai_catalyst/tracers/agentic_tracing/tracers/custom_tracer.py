@@ -1,6 +1,5 @@
 import sys
 import uuid
-import psutil
 import threading
 from datetime import datetime
 import functools
@@ -9,6 +8,7 @@ from ..utils.unique_decorator import generate_unique_hash_simple, mydecorator
 import contextvars
 import asyncio
 from ..utils.file_name_tracker import TrackName
+from ..utils.variable_tracer import VariableRecorder, DEFAULT_MAX_VARIABLE_EVENTS
 
 
 class CustomTracerMixin:
@@ -27,7 +27,7 @@ class CustomTracerMixin:
         self.auto_instrument_network = False
         self.auto_instrument_file_io = False
 
-    def trace_custom(self, name: str = None, custom_type: str = "generic", version: str = "1.0.0", trace_variables: bool = True):
+    def trace_custom(self, name: str = None, custom_type: str = "generic", version: str = "1.0.0", trace_variables: bool | List[str] = False):
         def decorator(func):
             # Add metadata attribute to the function
             metadata = {
@@ -75,26 +75,12 @@ class CustomTracerMixin:
             return func(*args, **kwargs)
 
         start_time = datetime.now().astimezone().isoformat()
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(name)
         component_id = str(uuid.uuid4())
         hash_id = generate_unique_hash_simple(func)
-        variable_traces = []
-
-        # Set up variable tracing if enabled
-        if trace_variables:
-            def trace_variables_func(frame, event, arg):
-                if event == 'line' and frame.f_code == func.__code__:
-                    try:
-                        locals_dict = {k: v for k, v in frame.f_locals.items() 
-                                     if not k.startswith('__') and isinstance(v, (int, float, bool, str, list, dict, tuple, set))}
-                        if locals_dict:
-                            variable_traces.append({
-                                'variables': locals_dict,
-                                'timestamp': datetime.now().astimezone().isoformat()
-                            })
-                    except:
-                        pass
-                return trace_variables_func
+        # Record the traced function's variables while it runs
+        variable_recorder = self._start_variable_tracing(func, trace_variables)
+        variable_traces = variable_recorder.traces if variable_recorder else []
 
 
         # Start tracking network calls for this component
@@ -102,12 +88,14 @@ class CustomTracerMixin:
 
         try:
             # Execute the function
-            result = func(*args, **kwargs)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                self._stop_variable_tracing(variable_recorder)
 
             # Calculate resource usage
             end_time = datetime.now().astimezone().isoformat()
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # End tracking network calls for this component
             self.end_component(component_id)
@@ -149,7 +137,7 @@ class CustomTracerMixin:
                 name=name,
                 custom_type=custom_type,
                 version=version,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 start_time=start_time,
                 end_time=end_time,
                 variable_traces=variable_traces,
@@ -167,35 +155,23 @@ class CustomTracerMixin:
             return await func(*args, **kwargs)
 
         start_time = datetime.now().astimezone().isoformat()
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(name)
         component_id = str(uuid.uuid4())
         hash_id = generate_unique_hash_simple(func)
-        variable_traces = []
-
-        # Set up variable tracing if enabled
-        if trace_variables:
-            def trace_variables_func(frame, event, arg):
-                if event == 'line' and frame.f_code == func.__code__:
-                    try:
-                        locals_dict = {k: v for k, v in frame.f_locals.items() 
-                                     if not k.startswith('__') and isinstance(v, (int, float, bool, str, list, dict, tuple, set))}
-                        if locals_dict:
-                            variable_traces.append({
-                                'variables': locals_dict,
-                                'timestamp': datetime.now().astimezone().isoformat()
-                            })
-                    except:
-                        pass
-                return trace_variables_func
+        # Record the traced function's variables while it runs
+        variable_recorder = self._start_variable_tracing(func, trace_variables)
+        variable_traces = variable_recorder.traces if variable_recorder else []
 
         try:
             # Execute the function
-            result = await func(*args, **kwargs)
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                self._stop_variable_tracing(variable_recorder)
 
             # Calculate resource usage
             end_time = datetime.now().astimezone().isoformat()
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # Create custom component
             custom_component = self.create_custom_component(
@@ -232,7 +208,7 @@ class CustomTracerMixin:
                 version=version,
                 start_time=start_time,
                 end_time=end_time,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 variable_traces=variable_traces,
                 input_data=self._sanitize_input(args, kwargs),
                 output_data=None,
@@ -241,6 +217,22 @@ class CustomTracerMixin:
             self.add_component(custom_component, is_error=True)
             raise
 
+    def _start_variable_tracing(self, func, trace_variables):
+        """Start recording the variables of `func`.
+
+        `trace_variables` is either a bool or the list of variable names to record.
+        """
+        code = getattr(func, "__code__", None)
+        if not trace_variables or code is None:
+            return None
+        variables = None if trace_variables is True else trace_variables
+        max_events = getattr(self, "max_variable_events", DEFAULT_MAX_VARIABLE_EVENTS)
+        return VariableRecorder(code, variables, max_events).start()
+
+    def _stop_variable_tracing(self, variable_recorder):
+        if variable_recorder is not None:
+            variable_recorder.stop()
+
     def create_custom_component(self, **kwargs):
         """Create a custom component according to the data structure"""
         start_time = kwargs["start_time"]
@@ -1,6 +1,5 @@
 from typing import Optional, Any, Dict, List
 import asyncio
-import psutil
 import wrapt
 import functools
 import json
@@ -14,10 +13,6 @@ import importlib
 import sys
 import logging
 
-try:
-    from llama_index.core.base.llms.types import ChatResponse,TextBlock, ChatMessage
-except ImportError:
-    logging.warning("Failed to import ChatResponse, TextBlock, ChatMessage. Some features from llamaindex may not work. Please upgrade to the latest version of llama_index or version (>=0.12)")
 from .base import BaseTracer
 from ..utils.llm_utils import (
     extract_model_name,
@@ -29,11 +24,14 @@ from ..utils.llm_utils import (
     sanitize_input,
     extract_llm_output,
     num_tokens_from_messages,
-    get_model_cost
+    get_model_cost,
+    IncrementalTokenCounter,
+    TokenCountingStream,
 )
 from ..utils.unique_decorator import generate_unique_hash
 from ..utils.file_name_tracker import TrackName
 from ..utils.span_attributes import SpanAttributes
+from ..utils.patch_registry import llm_patches
 
 logger = logging.getLogger(__name__)
 logging_level = (
@@ -43,17 +41,54 @@ logging_level = (
 )
 
 
+def _tracing_wrapper(original, patch, is_async=None):
+    """Wrapper for llm_patches that traces through the tracer holding `patch`"""
+
+    @wrapt.decorator
+    def wrapper(wrapped, instance, args, kwargs):
+        tracer = patch.holder
+        if tracer is None:
+            return wrapped(*args, **kwargs)
+        if is_async if is_async is not None else asyncio.iscoroutinefunction(wrapped):
+            return tracer.trace_llm_call(wrapped, *args, **kwargs)
+        return tracer.trace_llm_call_sync(wrapped, *args, **kwargs)
+
+    return wrapper(original)
+
+
+def _remember_messages(original, patch):
+    """Wrapper for llm_patches that stores the messages on the instance for later use"""
+
+    @functools.wraps(original)
+    def patched_invoke(self, messages, *args, **kwargs):
+        self._last_messages = messages
+        return original(self, messages, *args, **kwargs)
+
+    return patched_invoke
+
+
+def _llama_index_message_types():
+    """
+    ChatResponse, TextBlock and ChatMessage of llama_index, each an empty tuple when unavailable.
+
+    Only looked up when llama_index is already imported: without it there can
+    be no such objects to convert, and importing it costs more than a second.
+    """
+    types = sys.modules.get("llama_index.core.base.llms.types")
+    if types is None:
+        return (), (), ()
+    return tuple(getattr(types, name, ()) for name in ("ChatResponse", "TextBlock", "ChatMessage"))
+
+
 class LLMTracerMixin:
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.file_tracker = TrackName()
-        self.patches = []
-        try:
-            self.model_costs = get_model_cost()
-        except Exception as e:
-            self.model_costs = {
-                "default": {"input_cost_per_token": 0.0, "output_cost_per_token": 0.0}
-            }
+        # Whether this tracer currently holds patches in llm_patches
+        self._llm_patched = False
+        self._import_hooks = set()
+        # Shared by all tracers and parsed on the first cost calculation
+        self.model_costs = get_model_cost()
         self.MAX_PARAMETERS_TO_DISPLAY = 10
         self.current_llm_call_name = contextvars.ContextVar(
             "llm_call_name", default=None
@@ -85,6 +120,7 @@ class LLMTracerMixin:
     def instrument_llm_calls(self):
         """Enable LLM instrumentation"""
         self.auto_instrument_llm = True
+        self._llm_patched = True
         # Check currently loaded modules
         if "vertexai" in sys.modules:
             self.patch_vertex_ai_methods(sys.modules["vertexai"])
@@ -110,52 +146,67 @@ class LLMTracerMixin:
         if "llama_index" in sys.modules:
             self.patch_llama_index_methods(sys.modules["llama_index"])
 
-        # Register hooks for future imports with availability checks
+        # Register hooks for future imports with availability checks. Hooks
+        # run right away for modules that are already imported, which is
+        # harmless as patching an already patched method is a no-op
         if self.check_package_available("vertexai"):
-            wrapt.register_post_import_hook(self.patch_vertex_ai_methods, "vertexai")
-            wrapt.register_post_import_hook(
+            self._register_import_hook(self.patch_vertex_ai_methods, "vertexai")
+            self._register_import_hook(
                 self.patch_vertex_ai_methods, "vertexai.generative_models"
             )
 
         if self.check_package_available("openai") and self.validate_openai_key():
-            wrapt.register_post_import_hook(self.patch_openai_methods, "openai")
-            wrapt.register_post_import_hook(self.patch_openai_beta_methods, "openai")
+            self._register_import_hook(self.patch_openai_methods, "openai")
+            self._register_import_hook(self.patch_openai_beta_methods, "openai")
 
         if self.check_package_available("litellm"):
-            wrapt.register_post_import_hook(self.patch_litellm_methods, "litellm")
+            self._register_import_hook(self.patch_litellm_methods, "litellm")
 
         if self.check_package_available("anthropic"):
-            wrapt.register_post_import_hook(self.patch_anthropic_methods, "anthropic")
+            self._register_import_hook(self.patch_anthropic_methods, "anthropic")
 
         if self.check_package_available("google.generativeai"):
-            wrapt.register_post_import_hook(
+            self._register_import_hook(
                 self.patch_google_genai_methods, "google.generativeai"
             )
 
         # Add hooks for LangChain integrations with availability checks
         if self.check_package_available("langchain_google_vertexai"):
-            wrapt.register_post_import_hook(
+            self._register_import_hook(
                 self.patch_langchain_google_methods, "langchain_google_vertexai"
             )
 
 
         # Add hooks for llama-index
-        wrapt.register_post_import_hook(self.patch_llama_index_methods, "llama_index")
+        self._register_import_hook(self.patch_llama_index_methods, "llama_index")
         
         if self.check_package_available("langchain_google_genai"):
-            wrapt.register_post_import_hook(
+            self._register_import_hook(
                 self.patch_langchain_google_methods, "langchain_google_genai"
             )
 
         if self.check_package_available("langchain_openai"):
-            wrapt.register_post_import_hook(
+            self._register_import_hook(
                 self.patch_langchain_openai_methods, "langchain_openai"
             )
         if self.check_package_available("langchain_anthropic"):
-            wrapt.register_post_import_hook(
+            self._register_import_hook(
                 self.patch_langchain_anthropic_methods, "langchain_anthropic"
             )
 
+    def _register_import_hook(self, hook, module_name):
+        """Run `hook` when `module_name` is imported, while this tracer holds its patches"""
+        key = (hook.__name__, module_name)
+        if key in self._import_hooks:
+            return
+        self._import_hooks.add(key)
+
+        def on_import(module):
+            if self._llm_patched:
+                hook(module)
+
+        wrapt.register_post_import_hook(on_import, module_name)
+
     def instrument_user_interaction_calls(self):
         """Enable user interaction instrumentation for LLM calls"""
         self.auto_instrument_user_interaction = True
@@ -333,6 +384,9 @@ class LLMTracerMixin:
         if hasattr(module, "Anthropic"):
             client_class = getattr(module, "Anthropic")
             self.wrap_anthropic_client_methods(client_class)
+        if hasattr(module, "AsyncAnthropic"):
+            async_client_class = getattr(module, "AsyncAnthropic")
+            self.wrap_anthropic_client_methods(async_client_class)
 
     def patch_google_genai_methods(self, module):
         # Patch direct Google GenerativeAI usage
@@ -344,14 +398,7 @@ class LLMTracerMixin:
         if hasattr(module, "ChatGoogleGenerativeAI"):
             chat_class = getattr(module, "ChatGoogleGenerativeAI")
             # Wrap invoke method to capture messages
-            original_invoke = chat_class.invoke
-
-            def patched_invoke(self, messages, *args, **kwargs):
-                # Store messages in the instance for later use
-                self._last_messages = messages
-                return original_invoke(self, messages, *args, **kwargs)
-
-            chat_class.invoke = patched_invoke
+            llm_patches.patch(self, chat_class, "invoke", _remember_messages)
 
             # LangChain v0.2+ uses invoke/ainvoke
             self.wrap_method(chat_class, "_generate")
@@ -413,129 +460,57 @@ class LLMTracerMixin:
                 self.wrap_method(chat_class, "acomplete")
 
     def wrap_openai_client_methods(self, client_class):
-        original_init = client_class.__init__
-
-        @functools.wraps(original_init)
-        def patched_init(client_self, *args, **kwargs):
-            original_init(client_self, *args, **kwargs)
-            # Check if this is AsyncOpenAI or OpenAI
-            is_async = "AsyncOpenAI" in client_class.__name__
-
-            if is_async:
-                # Patch async methods for AsyncOpenAI
-                if hasattr(client_self.chat.completions, "create"):
-                    original_create = client_self.chat.completions.create
-
-                    @functools.wraps(original_create)
-                    async def wrapped_create(*args, **kwargs):
-                        return await self.trace_llm_call(
-                            original_create, *args, **kwargs
-                        )
-
-                    client_self.chat.completions.create = wrapped_create
-            else:
-                # Patch sync methods for OpenAI
-                if hasattr(client_self.chat.completions, "create"):
-                    original_create = client_self.chat.completions.create
-
-                    @functools.wraps(original_create)
-                    def wrapped_create(*args, **kwargs):
-                        return self.trace_llm_call_sync(
-                            original_create, *args, **kwargs
-                        )
+        # Patched once on the resource classes that every client instance
+        # shares, instead of on each client created after the tracer started
+        from openai.resources.chat import AsyncCompletions, Completions
 
-                    client_self.chat.completions.create = wrapped_create
-
-        setattr(client_class, "__init__", patched_init)
+        # Check if this is AsyncOpenAI or OpenAI
+        is_async = "AsyncOpenAI" in client_class.__name__
+        completions_class = AsyncCompletions if is_async else Completions
+        if hasattr(completions_class, "create"):
+            self.wrap_method(completions_class, "create", is_async=is_async)
 
     def wrap_langchain_openai_method(self, client_class, method_name):
         method = method_name.split(".")[-1]
-        original_init = getattr(client_class, method)
-
-        @functools.wraps(original_init)
-        def patched_init(*args, **kwargs):
-            # Check if this is AsyncOpenAI or OpenAI
-            is_async = "AsyncChatOpenAI" in client_class.__name__
-
-            if is_async:
-                return self.trace_llm_call(original_init, *args, **kwargs)
-            else:
-                return self.trace_llm_call_sync(original_init, *args, **kwargs)
-
-        setattr(client_class, method, patched_init)
+        is_async = "AsyncChatOpenAI" in client_class.__name__
+        self.wrap_method(client_class, method, is_async=is_async)
 
     def wrap_langchain_anthropic_method(self, client_class, method_name):
-        original_init = getattr(client_class, method_name)
-
-        @functools.wraps(original_init)
-        def patched_init(*args, **kwargs):
-            is_async = "AsyncChatAnthropic" in client_class.__name__
-
-            if is_async:
-                return self.trace_llm_call(original_init, *args, **kwargs)
-            else:
-                return self.trace_llm_call_sync(original_init, *args, **kwargs)
-
-        setattr(client_class, method_name, patched_init)
+        method = method_name.split(".")[-1]
+        is_async = "AsyncChatAnthropic" in client_class.__name__
+        self.wrap_method(client_class, method, is_async=is_async)
 
     def wrap_anthropic_client_methods(self, client_class):
-        original_init = client_class.__init__
-
-        @functools.wraps(original_init)
-        def patched_init(client_self, *args, **kwargs):
-            original_init(client_self, *args, **kwargs)
-            self.wrap_method(client_self.messages, "create")
-            if hasattr(client_self.messages, "acreate"):
-                self.wrap_method(client_self.messages, "acreate")
+        # Patched once on the messages resource class that every client
+        # instance shares, instead of on each client created after the tracer started
+        from anthropic.resources import AsyncMessages, Messages
 
-        setattr(client_class, "__init__", patched_init)
+        # Check if this is AsyncAnthropic or Anthropic
+        is_async = "AsyncAnthropic" in client_class.__name__
+        messages_class = AsyncMessages if is_async else Messages
+        if hasattr(messages_class, "create"):
+            self.wrap_method(messages_class, "create", is_async=is_async)
 
     def wrap_genai_model_methods(self, model_class):
-        original_init = model_class.__init__
-
-        @functools.wraps(original_init)
-        def patched_init(model_self, *args, **kwargs):
-            original_init(model_self, *args, **kwargs)
-            self.wrap_method(model_self, "generate_content")
-            if hasattr(model_self, "generate_content_async"):
-                self.wrap_method(model_self, "generate_content_async")
-
-        setattr(model_class, "__init__", patched_init)
+        self.wrap_method(model_class, "generate_content")
+        if hasattr(model_class, "generate_content_async"):
+            self.wrap_method(model_class, "generate_content_async")
 
-    def wrap_method(self, obj, method_name):
+    def wrap_method(self, obj, method_name, is_async=None):
         """
         Wrap a method with tracing functionality.
-        Works for both class methods and instance methods.
+        Works for classes, modules and instances.
+
+        The method is patched once for all tracers: patching it again is a
+        no-op, calls are traced by the latest tracer holding the patch and
+        pass straight through once every tracer released it. `is_async`
+        overrides the detection of coroutine functions.
         """
-        # If obj is a class, we need to patch both the class and any existing instances
-        if isinstance(obj, type):
-            # Store the original class method
-            original_method = getattr(obj, method_name)
-
-            @wrapt.decorator
-            def wrapper(wrapped, instance, args, kwargs):
-                if asyncio.iscoroutinefunction(wrapped):
-                    return self.trace_llm_call(wrapped, *args, **kwargs)
-                return self.trace_llm_call_sync(wrapped, *args, **kwargs)
-
-            # Wrap the class method
-            wrapped_method = wrapper(original_method)
-            setattr(obj, method_name, wrapped_method)
-            self.patches.append((obj, method_name, original_method))
-
-        else:
-            # For instance methods
-            original_method = getattr(obj, method_name)
-
-            @wrapt.decorator
-            def wrapper(wrapped, instance, args, kwargs):
-                if asyncio.iscoroutinefunction(wrapped):
-                    return self.trace_llm_call(wrapped, *args, **kwargs)
-                return self.trace_llm_call_sync(wrapped, *args, **kwargs)
-
-            wrapped_method = wrapper(original_method)
-            setattr(obj, method_name, wrapped_method)
-            self.patches.append((obj, method_name, original_method))
+        llm_patches.patch(self, obj, method_name, functools.partial(_tracing_wrapper, is_async=is_async))
+
+    def find_double_wrapped_methods(self) -> List[str]:
+        """Patched methods that ended up wrapped more than once; empty unless patching went wrong"""
+        return llm_patches.find_double_wrapped()
 
     def create_llm_component(
             self,
@@ -629,10 +604,8 @@ class LLMTracerMixin:
             prompt = self.convert_to_content(input)
             response = self.convert_to_content(output)
 
-            # TODO: Execute & Add the User requested metrics here
-            formatted_metrics = BaseTracer.get_formatted_metric(self.span_attributes_dict, self.project_id, name)
-            if formatted_metrics:
-                metrics.extend(formatted_metrics)
+            # Local metrics are calculated in batches and attached before upload
+            self.queue_span_metrics(name, metrics)
 
             component = {
                 "id": component_id,
@@ -676,6 +649,7 @@ class LLMTracerMixin:
             raise Exception("Failed to create LLM component")
 
     def convert_to_content(self, input_data):
+        ChatResponse, TextBlock, ChatMessage = _llama_index_message_types()
         try:
             if isinstance(input_data, dict):
                 messages = input_data.get("kwargs", {}).get("messages", [])
@@ -727,6 +701,31 @@ class LLMTracerMixin:
         return ""
 
     
+    def _streamed_token_usage(self, model_name, prompt_messages, result):
+        """Token usage of a streamed call before its response has been read.
+
+        Returns the usage and whether `result` is a stream whose completion
+        tokens still have to be counted as it is consumed.
+        """
+        if isinstance(result, str) or not (hasattr(result, "__iter__") or hasattr(result, "__aiter__")):
+            response_message = {"role": "assistant", "content": result} if result else {"role": "assistant",
+                                                                                        "content": ""}
+            return num_tokens_from_messages(model_name, prompt_messages, response_message), False
+        response_message = {"role": "assistant", "content": ""}
+        return num_tokens_from_messages(model_name, prompt_messages, response_message), True
+
+    def _count_stream_tokens(self, stream, model_name, token_usage, cost):
+        """Wrap `stream` so its completion tokens are added to the component usage and cost as it is read"""
+        def on_complete(tokens):
+            token_usage["completion_tokens"] += tokens
+            token_usage["total_tokens"] += tokens
+            updated_cost = calculate_llm_cost(token_usage, model_name, self.model_costs, self.model_custom_cost)
+            self.total_tokens += tokens
+            self.total_cost += updated_cost["total_cost"] - cost.get("total_cost", 0)
+            cost.update(updated_cost)
+
+        return TokenCountingStream(stream, IncrementalTokenCounter(model_name), on_complete)
+
     def start_component(self, component_id):
         """Start tracking network calls for a component"""
         self.component_network_calls[component_id] = []
@@ -745,7 +744,7 @@ class LLMTracerMixin:
             return await original_func(*args, **kwargs)
 
         start_time = datetime.now().astimezone().isoformat()
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(self.current_llm_call_name.get())
         component_id = str(uuid.uuid4())
         hash_id = generate_unique_hash(original_func, args, kwargs)
 
@@ -757,24 +756,22 @@ class LLMTracerMixin:
             result = await original_func(*args, **kwargs)
 
             # Calculate resource usage
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # Extract token usage and calculate cost
             model_name = extract_model_name(args, kwargs, result)
+            is_stream = False
             if 'stream' in kwargs:
                 stream = kwargs['stream']
                 if stream:
-                    prompt_messages = kwargs['messages']
-                    # Create response message for streaming case
-                    response_message = {"role": "assistant", "content": result} if result else {"role": "assistant",
-                                                                                                "content": ""}
-                    token_usage = num_tokens_from_messages(model_name, prompt_messages, response_message)
+                    token_usage, is_stream = self._streamed_token_usage(model_name, kwargs['messages'], result)
                 else:
                     token_usage = extract_token_usage(result)
             else:
                 token_usage = extract_token_usage(result)
             cost = calculate_llm_cost(token_usage, model_name, self.model_costs, self.model_custom_cost)
+            if is_stream:
+                result = self._count_stream_tokens(result, model_name, token_usage, cost)
             parameters = extract_parameters(kwargs)
             input_data = extract_input_data(args, kwargs, result)
 
@@ -827,7 +824,7 @@ class LLMTracerMixin:
                 name=name,
                 llm_type="unknown",
                 version=None,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 start_time=start_time,
                 input_data=extract_input_data(args, kwargs, None),
                 output_data=None,
@@ -856,7 +853,7 @@ class LLMTracerMixin:
         self.start_component(component_id)
 
         # Calculate resource usage
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(self.current_llm_call_name.get())
 
         try:
             # Execute the function
@@ -865,25 +862,23 @@ class LLMTracerMixin:
             else:
                 result = original_func(*args, **kwargs)
 
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # Extract token usage and calculate cost
             model_name = extract_model_name(args, kwargs, result)
 
+            is_stream = False
             if 'stream' in kwargs:
                 stream = kwargs['stream']
                 if stream:
-                    prompt_messages = kwargs['messages']
-                    # Create response message for streaming case
-                    response_message = {"role": "assistant", "content": result} if result else {"role": "assistant",
-                                                                                                "content": ""}
-                    token_usage = num_tokens_from_messages(model_name, prompt_messages, response_message)
+                    token_usage, is_stream = self._streamed_token_usage(model_name, kwargs['messages'], result)
                 else:
                     token_usage = extract_token_usage(result)
             else:
                 token_usage = extract_token_usage(result)
             cost = calculate_llm_cost(token_usage, model_name, self.model_costs, self.model_custom_cost)
+            if is_stream:
+                result = self._count_stream_tokens(result, model_name, token_usage, cost)
             parameters = extract_parameters(kwargs)
             input_data = extract_input_data(args, kwargs, result)
 
@@ -929,8 +924,7 @@ class LLMTracerMixin:
             if name is None:
                 name = original_func.__name__
 
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             llm_component = self.create_llm_component(
                 component_id=component_id,
@@ -958,7 +952,6 @@ class LLMTracerMixin:
             feedback: Optional[Any] = None,
     ):
 
-        start_memory = psutil.Process().memory_info().rss
         start_time = datetime.now().astimezone().isoformat()
 
         if name not in self.span_attributes_dict:
@@ -1005,6 +998,7 @@ class LLMTracerMixin:
                 component_id = str(uuid.uuid4())
                 parent_agent_id = self.current_agent_id.get()
                 self.start_component(component_id)
+                memory_sample = self.memory_tracker.start(name)
 
                 error_info = None
                 result = None
@@ -1023,8 +1017,7 @@ class LLMTracerMixin:
                     # End tracking network calls for this component
                     self.end_component(component_id)
 
-                    end_memory = psutil.Process().memory_info().rss
-                    memory_used = max(0, end_memory - start_memory)
+                    memory_used = self.memory_tracker.stop(memory_sample)
 
                     llm_component = self.create_llm_component(
                         component_id=component_id,
@@ -1043,7 +1036,7 @@ class LLMTracerMixin:
 
                     raise
                 finally:
-
+                    self.memory_tracker.stop(memory_sample)
                     llm_component = self.llm_data
                     if (name is not None) or (name != ""):
                         llm_component["name"] = name
@@ -1073,6 +1066,10 @@ class LLMTracerMixin:
                             metric["name"] = metric_name
                             metrics.append(metric)
                     llm_component["metrics"] = metrics
+                    # Read the interaction bucket before add_component releases it
+                    llm_component["interactions"] = self.component_user_interaction.get(
+                        component_id, []
+                    )
                     if parent_agent_id:
                         children = self.agent_children.get()
                         children.append(llm_component)
@@ -1080,9 +1077,6 @@ class LLMTracerMixin:
                     else:
                         self.add_component(llm_component)
 
-                    llm_component["interactions"] = self.component_user_interaction.get(
-                        component_id, []
-                    )
                     self.add_component(llm_component)
 
             @functools.wraps(func)
@@ -1098,6 +1092,7 @@ class LLMTracerMixin:
                 component_id = str(uuid.uuid4())
                 parent_agent_id = self.current_agent_id.get()
                 self.start_component(component_id)
+                memory_sample = self.memory_tracker.start(name)
 
                 start_time = datetime.now().astimezone().isoformat()
                 error_info = None
@@ -1117,8 +1112,7 @@ class LLMTracerMixin:
                     # End tracking network calls for this component
                     self.end_component(component_id)
 
-                    end_memory = psutil.Process().memory_info().rss
-                    memory_used = max(0, end_memory - start_memory)
+                    memory_used = self.memory_tracker.stop(memory_sample)
 
                     llm_component = self.create_llm_component(
                         component_id=component_id,
@@ -1137,6 +1131,7 @@ class LLMTracerMixin:
 
                     raise
                 finally:
+                    self.memory_tracker.stop(memory_sample)
                     llm_component = self.llm_data
                     if (name is not None) or (name != ""):
                         llm_component["name"] = name
@@ -1156,6 +1151,10 @@ class LLMTracerMixin:
                             metric["name"] = metric_name
                             metrics.append(metric)
                     llm_component["metrics"] = metrics
+                    # Read the interaction bucket before add_component releases it
+                    llm_component["interactions"] = self.component_user_interaction.get(
+                        component_id, []
+                    )
                     if parent_agent_id:
                         children = self.agent_children.get()
                         children.append(llm_component)
@@ -1163,9 +1162,6 @@ class LLMTracerMixin:
                     else:
                         self.add_component(llm_component)
 
-                    llm_component["interactions"] = self.component_user_interaction.get(
-                        component_id, []
-                    )
                     self.add_component(llm_component)
 
             return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
@@ -1173,10 +1169,7 @@ class LLMTracerMixin:
         return decorator
 
     def unpatch_llm_calls(self):
-        # Remove all patches
-        for obj, method_name, original_method in self.patches:
-            try:
-                setattr(obj, method_name, original_method)
-            except Exception as e:
-                print(f"Error unpatching {method_name}: {str(e)}")
-        self.patches = []
+        # Release this tracer's patches; methods nobody holds anymore are
+        # restored to exactly what they were before patching
+        self._llm_patched = False
+        llm_patches.release(self)
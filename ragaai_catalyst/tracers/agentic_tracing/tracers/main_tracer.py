@@ -8,12 +8,12 @@ import builtins
 from pathlib import Path
 import logging
 
-from .base import BaseTracer
+from .base import BaseTracer, span_content_digest
 from .llm_tracer import LLMTracerMixin
 from .tool_tracer import ToolTracerMixin
 from .agent_tracer import AgentTracerMixin
 from .network_tracer import NetworkTracer
-from .user_interaction_tracer import UserInteractionTracer
+from .user_interaction_tracer import UserInteractionTracer, MAX_FILE_CONTENT_CHARS
 from .custom_tracer import CustomTracerMixin
 from ..utils.span_attributes import SpanAttributes
 
@@ -50,7 +50,12 @@ class AgenticTracing(
 ):
     def __init__(self, user_detail, auto_instrumentation=None, timeout=120):
         # Initialize all parent classes
-        self.user_interaction_tracer = UserInteractionTracer()
+        self.user_interaction_tracer = UserInteractionTracer(
+            file_io_include=user_detail.get("file_io_include"),
+            file_io_exclude=user_detail.get("file_io_exclude"),
+            file_io_metadata_only=user_detail.get("file_io_metadata_only", False),
+            file_io_max_content=user_detail.get("file_io_max_content", MAX_FILE_CONTENT_CHARS),
+        )
         LLMTracerMixin.__init__(self)
         ToolTracerMixin.__init__(self)
         AgentTracerMixin.__init__(self)
@@ -72,7 +77,9 @@ class AgenticTracing(
         self.current_component_id = contextvars.ContextVar(
             "current_component_id", default=None
         )
-        self.network_tracer = NetworkTracer()
+        self.network_tracer = NetworkTracer(
+            capture_bodies=not user_detail.get("network_metadata_only", False)
+        )
 
         # Handle auto_instrumentation
         if auto_instrumentation is None:
@@ -117,31 +124,24 @@ class AgenticTracing(
         self.current_agent_id = contextvars.ContextVar("current_agent_id", default=None)
         self.agent_children = contextvars.ContextVar("agent_children", default=[])
         self.component_network_calls = {}  # Store network calls per component
-        self.component_user_interaction = {}
+        # Interactions are bucketed per component as they are recorded
+        self.component_user_interaction = self.user_interaction_tracer.component_interactions
 
 
     def start_component(self, component_id: str):
         """Start tracking network calls for a component"""
         self.component_network_calls[component_id] = []
-        self.network_tracer.network_calls = []  # Reset network calls
+        # Calls made in this thread/task go to the component's own collector
+        self.network_tracer.start_collecting(component_id)
         self.current_component_id.set(component_id)
         self.user_interaction_tracer.component_id.set(component_id)
 
     def end_component(self, component_id: str):
         """End tracking network calls for a component"""
         self.component_network_calls[component_id] = (
-            self.network_tracer.network_calls.copy()
+            self.network_tracer.stop_collecting(component_id)
         )
-        self.network_tracer.network_calls = []  # Reset for next component
-
-        # Store user interactions for the component
-        for interaction in self.user_interaction_tracer.interactions:
-            interaction_component_id = interaction.get("component_id")
-            if interaction_component_id not in self.component_user_interaction:
-                self.component_user_interaction[interaction_component_id] = []
-            if interaction not in self.component_user_interaction[interaction_component_id]:
-                self.component_user_interaction[interaction_component_id].append(interaction)
-                
+
         # Only reset component_id if it matches the current one
         # This ensures we don't reset a parent's component_id when a child component ends
         if self.current_component_id.get() == component_id:
@@ -192,7 +192,7 @@ class AgenticTracing(
             LLMTracerMixin.instrument_file_io_calls(self)
             AgentTracerMixin.instrument_file_io_calls(self)
             CustomTracerMixin.instrument_file_io_calls(self)
-            builtins.open = self.user_interaction_tracer.traced_open
+            self.user_interaction_tracer.start_file_tracing()
             
         if self.auto_instrument_llm:
             self.instrument_llm_calls()
@@ -212,10 +212,7 @@ class AgenticTracing(
             # Restore original print and input functions
             builtins.print = self.user_interaction_tracer.original_print
             builtins.input = self.user_interaction_tracer.original_input
-            builtins.open = self.user_interaction_tracer.original_open
-
-            # Calculate final metrics before stopping
-            self._calculate_final_metrics()
+            self.user_interaction_tracer.stop_file_tracing()
 
             # Deactivate network tracing
             self.network_tracer.deactivate_patches()
@@ -228,9 +225,14 @@ class AgenticTracing(
 
             # Cleanup
             self.unpatch_llm_calls()
-            self.user_interaction_tracer.interactions = []  # Clear interactions list
+            self.user_interaction_tracer.reset()  # Clear interaction buckets
             self.is_active = False
 
+    def _end_trace(self, code=None):
+        # Calculate final metrics before saving
+        self._calculate_final_metrics()
+        super()._end_trace(code=code)
+
     def _calculate_final_metrics(self):
         """Calculate total cost and tokens from all components"""
         total_cost = 0.0
@@ -240,10 +242,8 @@ class AgenticTracing(
 
         def process_component(component):
             nonlocal total_cost, total_tokens
-            # Convert component to dict if it's an object
-            comp_dict = (
-                component.__dict__ if hasattr(component, "__dict__") else component
-            )
+            # Components can be read like span dicts
+            comp_dict = component
 
             comp_id = comp_dict.get("id") or comp_dict.get("component_id")
             if comp_id in processed_components:
@@ -276,7 +276,7 @@ class AgenticTracing(
                         process_component(child)
 
         # Process all root components
-        for component in self.components:
+        for component in self.iter_components():
             process_component(component)
 
         # Update metadata in trace
@@ -359,6 +359,8 @@ class AgenticTracing(
 
         if component_data["type"] == "llm":
             component = LLMComponent(**filtered_data)
+            # Dedup key for _clean_trace, computed while the data is at hand
+            component._content_digest = span_content_digest(component.data)
         elif component_data["type"] == "agent":
             component = AgentComponent(**filtered_data)
         elif component_data["type"] == "tool":
@@ -377,8 +379,14 @@ class AgenticTracing(
             # Add component to the main trace
             super().add_component(component)
 
-        # Handle error case
-        if is_error and not self.current_agent_id.get():
+        # The component has read its interactions and network calls; release them
+        self.user_interaction_tracer.release_component(component_data.get("id"))
+        self.component_network_calls.pop(component_data.get("id"), None)
+        # Error paths may skip end_component; make sure the collector is detached
+        self.network_tracer.stop_collecting(component_data.get("id"))
+
+        # Handle error case; a trace_context() trace ends with its block instead
+        if is_error and not self.current_agent_id.get() and self._trace_context.get() is None:
             self.stop()
 
     def __enter__(self):
@@ -1,4 +1,5 @@
 from datetime import datetime
+import contextvars
 import socket
 from http.client import HTTPConnection, HTTPSConnection
 import aiohttp
@@ -7,9 +8,57 @@ import urllib
 import uuid
 
 
+def _header_size(headers):
+    """Approximate wire size of the headers ("Name: value\r\n" per header)"""
+    if not headers:
+        return 0
+    try:
+        return sum(len(str(k)) + len(str(v)) + 4 for k, v in headers.items())
+    except AttributeError:
+        return 0
+
+
+def _content_length(headers):
+    if not headers:
+        return None
+    try:
+        for key, value in headers.items():
+            if str(key).lower() == "content-length":
+                return int(value)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return None
+
+
+def _body_size(body):
+    """Body length in bytes without stringifying it, 0 when unknown"""
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, memoryview):
+        return body.nbytes
+    if isinstance(body, str):
+        return len(body) if body.isascii() else len(body.encode("utf-8", errors="ignore"))
+    # Form dicts, JSON payloads, files and generators have no known size here;
+    # their size is taken from Content-Length when the headers carry it
+    return 0
+
+
+def _message_size(headers, body):
+    content_length = _content_length(headers)
+    if content_length is None:
+        content_length = _body_size(body)
+    return _header_size(headers) + content_length
+
+
 class NetworkTracer:
-    def __init__(self):
-        self.network_calls = []
+    def __init__(self, capture_bodies=True):
+        # When False only metadata (url, method, status, timings, sizes, headers) is kept
+        self.capture_bodies = capture_bodies
+        # Collector list of the component running in the current thread/task
+        self._collector = contextvars.ContextVar("network_collector", default=None)
+        self._collectors = {}
         self.patches_applied = False  # Track whether patches are active
         # Store original functions for restoration
         self._original_urlopen = None
@@ -31,18 +80,28 @@ class NetworkTracer:
         request_body=None,
         response_body=None,
     ):
+        # Each component has its own list, so appends from other threads/tasks never interleave.
+        # Calls made outside of any traced component, such as the uploads, are not kept.
+        collector = self._collector.get()
+        if collector is None:
+            return
+
         duration = (
             (end_time - start_time).total_seconds() if start_time and end_time else None
         )
-        
-        # Calculate bytes sent/received from headers and body
-        bytes_sent = len(str(request_headers or "")) + len(str(request_body or ""))
-        bytes_received = len(str(response_headers or "")) + len(str(response_body or ""))
-        
+
+        # Calculate bytes sent/received from Content-Length or the actual body length
+        bytes_sent = _message_size(request_headers, request_body)
+        bytes_received = _message_size(response_headers, response_body)
+
+        if not self.capture_bodies:
+            request_body = None
+            response_body = None
+
         # Extract protocol from URL
         protocol = "https" if url.startswith("https") else "http"
-            
-        self.network_calls.append(
+
+        collector.append(
             {
                 "url": url,
                 "method": method,
@@ -67,6 +126,28 @@ class NetworkTracer:
             }
         )
 
+    def start_collecting(self, component_id):
+        """Route network calls made in the current context to a new collector for `component_id`"""
+        collector = []
+        token = self._collector.set(collector)
+        self._collectors[component_id] = (collector, token)
+        return collector
+
+    def stop_collecting(self, component_id):
+        """Detach the collector of `component_id`, restore the enclosing one and return its calls"""
+        entry = self._collectors.pop(component_id, None)
+        if entry is None:
+            return []
+        collector, token = entry
+        if self._collector.get() is collector:
+            try:
+                self._collector.reset(token)
+            except ValueError:
+                # Ended from a different context than it was started in
+                previous = token.old_value
+                self._collector.set(None if previous is contextvars.Token.MISSING else previous)
+        return collector
+
     def activate_patches(self):
         if not self.patches_applied:
             # Apply monkey patches and store originals
@@ -87,7 +168,7 @@ class NetworkTracer:
                 self._original_http_request, self._original_https_request
             )
             restore_socket(self._original_socket_create_connection)
-            self.network_calls = []
+            self._collectors.clear()
             self.patches_applied = False
 
 
@@ -118,7 +199,11 @@ def monkey_patch_urllib(network_tracer):
                 request_headers=dict(response.request.headers),
                 response_headers=dict(response.headers),
                 request_body=data,
-                response_body=response.read().decode("utf-8", errors="ignore"),
+                response_body=(
+                    response.read().decode("utf-8", errors="ignore")
+                    if network_tracer.capture_bodies
+                    else None
+                ),
             )
             return response
         except Exception as e:
@@ -156,8 +241,12 @@ def monkey_patch_requests(network_tracer):
                 end_time=end_time,
                 request_headers=dict(response.request.headers),
                 response_headers=dict(response.headers),
-                request_body=kwargs.get("data") or kwargs.get("json"),
-                response_body=response.text,
+                request_body=(
+                    kwargs.get("data") or kwargs.get("json")
+                    if network_tracer.capture_bodies
+                    else response.request.body
+                ),
+                response_body=response.text if network_tracer.capture_bodies else None,
             )
             return response
         except Exception as e:
@@ -204,7 +293,11 @@ def monkey_patch_http_client(network_tracer):
                 request_headers=headers,
                 response_headers=dict(response.headers),
                 request_body=body,
-                response_body=response.read().decode("utf-8", errors="ignore"),
+                response_body=(
+                    response.read().decode("utf-8", errors="ignore")
+                    if network_tracer.capture_bodies
+                    else None
+                ),
             )
             return result
         except Exception as e:
@@ -278,8 +371,8 @@ async def patch_aiohttp_trace_config(network_tracer):
             end_time=end_time,
             request_headers=dict(params.headers),
             response_headers=dict(response.headers),
-            request_body=await params.response.text(),
-            response_body=await response.text(),
+            request_body=await params.response.text() if network_tracer.capture_bodies else None,
+            response_body=await response.text() if network_tracer.capture_bodies else None,
         )
 
     trace_config = aiohttp.TraceConfig()
@@ -1,8 +1,6 @@
 import os
 import uuid
 from datetime import datetime
-from langchain_core.tools import tool
-import psutil
 import functools
 from typing import Optional, Any, Dict, List
 
@@ -294,7 +292,7 @@ class ToolTracerMixin:
             return func(*args, **kwargs)
 
         start_time = datetime.now().astimezone()
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(name)
         component_id = str(uuid.uuid4())
         hash_id = generate_unique_hash_simple(func)
 
@@ -310,8 +308,7 @@ class ToolTracerMixin:
             result = func(*args, **kwargs)
 
             # Calculate resource usage
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
 
             # End tracking network calls for this component
             self.end_component(component_id)
@@ -350,7 +347,7 @@ class ToolTracerMixin:
                 name=name,
                 tool_type=tool_type,
                 version=version,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 start_time=start_time,
                 input_data=self._sanitize_input(args, kwargs),
                 output_data=None,
@@ -378,7 +375,7 @@ class ToolTracerMixin:
             return await func(*args, **kwargs)
 
         start_time = datetime.now().astimezone()
-        start_memory = psutil.Process().memory_info().rss
+        memory_sample = self.memory_tracker.start(name)
         component_id = str(uuid.uuid4())
         hash_id = generate_unique_hash_simple(func)
 
@@ -392,8 +389,7 @@ class ToolTracerMixin:
             result = await func(*args, **kwargs)
 
             # Calculate resource usage
-            end_memory = psutil.Process().memory_info().rss
-            memory_used = max(0, end_memory - start_memory)
+            memory_used = self.memory_tracker.stop(memory_sample)
             self.end_component(component_id)
 
             # Create tool component
@@ -427,7 +423,7 @@ class ToolTracerMixin:
                 tool_type=tool_type,
                 version=version,
                 start_time=start_time,
-                memory_used=0,
+                memory_used=self.memory_tracker.stop(memory_sample),
                 input_data=self._sanitize_input(args, kwargs),
                 output_data=None,
                 error=error_component,
@@ -482,9 +478,7 @@ class ToolTracerMixin:
                 metric["name"] = metric_name  
                 metrics.append(metric)
 
-        formatted_metrics = BaseTracer.get_formatted_metric(self.span_attributes_dict, self.project_id, name)
-        if formatted_metrics:
-            metrics.extend(formatted_metrics)
+        self.queue_span_metrics(name, metrics)
 
         start_time = kwargs["start_time"]
         component = {
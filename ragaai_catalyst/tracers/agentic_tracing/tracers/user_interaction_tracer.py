@@ -1,28 +1,126 @@
 import builtins
 from datetime import datetime
 import contextvars
+import fnmatch
 import inspect
+import os
+import re
+import threading
 import uuid
-from typing import Optional, Any
+from typing import Optional, Any, Iterable
+
+# Paths containing one of these are never traced: installed packages and OS files
+SYSTEM_PATHS = (
+    'site-packages',
+    'dist-packages',
+    '/proc/',
+    '/sys/',
+    '/var/lib/',
+    '/usr/lib/',
+    '/System/Library'
+)
+
+# Default cap on the file content kept per interaction
+MAX_FILE_CONTENT_CHARS = 64 * 1024
+
+# Tracer whose traced_open handles open() calls made in the current context
+_active_file_tracer = contextvars.ContextVar("active_file_tracer", default=None)
+
+_open_patch_lock = threading.Lock()
+_open_patch_count = 0
+_unpatched_open = builtins.open
+
+
+def _dispatch_open(file, mode='r', *args, **kwargs):
+    """builtins.open replacement; only contexts with an active file tracer are traced"""
+    tracer = _active_file_tracer.get()
+    if tracer is None:
+        return _unpatched_open(file, mode, *args, **kwargs)
+    return tracer.traced_open(file, mode, *args, **kwargs)
+
+
+def _install_open_patch():
+    global _open_patch_count, _unpatched_open
+    with _open_patch_lock:
+        if _open_patch_count == 0 and builtins.open is not _dispatch_open:
+            _unpatched_open = builtins.open
+            builtins.open = _dispatch_open
+        _open_patch_count += 1
+
+
+def _uninstall_open_patch():
+    global _open_patch_count
+    with _open_patch_lock:
+        _open_patch_count = max(_open_patch_count - 1, 0)
+        if _open_patch_count == 0 and builtins.open is _dispatch_open:
+            builtins.open = _unpatched_open
+
+
+def _compile_globs(patterns: Optional[Iterable[str]]):
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+class FilePathMatcher:
+    """
+    Decides whether file accesses to a path are traced.
+
+    `include` and `exclude` are glob patterns matched against the path as it
+    was passed to open(). A path is traced when it does not contain one of the
+    system paths, matches no exclude pattern and, when include patterns are
+    given, matches one of them. Decisions are cached per path.
+    """
+
+    MAX_CACHED_PATHS = 4096
+
+    def __init__(self, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None):
+        self._system = re.compile("|".join(re.escape(path) for path in SYSTEM_PATHS))
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+        self._decisions = {}
+
+    def __call__(self, path: str) -> bool:
+        decision = self._decisions.get(path)
+        if decision is None:
+            decision = self._decide(path)
+            if len(self._decisions) >= self.MAX_CACHED_PATHS:
+                self._decisions.clear()
+            self._decisions[path] = decision
+        return decision
+
+    def _decide(self, path: str) -> bool:
+        if self._system.search(path):
+            return False
+        if self._exclude is not None and self._exclude.match(path):
+            return False
+        return self._include is None or self._include.match(path) is not None
+
 
 class TracedFile:
-    def __init__(self, file_obj, file_path: str, tracer):
+    def __init__(self, file_obj, file_path: str, tracer, mode: str = 'r'):
         self._file = file_obj
         self._file_path = file_path
         self._tracer = tracer
+        self._mode = mode
 
     def write(self, content: str) -> int:
-        self._tracer.trace_file_operation("write", self._file_path, content=content)
+        self._tracer.trace_file_operation("write", self._file_path, content=content, mode=self._mode)
         return self._file.write(content)
 
     def read(self, size: Optional[int] = None) -> str:
         content = self._file.read() if size is None else self._file.read(size)
-        self._tracer.trace_file_operation("read", self._file_path, content=content)
+        self._tracer.trace_file_operation("read", self._file_path, content=content, mode=self._mode)
         return content
 
     def close(self) -> None:
         return self._file.close()
 
+    def __iter__(self):
+        return iter(self._file)
+
     def __enter__(self):
         return self
 
@@ -34,15 +132,45 @@ class TracedFile:
         return getattr(self._file, name)
 
 class UserInteractionTracer:
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, file_io_include=None, file_io_exclude=None, file_io_metadata_only=False,
+                 file_io_max_content=MAX_FILE_CONTENT_CHARS, **kwargs):
         self.project_id = contextvars.ContextVar("project_id", default=None)
         self.trace_id = contextvars.ContextVar("trace_id", default=None)
         self.tracer = contextvars.ContextVar("tracer", default=None)
         self.component_id = contextvars.ContextVar("component_id", default=None)
         self.original_input = builtins.input
         self.original_print = builtins.print
-        self.original_open = builtins.open
-        self.interactions = []
+        self.original_open = _unpatched_open if builtins.open is _dispatch_open else builtins.open
+        # File IO tracing options
+        self.file_path_matcher = FilePathMatcher(file_io_include, file_io_exclude)
+        self.file_io_metadata_only = file_io_metadata_only
+        self.file_io_max_content = file_io_max_content
+        self._file_tracing_token = None
+        # Interactions bucketed by the component that was active when they were recorded
+        self.component_interactions = {}
+
+    @property
+    def interactions(self):
+        """All recorded interactions that have not been released yet"""
+        return [
+            interaction
+            for bucket in self.component_interactions.values()
+            for interaction in bucket
+        ]
+
+    def _record(self, interaction):
+        bucket = self.component_interactions.get(interaction["component_id"])
+        if bucket is None:
+            bucket = self.component_interactions[interaction["component_id"]] = []
+        bucket.append(interaction)
+
+    def release_component(self, component_id):
+        """Drop the bucket of a finished component once it has been read"""
+        return self.component_interactions.pop(component_id, [])
+
+    def reset(self):
+        """Drop all recorded interactions"""
+        self.component_interactions.clear()
 
     def traced_input(self, prompt=""):
         # Get caller information
@@ -53,7 +181,7 @@ class UserInteractionTracer:
         except EOFError:
             content = ""  # Return empty string on EOF
             
-        self.interactions.append({
+        self._record({
             "id": str(uuid.uuid4()),
             "component_id": self.component_id.get(),
             "interaction_type": "input",
@@ -65,7 +193,7 @@ class UserInteractionTracer:
     def traced_print(self, *args, **kwargs):
         content = " ".join(str(arg) for arg in args)
         
-        self.interactions.append({
+        self._record({
             "id": str(uuid.uuid4()),
             "component_id": self.component_id.get(),
             "interaction_type": "output",
@@ -75,55 +203,83 @@ class UserInteractionTracer:
         return self.original_print(*args, **kwargs)
 
     def traced_open(self, file: str, mode: str = 'r', *args, **kwargs):
-        # Skip tracing for system and virtual environment paths
-        system_paths = [
-            'site-packages',
-            'dist-packages',
-            '/proc/',
-            '/sys/',
-            '/var/lib/',
-            '/usr/lib/',
-            '/System/Library'
-        ]
-        
-        file_str = str(file)
-        if any(path in file_str for path in system_paths):
-            return self.original_open(file, mode, *args, **kwargs)
-            
         file_obj = self.original_open(file, mode, *args, **kwargs)
-        return TracedFile(file_obj, file, self)
+
+        # Skip tracing for system and virtual environment paths, and filtered paths
+        file_str = os.fspath(file) if isinstance(file, os.PathLike) else file
+        if not isinstance(file_str, str):
+            file_str = str(file_str)
+        if not self.file_path_matcher(file_str):
+            return file_obj
+        return TracedFile(file_obj, file, self, mode)
+
+    def start_file_tracing(self):
+        """Trace open() calls made in the current context, and in tasks started from it"""
+        _install_open_patch()
+        self._file_tracing_token = _active_file_tracer.set(self)
+
+    def stop_file_tracing(self):
+        token, self._file_tracing_token = self._file_tracing_token, None
+        if token is not None:
+            try:
+                _active_file_tracer.reset(token)
+            except ValueError:
+                # Stopped from another context than the one tracing was started in
+                _active_file_tracer.set(None)
+            _uninstall_open_patch()
+
+    def _cap_content(self, content):
+        if self.file_io_max_content is not None and len(content) > self.file_io_max_content:
+            return content[:self.file_io_max_content], True
+        return content, False
 
     def trace_file_operation(self, operation: str, file_path: str, **kwargs):
         interaction_type = f"file_{operation}"
-        
+        component_id = self.component_id.get()
+
+        content = kwargs.pop("content", None)
+        if content is not None:
+            kwargs["size"] = len(content)
+            if not self.file_io_metadata_only:
+                kwargs["content"], truncated = self._cap_content(content)
+                if truncated:
+                    kwargs["truncated"] = True
+
         # Check for existing interaction with same file_path and operation
-        for existing in reversed(self.interactions):
+        for existing in reversed(self.component_interactions.get(component_id, [])):
             if (existing.get("file_path") == file_path and 
                 existing.get("interaction_type") == interaction_type):
-                # Merge content if it exists
+                # Merge content if it exists, or only the size in metadata-only mode
                 if "content" in kwargs and "content" in existing:
-                    existing["content"] += kwargs["content"]
+                    existing["size"] = existing.get("size", 0) + kwargs["size"]
+                    if not existing.get("truncated"):
+                        existing["content"], truncated = self._cap_content(existing["content"] + kwargs["content"])
+                        if truncated or kwargs.get("truncated"):
+                            existing["truncated"] = True
+                    return
+                if "size" in kwargs and "size" in existing and "content" not in existing:
+                    existing["size"] += kwargs["size"]
                     return
                 break
         
         # If no matching interaction found or couldn't merge, create new one
         interaction = {
             "id": str(uuid.uuid4()),
-            "component_id": self.component_id.get(),
+            "component_id": component_id,
             "interaction_type": interaction_type,
             "file_path": file_path,
             "timestamp": datetime.now().astimezone().isoformat()
         }
         interaction.update(kwargs)
-        self.interactions.append(interaction)
+        self._record(interaction)
 
     def __enter__(self):
         builtins.input = self.traced_input
         builtins.print = self.traced_print
-        builtins.open = self.traced_open
+        self.start_file_tracing()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         builtins.input = self.original_input
         builtins.print = self.original_print
-        builtins.open = self.original_open
+        self.stop_file_tracing()
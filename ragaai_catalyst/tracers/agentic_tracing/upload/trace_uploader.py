@@ -6,7 +6,10 @@ import os
 import sys
 import json
 import time
+import uuid
 import signal
+import threading
+import subprocess
 import logging
 import argparse
 import tempfile
@@ -20,6 +23,11 @@ from logging.handlers import RotatingFileHandler
 import concurrent.futures
 from typing import Dict, Any, Optional
 
+try:
+    import fcntl
+except ImportError:  # Windows: the shared uploader is not available
+    fcntl = None
+
 # Set up logging
 log_dir = os.path.join(tempfile.gettempdir(), "ragaai_logs")
 os.makedirs(log_dir, exist_ok=True)
@@ -48,6 +56,7 @@ try:
     from ragaai_catalyst.tracers.agentic_tracing.upload.upload_trace_metric import upload_trace_metric
     from ragaai_catalyst.tracers.agentic_tracing.utils.create_dataset_schema import create_dataset_schema_with_trace
     from ragaai_catalyst import RagaAICatalyst
+    from ragaai_catalyst.name_resolver import name_resolver
     IMPORTS_AVAILABLE = True
 except ImportError:
     logger.warning("RagaAI Catalyst imports not available - running in test mode")
@@ -63,18 +72,71 @@ STATUS_PROCESSING = "processing"
 STATUS_COMPLETED = "completed"
 STATUS_FAILED = "failed"
 
+# Shared uploader settings, read from the environment
+SHARED_UPLOADER_ENV = "RAGAAI_CATALYST_SHARED_UPLOADER"  # "1" to hand traces to the shared uploader process
+UPLOADER_DIR_ENV = "RAGAAI_CATALYST_UPLOADER_DIR"  # Spool directory, shared by the processes of one host
+UPLOAD_WORKERS_ENV = "RAGAAI_CATALYST_UPLOAD_WORKERS"  # Upload threads, 8 by default
+UPLOADS_PER_MINUTE_ENV = "RAGAAI_CATALYST_UPLOADS_PER_MINUTE"  # Uploads started per minute, unlimited by default
+
+# The shared uploader exits after this many seconds without tasks; workers start it again when needed
+DAEMON_IDLE_TIMEOUT = 300
+# Minimum seconds between attempts of one process to start the shared uploader
+SIDECAR_START_INTERVAL = 10
+
 # Global executor for handling uploads
 _executor = None
 # Dictionary to track futures and their associated task IDs
 _futures: Dict[str, Any] = {}
 
+# Code hashes uploaded by this process by (base_url, project, dataset, hash), and an
+# event set when the upload in progress for a hash has finished
+_code_uploads_lock = threading.Lock()
+_code_uploaded = set()
+_code_uploading: Dict[Any, threading.Event] = {}
+
+_sidecar_started_at = None
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={os.getenv(name)!r}")
+        return default
+
 def get_executor():
     """Get or create the thread pool executor"""
     global _executor
     if _executor is None:
-        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="trace_uploader")
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, _env_int(UPLOAD_WORKERS_ENV, 8)), thread_name_prefix="trace_uploader"
+        )
     return _executor
 
+def _claim_code_upload(key) -> bool:
+    """
+    True if the code hash still has to be uploaded; it then counts as in progress.
+
+    While another task uploads the hash this waits for the outcome, and claims
+    the upload itself if that one failed.
+    """
+    while True:
+        with _code_uploads_lock:
+            if key in _code_uploaded:
+                return False
+            in_progress = _code_uploading.get(key)
+            if in_progress is None:
+                _code_uploading[key] = threading.Event()
+                return True
+        in_progress.wait()
+
+def _finish_code_upload(key, uploaded: bool):
+    with _code_uploads_lock:
+        in_progress = _code_uploading.pop(key, None)
+        if uploaded:
+            _code_uploaded.add(key)
+    if in_progress is not None:
+        in_progress.set()
+
 def process_upload(task_id: str, filepath: str, hash_id: str, zip_path: str, 
                   project_name: str, project_id: str, dataset_name: str, 
                   user_details: Dict[str, Any], base_url: str, timeout=120) -> Dict[str, Any]:
@@ -125,7 +187,18 @@ def process_upload(task_id: str, filepath: str, hash_id: str, zip_path: str,
             result["status"] = STATUS_COMPLETED
             save_task_status(result)
             return result
-            
+
+        # A tracer created offline leaves the project lookup to the upload
+        if project_id is None:
+            project_id = name_resolver.project_id(project_name, timeout=timeout)
+            if project_id is None:
+                error_msg = f"Project not found: {project_name}"
+                logger.error(error_msg)
+                result["status"] = STATUS_FAILED
+                result["error"] = error_msg
+                save_task_status(result)
+                return result
+
         # Step 1: Create dataset schema
         logger.info(f"Creating dataset schema for {dataset_name} with base_url: {base_url} and timeout: {timeout}")
         try:
@@ -179,9 +252,13 @@ def process_upload(task_id: str, filepath: str, hash_id: str, zip_path: str,
         else:
             logger.warning(f"Trace file {filepath} not found, skipping traces upload")
         
-        # Step 4: Upload code hash
-        if hash_id and zip_path and os.path.exists(zip_path):
+        # Step 4: Upload code hash, once per dataset for all the tasks of this process
+        code_key = (base_url, project_name, dataset_name, hash_id)
+        if hash_id and zip_path and os.path.exists(zip_path) and not _claim_code_upload(code_key):
+            logger.info(f"Code hash {hash_id} already uploaded, skipping code upload")
+        elif hash_id and zip_path and os.path.exists(zip_path):
             logger.info(f"Uploading code hash {hash_id} with base_url: {base_url} and timeout: {timeout}")
+            uploaded = False
             try:
                 response = upload_code(
                     hash_id=hash_id,
@@ -191,9 +268,12 @@ def process_upload(task_id: str, filepath: str, hash_id: str, zip_path: str,
                     base_url=base_url,
                     timeout=timeout
                 )
+                uploaded = True
                 logger.info(f"Code hash uploaded: {response}")
             except Exception as e:
                 logger.error(f"Error uploading code hash: {e}")
+            finally:
+                _finish_code_upload(code_key, uploaded)
         else:
             logger.warning(f"Code zip {zip_path} not found, skipping code upload")
         
@@ -249,12 +329,8 @@ def submit_upload_task(filepath, hash_id, zip_path, project_name, project_id, da
     logger.debug(f"Using absolute filepath: {filepath}")
 
     # Generate a unique task ID
-    task_id = f"task_{int(time.time())}_{os.getpid()}_{hash(str(time.time()))}"
-    
-    # Submit the task to the executor
-    executor = get_executor()
-    future = executor.submit(
-        process_upload,
+    task_id = f"task_{int(time.time())}_{os.getpid()}_{uuid.uuid4().hex[:12]}"
+    task = dict(
         task_id=task_id,
         filepath=filepath,
         hash_id=hash_id,
@@ -266,10 +342,7 @@ def submit_upload_task(filepath, hash_id, zip_path, project_name, project_id, da
         base_url=base_url,
         timeout=timeout
     )
-    
-    # Store the future for later status checks
-    _futures[task_id] = future
-    
+
     # Create initial status
     initial_status = {
         "task_id": task_id,
@@ -277,6 +350,22 @@ def submit_upload_task(filepath, hash_id, zip_path, project_name, project_id, da
         "error": None,
         "start_time": datetime.now().isoformat()
     }
+
+    if shared_uploader_enabled():
+        # The shared uploader picks the task up from the spool and writes its status
+        save_task_status(initial_status)
+        _spool_task(task)
+        # After spooling, so that a shared uploader exiting right now is replaced
+        ensure_uploader_running()
+        return task_id
+
+    # Submit the task to the executor
+    executor = get_executor()
+    future = executor.submit(process_upload, **task)
+    
+    # Store the future for later status checks
+    _futures[task_id] = future
+    
     save_task_status(initial_status)
     
     return task_id
@@ -334,23 +423,178 @@ def shutdown():
 # Register shutdown handler
 atexit.register(shutdown)
 
+def shared_uploader_enabled() -> bool:
+    """Whether traces are handed to the shared uploader process instead of uploaded in this process"""
+    return os.getenv(SHARED_UPLOADER_ENV) == "1" and fcntl is not None
+
+def _spool_dirs():
+    """The spool directory and its pending and processing subdirectories, created if needed"""
+    spool_dir = os.getenv(UPLOADER_DIR_ENV) or os.path.join(QUEUE_DIR, "spool")
+    pending = os.path.join(spool_dir, "pending")
+    processing = os.path.join(spool_dir, "processing")
+    for directory in (pending, processing):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    return spool_dir, pending, processing
+
+def _spool_task(task: Dict[str, Any]):
+    """Queue a task for the shared uploader; the rename makes it appear complete or not at all"""
+    _, pending, _ = _spool_dirs()
+    path = os.path.join(pending, f"{task['task_id']}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(task, f, default=str)
+    os.replace(path + ".tmp", path)
+
+def _try_daemon_lock(spool_dir):
+    """The shared uploader's lock file, locked, or None if another process holds it"""
+    lock_file = open(os.path.join(spool_dir, "uploader.lock"), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+def _start_sidecar():
+    """Start the shared uploader in its own session, so it outlives this worker"""
+    global _sidecar_started_at
+    now = time.monotonic()
+    if _sidecar_started_at is not None and now - _sidecar_started_at < SIDECAR_START_INTERVAL:
+        return
+    _sidecar_started_at = now
+    logger.info("Starting shared trace uploader")
+    subprocess.Popen(
+        [sys.executable, "-m", "ragaai_catalyst.tracers.agentic_tracing.upload.trace_uploader", "--daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+class _RateLimiter:
+    """Spaces out calls to `acquire` to at most `per_minute` a minute; 0 means unlimited"""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.next_at = 0.0
+
+    def acquire(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+def _claim_spooled_tasks(pending, processing):
+    """Move the pending tasks to processing, oldest first, and return their new paths"""
+    claimed = []
+    names = [name for name in os.listdir(pending) if name.endswith(".json")]
+    for name in sorted(names, key=lambda name: os.path.getmtime(os.path.join(pending, name))):
+        target = os.path.join(processing, name)
+        try:
+            os.replace(os.path.join(pending, name), target)
+        except OSError:
+            continue
+        claimed.append(target)
+    return claimed
+
+def _run_spooled_task(path):
+    try:
+        with open(path) as f:
+            task = json.load(f)
+        process_upload(**task)
+    except Exception as e:
+        logger.error(f"Error processing spooled task {path}: {e}")
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
 # For backward compatibility
 def ensure_uploader_running():
     """
     Ensure the uploader is running.
-    This is a no-op in the futures implementation, but kept for API compatibility.
+
+    With RAGAAI_CATALYST_SHARED_UPLOADER=1, this starts the shared uploader process
+    unless one is already running for the spool directory. Otherwise uploads run
+    in this process and only the executor is created.
     """
-    get_executor()  # Just ensure the executor is created
+    if not shared_uploader_enabled():
+        get_executor()  # Just ensure the executor is created
+        return True
+
+    spool_dir, _, _ = _spool_dirs()
+    lock_file = _try_daemon_lock(spool_dir)
+    if lock_file is not None:
+        # Nobody holds the lock, so no shared uploader is running
+        lock_file.close()
+        _start_sidecar()
     return True
 
-# For backward compatibility with the old daemon mode
-def run_daemon():
+def run_daemon(poll_interval=1.0, idle_timeout=DAEMON_IDLE_TIMEOUT):
     """
-    Run the uploader as a daemon process.
-    This is a no-op in the futures implementation, but kept for API compatibility.
+    Run the shared uploader, which uploads the traces spooled by every worker process.
+
+    Only one shared uploader runs per spool directory; it holds a lock on the
+    directory and any other returns right away. Code hashes are uploaded once for
+    all workers, at most RAGAAI_CATALYST_UPLOAD_WORKERS uploads run at a time and
+    RAGAAI_CATALYST_UPLOADS_PER_MINUTE limits how many start each minute.
+
+    Args:
+        poll_interval: Seconds between checks of the spool directory
+        idle_timeout: Exit after this many seconds without tasks; None to run until killed
     """
-    logger.info("Daemon mode not needed in futures implementation")
-    return
+    if fcntl is None:
+        logger.warning("The shared uploader needs fcntl and is not available on this platform")
+        return
+
+    spool_dir, pending, processing = _spool_dirs()
+    lock_file = _try_daemon_lock(spool_dir)
+    if lock_file is None:
+        logger.info("Shared uploader already running")
+        return
+
+    logger.info(f"Shared uploader started for {spool_dir}")
+    try:
+        while lock_file is not None:
+            try:
+                _serve_spool(pending, processing, poll_interval, idle_timeout)
+            finally:
+                lock_file.close()
+            # A task spooled while this uploader was exiting found the lock still
+            # held and started no other uploader, so take it on again
+            if not any(name.endswith(".json") for name in os.listdir(pending)):
+                break
+            lock_file = _try_daemon_lock(spool_dir)
+    finally:
+        shutdown()
+
+def _serve_spool(pending, processing, poll_interval, idle_timeout):
+    """Upload spooled tasks until idle for `idle_timeout` seconds; the caller holds the lock"""
+    # Tasks claimed by a shared uploader that stopped before finishing them
+    for name in os.listdir(processing):
+        os.replace(os.path.join(processing, name), os.path.join(pending, name))
+
+    limiter = _RateLimiter(_env_int(UPLOADS_PER_MINUTE_ENV, 0))
+    executor = get_executor()
+    in_flight = set()
+    last_active = time.monotonic()
+    while True:
+        claimed = _claim_spooled_tasks(pending, processing)
+        for path in claimed:
+            limiter.acquire()
+            future = executor.submit(_run_spooled_task, path)
+            in_flight.add(future)
+            future.add_done_callback(in_flight.discard)
+
+        if claimed or in_flight:
+            last_active = time.monotonic()
+        elif idle_timeout is not None and time.monotonic() - last_active > idle_timeout:
+            logger.info("Shared uploader idle, exiting")
+            return
+        time.sleep(poll_interval)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Trace uploader process")
@@ -358,6 +602,6 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     if args.daemon:
-        logger.info("Daemon mode not needed in futures implementation")
+        run_daemon()
     else:
-        logger.info("Interactive mode not needed in futures implementation")
\ No newline at end of file
+        logger.info("Interactive mode not needed in futures implementation")
@@ -12,56 +12,62 @@ logging_level = (
 )
 
 
-def calculate_metric(project_id, metric_name, model, provider, **kwargs):
+def _metric_request(metric_name, model, provider, **kwargs):
+    """One entry of the calculate-metric `data` list"""
     user_id = "1"
     org_domain = "raga"
 
+    return {
+        "metric_name": metric_name,
+        "metric_config": {
+            "threshold": {
+                "isEditable": True,
+                "lte": 0.3
+            },
+            "model": model,
+            "orgDomain": org_domain,
+            "provider": provider,
+            "user_id": user_id,
+            "job_id": 1,
+            "metric_name": metric_name,
+            "request_id": 1
+        },
+        "variable_mapping": kwargs,
+        "trace_object": {
+            "Data": {
+                "DocId": "doc-1",
+                "Prompt": kwargs.get("prompt"),
+                "Response": kwargs.get("response"),
+                "Context": kwargs.get("context"),
+                "ExpectedResponse": kwargs.get("expected_response"),
+                "ExpectedContext": kwargs.get("expected_context"),
+                "Chat": kwargs.get("chat"),
+                "Instructions": kwargs.get("instructions"),
+                "SystemPrompt": kwargs.get("system_prompt"),
+                "Text": kwargs.get("text")
+            },
+            "claims": {},
+            "last_computed_metrics": {
+                metric_name: {
+                }
+            }
+        }
+    }
+
+
+def calculate_metrics(project_id, metric_requests):
+    """Calculate several metrics with a single calculate-metric request.
+
+    `metric_requests` is a list of entries built by `_metric_request`; the
+    results are returned in the same order under `data.data`.
+    """
     headers = {
         "Authorization": f"Bearer {os.getenv('RAGAAI_CATALYST_TOKEN')}",
         "X-Project-Id": str(project_id),
         "Content-Type": "application/json"
     }
 
-    payload = {
-        "data": [
-            {
-                "metric_name": metric_name,
-                "metric_config": {
-                    "threshold": {
-                        "isEditable": True,
-                        "lte": 0.3
-                    },
-                    "model": model,
-                    "orgDomain": org_domain,
-                    "provider": provider,
-                    "user_id": user_id,
-                    "job_id": 1,
-                    "metric_name": metric_name,
-                    "request_id": 1
-                },
-                "variable_mapping": kwargs,
-                "trace_object": {
-                    "Data": {
-                        "DocId": "doc-1",
-                        "Prompt": kwargs.get("prompt"),
-                        "Response": kwargs.get("response"),
-                        "Context": kwargs.get("context"),
-                        "ExpectedResponse": kwargs.get("expected_response"),
-                        "ExpectedContext": kwargs.get("expected_context"),
-                        "Chat": kwargs.get("chat"),
-                        "Instructions": kwargs.get("instructions"),
-                        "SystemPrompt": kwargs.get("system_prompt"),
-                        "Text": kwargs.get("text")
-                    },
-                    "claims": {},
-                    "last_computed_metrics": {
-                        metric_name: {
-                        }
-                    }
-                }
-            }
-        ]
-    }
+    payload = {"data": list(metric_requests)}
 
     try:
         BASE_URL = RagaAICatalyst.BASE_URL
@@ -72,3 +78,7 @@ def calculate_metric(project_id, metric_name, model, provider, **kwargs):
     except requests.exceptions.RequestException as e:
         logger.debug(f"Error in calculate-metric api: {e}, payload: {payload}")
         raise Exception(f"Error in calculate-metric: {e}")
+
+
+def calculate_metric(project_id, metric_name, model, provider, **kwargs):
+    return calculate_metrics(project_id, [_metric_request(metric_name, model, provider, **kwargs)])
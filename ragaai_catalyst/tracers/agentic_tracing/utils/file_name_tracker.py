@@ -1,6 +1,53 @@
+import sys
 import inspect
+import weakref
 from functools import wraps
 
+# Resolved file name per code object, so each call site is resolved only once;
+# weak keys, so code that is no longer referenced elsewhere is not kept alive
+_code_file_names = weakref.WeakKeyDictionary()
+
+# Notebook detection is done once per process; the IPython config does not change
+_notebook_checked = False
+_running_in_notebook = False
+_notebook_name = None
+
+
+def _in_notebook():
+    global _notebook_checked, _running_in_notebook
+    if not _notebook_checked:
+        try:
+            from IPython import get_ipython
+            _running_in_notebook = 'IPKernelApp' in get_ipython().config
+        except Exception:
+            _running_in_notebook = False
+        _notebook_checked = True
+    return _running_in_notebook
+
+
+def _code_file_name(code):
+    """Same result as inspect.stack()[n].filename, resolved once per code object"""
+    file_name = _code_file_names.get(code)
+    if file_name is None:
+        try:
+            file_name = inspect.getsourcefile(code) or inspect.getfile(code)
+        except TypeError:
+            file_name = code.co_filename
+        _code_file_names[code] = file_name
+    return file_name
+
+
+def _caller_frame(depth):
+    """Frame `depth` levels above the caller of this function, or the outermost one"""
+    try:
+        return sys._getframe(depth + 1)
+    except ValueError:
+        frame = sys._getframe(1)
+        while frame.f_back is not None:
+            frame = frame.f_back
+        return frame
+
+
 class TrackName:
     def __init__(self):
         self.files = set()  # To store unique filenames
@@ -13,7 +60,7 @@ class TrackName:
 
             return func(*args, **kwargs)
         return wrapper
-    
+
     def trace_wrapper(self, func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -21,49 +68,46 @@ class TrackName:
             self.files.add(file_name)
             return func(*args, **kwargs)
         return wrapper
-    
+
     def _get_wrapped_file_name(self):
-        try:
-            from IPython import get_ipython
-            if 'IPKernelApp' in get_ipython().config:
-                return self._get_notebook_name()
-        except Exception:
-            pass
+        if _in_notebook():
+            return self._get_notebook_name()
 
-        frame = inspect.stack()[4]
-        return frame.filename
+        # Same frame as inspect.stack()[4], without building the whole stack
+        return _code_file_name(_caller_frame(4).f_code)
 
     def _get_decorated_file_name(self):
         # Check if running in a Jupyter notebook
-        try:
-            from IPython import get_ipython
-            if 'IPKernelApp' in get_ipython().config:
-                return self._get_notebook_name()
-        except Exception:
-            pass
+        if _in_notebook():
+            return self._get_notebook_name()
 
-        # Default to the filename from the stack
-        frame = inspect.stack()[2]
-        return frame.filename
+        # Default to the filename of the frame calling the decorated function
+        return _code_file_name(_caller_frame(2).f_code)
 
     def _get_notebook_name(self):
+        global _notebook_name
+        if _notebook_name is not None:
+            return _notebook_name
         # Attempt to get the notebook name
         try:
             import ipynbname
-            return ipynbname.name()  # This will return the notebook name
+            _notebook_name = ipynbname.name()  # This will return the notebook name
+            return _notebook_name
         except ImportError:
             return "Notebook name retrieval requires ipynbname package"
         except Exception as e:
             return f"Error retrieving notebook name: {e}"
 
-        
+
     def get_unique_files(self):
         return list(self.files)
-        
+
     def reset(self):
         """Reset the file tracker by clearing all tracked files."""
         self.files.clear()
-    
+
     def trace_main_file(self):
-        frame = inspect.stack()[-1]
-        self.files.add(frame.filename)
\ No newline at end of file
+        frame = sys._getframe()
+        while frame.f_back is not None:
+            frame = frame.f_back
+        self.files.add(_code_file_name(frame.f_code))
@@ -1,9 +1,11 @@
 import requests
 import os
 from ....ragaai_catalyst import RagaAICatalyst
-from ....dataset import Dataset
 
 def get_user_trace_metrics(project_name, dataset_name):
+    # Imported here, Dataset needs pandas which the tracers do not
+    from ....dataset import Dataset
+
     try:
         list_datasets = Dataset(project_name=project_name).list_datasets()
         if not list_datasets:
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import logging
+from typing import Any, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+
+class JsonlSpool:
+    """
+    Append-only JSONL segment on disk.
+
+    Records are serialized as soon as they are appended, so the caller does not
+    need to keep them in memory. Only the byte offset of every record is kept,
+    which allows reading the records back sequentially or in any order.
+    """
+
+    def __init__(self, path: str, encoder_cls: Optional[type] = None):
+        self.path = path
+        self.encoder_cls = encoder_cls
+        self.offsets = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, record: Any) -> None:
+        if hasattr(record, "to_dict"):
+            record = record.to_dict()
+        line = (json.dumps(record, cls=self.encoder_cls) + "\n").encode("utf-8")
+        with self._lock:
+            self.offsets.append(self._size)
+            self._file.write(line)
+            self._size += len(line)
+
+    def close(self) -> None:
+        """Flush and close the writer; records can still be read afterwards"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        self._flush()
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def read(self, indexes: Iterable[int]) -> Iterator[Any]:
+        """Yield the records at `indexes`, in the given order"""
+        self._flush()
+        with open(self.path, "rb") as f:
+            for index in indexes:
+                f.seek(self.offsets[index])
+                yield json.loads(f.readline())
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.debug(f"Failed to remove spool file {self.path}: {e}")
+
+    def _flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
@@ -3,29 +3,40 @@ from .trace_utils import (
     calculate_cost,
     convert_usage_to_dict,
 )
-from importlib import resources
-#from litellm import model_cost
+from ...utils.model_prices import model_prices
 import json
 import os
 import asyncio
 import psutil
+import re
+import threading
 import tiktoken
+import wrapt
 import logging
 
 logger = logging.getLogger(__name__)
 
+# tiktoken encoders per model name, and the unknown or aliased models already warned about
+_encoders = {}
+_warned_models = set()
+_encoders_lock = threading.Lock()
+
+# Pinned model used to count tokens for a model family that may update over time
+_TOKEN_COUNT_ALIASES = (
+    ("gpt-3.5-turbo", "gpt-3.5-turbo-0125", "gpt-3.5-turbo may update over time"),
+    ("gpt-4o-mini", "gpt-4o-mini-2024-07-18", "gpt-4o-mini may update over time"),
+    ("gpt-4o", "gpt-4o-2024-08-06", "gpt-4o and gpt-4o-mini may update over time"),
+    ("gpt-4", "gpt-4-0613", "gpt-4 may update over time"),
+)
+
+# Position of a space between two non-space characters; the tokenizer never merges across it
+_TOKEN_BOUNDARY = re.compile(r"(?<=\S) (?=\S)")
+
 def get_model_cost():
-    """Load model costs from a JSON file. 
-    Note: This file should be updated periodically or whenever a new package is created to ensure accurate cost calculations.
-    To Do: Implement to do this automatically.
+    """Per-token prices by model name, loaded from the bundled price table on first lookup.
+    Note: The bundled table should be updated periodically or whenever a new package is created to ensure accurate cost calculations.
     """
-    file="model_prices_and_context_window_backup.json"
-    d={}
-    with resources.open_text("ragaai_catalyst.tracers.utils", file) as f:
-        d= json.load(f)
-    return d 
-
-model_cost = get_model_cost()
+    return model_prices
 
 def extract_model_name(args, kwargs, result):
     """Extract model name from kwargs or result"""
@@ -226,6 +237,173 @@ def extract_token_usage(result):
         "total_tokens": 0
     }
 
+def _warn_once(key, message):
+    if key in _warned_models:
+        return
+    with _encoders_lock:
+        if key in _warned_models:
+            return
+        _warned_models.add(key)
+    logging.warning(message)
+
+
+def get_encoding_for_model(model):
+    """Cached tiktoken encoder for `model`, falling back to o200k_base for unknown models"""
+    encoding = _encoders.get(model)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _warn_once(("encoding", model), f"Warning: model {model} not found. Using o200k_base encoding.")
+            encoding = tiktoken.get_encoding("o200k_base")
+        _encoders[model] = encoding
+    return encoding
+
+
+class IncrementalTokenCounter:
+    """
+    Counts the tokens of a text that arrives in pieces, such as a streamed response.
+
+    Text is encoded up to the last space between two words as it is fed, so
+    each piece is tokenized about once, and the result equals encoding the
+    joined text in one go.
+    """
+
+    def __init__(self, model):
+        self.encoding = get_encoding_for_model(model)
+        self._tokens = 0
+        self._pending = ""
+
+    def feed(self, text):
+        if not text:
+            return
+        pending = self._pending + text
+        boundary = None
+        for boundary in _TOKEN_BOUNDARY.finditer(pending):
+            pass
+        if boundary is None:
+            self._pending = pending
+            return
+        self._tokens += len(self.encoding.encode(pending[:boundary.start()]))
+        self._pending = pending[boundary.start():]
+
+    @property
+    def tokens(self):
+        if self._pending:
+            self._tokens += len(self.encoding.encode(self._pending))
+            self._pending = ""
+        return self._tokens
+
+
+def _chunk_field(obj, name):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def extract_stream_chunk_text(chunk):
+    """Text carried by one streamed chunk (OpenAI and LiteLLM chunks, Anthropic deltas)"""
+    if isinstance(chunk, str):
+        return chunk
+    choices = _chunk_field(chunk, "choices")
+    if choices:
+        choice = choices[0]
+        delta = _chunk_field(choice, "delta")
+        if delta is not None:
+            return _chunk_field(delta, "content") or ""
+        return _chunk_field(choice, "text") or ""
+    delta = _chunk_field(chunk, "delta")
+    if delta is not None:
+        return _chunk_field(delta, "text") or ""
+    return ""
+
+
+class TokenCountingStream(wrapt.ObjectProxy):
+    """
+    Passes a streamed response through unchanged while counting its tokens.
+
+    The text of every chunk is fed to an `IncrementalTokenCounter` as the
+    caller consumes it. `on_complete(tokens)` is called once, when the stream
+    is exhausted or closed.
+    """
+
+    def __init__(self, stream, counter, on_complete):
+        super().__init__(stream)
+        self._self_counter = counter
+        self._self_on_complete = on_complete
+        self._self_iterator = None
+        self._self_done = False
+
+    def _self_feed(self, chunk):
+        try:
+            self._self_counter.feed(extract_stream_chunk_text(chunk))
+        except Exception as e:
+            logger.debug(f"Failed to count tokens of stream chunk: {e}")
+
+    def _self_finish(self):
+        if self._self_done:
+            return
+        self._self_done = True
+        try:
+            self._self_on_complete(self._self_counter.tokens)
+        except Exception as e:
+            logger.debug(f"Failed to record streamed token usage: {e}")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._self_iterator is None:
+            self._self_iterator = iter(self.__wrapped__)
+        try:
+            chunk = next(self._self_iterator)
+        except StopIteration:
+            self._self_finish()
+            raise
+        self._self_feed(chunk)
+        return chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._self_iterator is None:
+            self._self_iterator = self.__wrapped__.__aiter__()
+        try:
+            chunk = await self._self_iterator.__anext__()
+        except StopAsyncIteration:
+            self._self_finish()
+            raise
+        self._self_feed(chunk)
+        return chunk
+
+    def __enter__(self):
+        self.__wrapped__.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            return self.__wrapped__.__exit__(*exc_info)
+        finally:
+            self._self_finish()
+
+    async def __aenter__(self):
+        await self.__wrapped__.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        try:
+            return await self.__wrapped__.__aexit__(*exc_info)
+        finally:
+            self._self_finish()
+
+    def close(self):
+        try:
+            return self.__wrapped__.close()
+        finally:
+            self._self_finish()
+
+
 def num_tokens_from_messages(model="gpt-4o-mini-2024-07-18", prompt_messages=None, response_message=None):
     """Calculate the number of tokens used by messages.
     
@@ -241,13 +419,8 @@ def num_tokens_from_messages(model="gpt-4o-mini-2024-07-18", prompt_messages=Non
             - completion_tokens: Number of tokens in the completion
             - total_tokens: Total number of tokens
     """
-    #import pdb; pdb.set_trace()
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logging.warning("Warning: model not found. Using o200k_base encoding.")
-        encoding = tiktoken.get_encoding("o200k_base")
-    
+    encoding = get_encoding_for_model(model)
+
     if model in {
         "gpt-3.5-turbo-0125",
         "gpt-4-0314",
@@ -259,23 +432,12 @@ def num_tokens_from_messages(model="gpt-4o-mini-2024-07-18", prompt_messages=Non
         }:
         tokens_per_message = 3
         tokens_per_name = 1
-    elif "gpt-3.5-turbo" in model:
-        logging.warning("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0125.")
-        return num_tokens_from_messages(model="gpt-3.5-turbo-0125", 
-                                     prompt_messages=prompt_messages, response_message=response_message)
-    elif "gpt-4o-mini" in model:
-        logging.warning("Warning: gpt-4o-mini may update over time. Returning num tokens assuming gpt-4o-mini-2024-07-18.")
-        return num_tokens_from_messages(model="gpt-4o-mini-2024-07-18",
-                                     prompt_messages=prompt_messages, response_message=response_message)
-    elif "gpt-4o" in model:
-        logging.warning("Warning: gpt-4o and gpt-4o-mini may update over time. Returning num tokens assuming gpt-4o-2024-08-06.")
-        return num_tokens_from_messages(model="gpt-4o-2024-08-06",
-                                     prompt_messages=prompt_messages, response_message=response_message)
-    elif "gpt-4" in model:
-        logging.warning("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return num_tokens_from_messages(model="gpt-4-0613",
-                                     prompt_messages=prompt_messages, response_message=response_message)
     else:
+        for family, pinned_model, message in _TOKEN_COUNT_ALIASES:
+            if family in model:
+                _warn_once(("alias", family), f"Warning: {message}. Returning num tokens assuming {pinned_model}.")
+                return num_tokens_from_messages(model=pinned_model,
+                                             prompt_messages=prompt_messages, response_message=response_message)
         raise NotImplementedError(
             f"""num_tokens_from_messages() is not implemented for model {model}."""
         )
@@ -341,7 +503,15 @@ def calculate_llm_cost(token_usage, model_name, model_costs, model_custom_cost=N
     """Calculate cost based on token usage and model"""
     if model_custom_cost is None:
         model_custom_cost = {}
-    model_costs.update(model_custom_cost)
+    default_cost = {
+        "input_cost_per_token": 0.0,
+        "output_cost_per_token": 0.0
+    }
+
+    def lookup(name):
+        # Custom costs take precedence; the shared price table is never modified
+        return model_custom_cost.get(name) or model_costs.get(name, default_cost)
+
     if not isinstance(token_usage, dict):
         token_usage = {
             "prompt_tokens": 0,
@@ -350,19 +520,13 @@ def calculate_llm_cost(token_usage, model_name, model_costs, model_custom_cost=N
         }
     
     # Get model costs, defaulting to default costs if unknown
-    model_cost = model_cost = model_costs.get(model_name, {
-        "input_cost_per_token": 0.0,   
-        "output_cost_per_token": 0.0   
-    })
-    if model_cost['input_cost_per_token'] == 0.0 and model_cost['output_cost_per_token'] == 0.0:
+    model_cost = lookup(model_name)
+    if model_cost.get('input_cost_per_token', 0.0) == 0.0 and model_cost.get('output_cost_per_token', 0.0) == 0.0:
         provide_name = model_name.split('-')[0]
         if provide_name == 'azure':
             model_name = os.path.join('azure', '-'.join(model_name.split('-')[1:]))
 
-            model_cost = model_costs.get(model_name, {
-                "input_cost_per_token": 0.0,   
-                "output_cost_per_token": 0.0   
-            })
+            model_cost = lookup(model_name)
 
     input_cost = (token_usage.get("prompt_tokens", 0)) * model_cost.get("input_cost_per_token", 0.0)
     output_cost = (token_usage.get("completion_tokens", 0)) * model_cost.get("output_cost_per_token", 0.0)
@@ -589,7 +753,7 @@ def extract_llm_data(args, kwargs, result):
     token_usage = extract_token_usage(result)
 
     # Load model costs
-    model_costs = model_cost
+    model_costs = model_prices
 
     # Calculate cost
     cost = calculate_llm_cost(token_usage, model_name, model_costs)
@@ -0,0 +1,116 @@
+import os
+import threading
+import tracemalloc
+import logging
+from typing import Iterable, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+MEMORY_TRACKING_MODES = ("off", "rss", "tracemalloc")
+
+
+class MemorySample:
+    """Starting sample of a component, handed back to `MemoryTracker.stop`."""
+
+    __slots__ = ("mode", "start_value", "stopped")
+
+    def __init__(self, mode: str, start_value: int):
+        self.mode = mode
+        self.start_value = start_value
+        self.stopped = False
+
+
+class MemoryTracker:
+    """
+    Per-component memory accounting used by the tool, agent, custom and LLM tracers.
+
+    Modes:
+        off:         no sampling at all, memory_used is always 0 (default)
+        rss:         process RSS delta using a cached psutil.Process handle
+        tracemalloc: Python allocation delta measured with tracemalloc. When
+                     `span_names` is given, tracemalloc only runs while one of
+                     those spans is active, so the rest of the program pays nothing.
+    """
+
+    def __init__(self, mode: str = "off", span_names: Optional[Iterable[str]] = None):
+        if mode is None:
+            mode = "off"
+        if mode not in MEMORY_TRACKING_MODES:
+            raise ValueError(
+                f"Invalid memory tracking mode: {mode}. Expected one of {MEMORY_TRACKING_MODES}"
+            )
+        self.mode = mode
+        self.span_names = set(span_names) if span_names else None
+        self._process = None
+        self._process_pid = None
+        self._lock = threading.Lock()
+        self._tracemalloc_users = 0
+        self._started_tracemalloc = False
+
+    def _get_process(self):
+        # Re-create the handle after a fork so the child does not sample its parent
+        pid = os.getpid()
+        if self._process is None or self._process_pid != pid:
+            self._process = psutil.Process(pid)
+            self._process_pid = pid
+        return self._process
+
+    def _rss(self) -> int:
+        try:
+            return self._get_process().memory_info().rss
+        except Exception as e:
+            logger.debug(f"Failed to sample RSS: {e}")
+            return 0
+
+    def _acquire_tracemalloc(self):
+        with self._lock:
+            if self._tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._tracemalloc_users += 1
+
+    def _release_tracemalloc(self):
+        with self._lock:
+            self._tracemalloc_users = max(0, self._tracemalloc_users - 1)
+            if self._tracemalloc_users == 0 and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def is_enabled_for(self, name: Optional[str] = None) -> bool:
+        if self.mode == "off":
+            return False
+        if self.span_names is not None and name not in self.span_names:
+            return False
+        return True
+
+    def start(self, name: Optional[str] = None) -> Optional[MemorySample]:
+        """Take the starting sample for a component. Returns None when tracking is off."""
+        if not self.is_enabled_for(name):
+            return None
+        if self.mode == "rss":
+            return MemorySample("rss", self._rss())
+        self._acquire_tracemalloc()
+        return MemorySample("tracemalloc", tracemalloc.get_traced_memory()[0])
+
+    def stop(self, sample: Optional[MemorySample]) -> int:
+        """
+        Take the ending sample and return the memory used in bytes (never negative).
+        Stopping the same sample twice is a no-op that returns 0, so error paths can
+        call it unconditionally.
+        """
+        if sample is None or sample.stopped:
+            return 0
+        sample.stopped = True
+        if sample.mode == "rss":
+            return max(0, self._rss() - sample.start_value)
+        try:
+            end_value = (
+                tracemalloc.get_traced_memory()[0]
+                if tracemalloc.is_tracing()
+                else sample.start_value
+            )
+        finally:
+            self._release_tracemalloc()
+        return max(0, end_value - sample.start_value)
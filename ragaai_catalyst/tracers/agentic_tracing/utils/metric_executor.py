@@ -0,0 +1,113 @@
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ragaai_catalyst.tracers.agentic_tracing.upload.upload_local_metric import calculate_metrics
+
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+
+class DeferredMetricExecutor:
+    """
+    Queues metric calculations and sends them to the calculate-metric endpoint in batches.
+
+    `submit` only records the request, so traced calls never wait on the
+    remote evaluation. A full batch is sent by a single background worker;
+    `flush` sends what is left and waits until every result queued before it
+    was called has been handed to its callback, including batches being sent
+    by the worker or by a concurrent flush. Callbacks run in submission order.
+
+    Requests submitted without a project id are sent for the id returned by
+    `resolve_project_id`, which is only called when such a batch is sent.
+    """
+
+    def __init__(self, batch_size: int = 20, resolve_project_id: Optional[Callable[[], Any]] = None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self.resolve_project_id = resolve_project_id
+        self._pending = []
+        self._worker = None
+        self._lock = threading.Lock()
+        self._delivered = threading.Condition(self._lock)
+        # Requests are numbered in submission order; a batch is known by its last number
+        self._submitted = 0
+        self._in_flight = set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, project_id, request: Dict[str, Any], callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Queue one calculate-metric `data` entry; `callback` receives its result"""
+        with self._lock:
+            self._pending.append((project_id, request, callback))
+            self._submitted += 1
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+            self._in_flight.add(self._submitted)
+            if self._worker is None:
+                self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ragaai-metrics")
+            self._worker.submit(self._run_batch, self._submitted, batch)
+
+    def flush(self) -> None:
+        """Send the queued requests and wait for every result queued so far to be delivered"""
+        with self._lock:
+            last = self._submitted
+            batch, self._pending = self._pending, []
+            if batch:
+                self._in_flight.add(last)
+        if batch:
+            # Earlier batches are delivered first, so callbacks keep submission order
+            with self._delivered:
+                self._delivered.wait_for(lambda: all(batch_id >= last for batch_id in self._in_flight))
+            self._run_batch(last, batch)
+        with self._delivered:
+            self._delivered.wait_for(lambda: all(batch_id > last for batch_id in self._in_flight))
+
+    def shutdown(self) -> None:
+        self.flush()
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.shutdown(wait=True)
+
+    def _run_batch(self, batch_id: int, batch: List[tuple]) -> None:
+        try:
+            self._run(batch)
+        finally:
+            with self._delivered:
+                self._in_flight.discard(batch_id)
+                self._delivered.notify_all()
+
+    def _run(self, batch: List[tuple]) -> None:
+        by_project = {}
+        for project_id, request, callback in batch:
+            by_project.setdefault(project_id, []).append((request, callback))
+
+        for project_id, items in by_project.items():
+            try:
+                if project_id is None and self.resolve_project_id is not None:
+                    project_id = self.resolve_project_id()
+                logger.info(f"calculating {len(items)} metric(s), please wait....")
+                response = calculate_metrics(project_id, [request for request, _ in items])
+                results = response["data"]["data"]
+            except Exception as e:
+                logger.error(f"Error executing metric: {e}")
+                continue
+
+            if len(results) != len(items):
+                logger.error(f"Expected {len(items)} metric results, got {len(results)}")
+
+            for (_, callback), result in zip(items, results):
+                try:
+                    callback(result)
+                except ValueError as e:
+                    logger.error(f"Validation Error: {e}")
+                except Exception as e:
+                    logger.error(f"Error executing metric: {e}")
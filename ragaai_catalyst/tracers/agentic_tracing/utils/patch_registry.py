@@ -0,0 +1,154 @@
+import os
+import threading
+import logging
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+_MISSING = object()
+
+
+def _own_attribute(owner, name):
+    """The attribute as stored on `owner` itself, without binding or inheritance"""
+    try:
+        return vars(owner).get(name, _MISSING)
+    except TypeError:
+        return _MISSING
+
+
+def _static_attribute(owner, name):
+    """The attribute as it is found by lookup, without binding"""
+    value = _own_attribute(owner, name)
+    if value is not _MISSING:
+        return value
+    owner_type = owner if isinstance(owner, type) else type(owner)
+    for klass in owner_type.__mro__:
+        value = vars(klass).get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+    return _MISSING
+
+
+def _qualified_name(owner, name):
+    owner_name = getattr(owner, "__qualname__", None) or getattr(owner, "__name__", None) or type(owner).__qualname__
+    return f"{owner_name}.{name}"
+
+
+class Patch:
+    """One patched attribute: what it replaced and which tracers rely on it"""
+
+    __slots__ = ("owner", "name", "original", "own_value", "wrapper", "holders")
+
+    def __init__(self, owner, name, original, own_value):
+        self.owner = owner
+        self.name = name
+        self.original = original
+        self.own_value = own_value
+        self.wrapper = None
+        self.holders = []
+
+    @property
+    def holder(self):
+        """The tracer that currently handles calls, or None once every holder released it"""
+        holders = self.holders
+        return holders[-1] if holders else None
+
+
+class PatchRegistry:
+    """
+    Idempotent, reference-counted patching of classes, modules and objects.
+
+    `patch` replaces an attribute once; patching it again, from another
+    tracer or another import hook, only adds a holder. A wrapper reads the
+    tracer to call from `patch.holder`, so it never needs to be stacked.
+    Wrappers are always built around the unpatched attribute, including
+    when it is inherited from a patched base class. The attribute is
+    restored exactly, or deleted again if it was inherited, when its last
+    holder releases it.
+    """
+
+    def __init__(self):
+        self._patches = {}
+        self._wrappers = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._patches)
+
+    def is_patched(self, owner, name) -> bool:
+        return (id(owner), name) in self._patches
+
+    def is_wrapper(self, value) -> bool:
+        return id(value) in self._wrappers
+
+    def patch(self, holder, owner, name: str, make_wrapper: Callable[[Any, Patch], Any]) -> Patch:
+        """
+        Replace `owner.name` with `make_wrapper(original, patch)` unless it is already patched.
+
+        `original` is the attribute as returned by getattr, unwrapped if it
+        resolves to a wrapper installed on a base class.
+        """
+        with self._lock:
+            key = (id(owner), name)
+            patch = self._patches.get(key)
+            if patch is None:
+                inherited = _static_attribute(owner, name)
+                base_patch = self._wrappers.get(id(inherited))
+                original = base_patch.original if base_patch is not None else getattr(owner, name)
+                patch = Patch(owner, name, original, _own_attribute(owner, name))
+                patch.wrapper = make_wrapper(original, patch)
+                setattr(owner, name, patch.wrapper)
+                self._patches[key] = patch
+                self._wrappers[id(patch.wrapper)] = patch
+            if holder not in patch.holders:
+                patch.holders.append(holder)
+            return patch
+
+    def release(self, holder) -> None:
+        """Drop `holder` from every patch and restore the attributes nobody holds anymore"""
+        with self._lock:
+            for key, patch in list(self._patches.items()):
+                if holder not in patch.holders:
+                    continue
+                patch.holders.remove(holder)
+                if not patch.holders:
+                    self._restore(key, patch)
+
+    def _restore(self, key, patch):
+        del self._patches[key]
+        if _own_attribute(patch.owner, patch.name) is not patch.wrapper:
+            # Patched over by someone else; the wrapper stays and calls through untraced
+            logger.debug(f"{_qualified_name(patch.owner, patch.name)} was replaced after patching, leaving it")
+            return
+        del self._wrappers[id(patch.wrapper)]
+        try:
+            if patch.own_value is _MISSING:
+                delattr(patch.owner, patch.name)
+            else:
+                setattr(patch.owner, patch.name, patch.own_value)
+        except Exception as e:
+            logger.error(f"Error unpatching {patch.name}: {e}")
+
+    def find_double_wrapped(self) -> List[str]:
+        """Names of patched attributes whose wrapper chain contains more than one of our wrappers"""
+        with self._lock:
+            double_wrapped = []
+            for patch in self._patches.values():
+                value = _static_attribute(patch.owner, patch.name)
+                seen = 0
+                for _ in range(100):
+                    if id(value) in self._wrappers:
+                        seen += 1
+                    value = getattr(value, "__wrapped__", None)
+                    if value is None:
+                        break
+                if seen > 1:
+                    double_wrapped.append(_qualified_name(patch.owner, patch.name))
+            return double_wrapped
+
+
+# Shared by all tracers, so that a second tracer never stacks wrappers on the first one's
+llm_patches = PatchRegistry()
@@ -65,179 +65,173 @@ def log_event(event_data, log_file_path):
         f.write(json.dumps(event_data) + "\n")
 
 
-def process_child_interactions(child, interaction_id, interactions):
-    """
-    Helper method to process child interactions recursively.
-    
-    Args:
-        child (dict): The child span to process
-        interaction_id (int): Current interaction ID
-        interactions (list): List of interactions to append to
-        
-    Returns:
-        int: Next interaction ID to use
-    """
-    child_type = child.get("type")
-
-    if child_type == "tool":
-        # Tool call start
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": "tool_call_start",
-                "name": child.get("name"),
-                "content": {
-                    "parameters": [
-                        child.get("data", {}).get("input", {}).get("args"),
-                        child.get("data", {}).get("input", {}).get("kwargs"),
-                    ]
-                },
-                "timestamp": child.get("start_time"),
-                "error": child.get("error"),
-            }
-        )
-        interaction_id += 1
+def _field(span, name, default=None):
+    """Read a span field from either a span object or a dict"""
+    if isinstance(span, dict):
+        return span.get(name, default)
+    return getattr(span, name, default)
 
-        # Tool call end
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": "tool_call_end",
-                "name": child.get("name"),
-                "content": {
-                    "returns": child.get("data", {}).get("output"),
-                },
-                "timestamp": child.get("end_time"),
-                "error": child.get("error"),
-            }
-        )
-        interaction_id += 1
 
-    elif child_type == "llm":
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": "llm_call_start",
-                "name": child.get("name"),
-                "content": {
-                    "prompt": child.get("data", {}).get("input"),
-                },
-                "timestamp": child.get("start_time"),
-                "error": child.get("error"),
-            }
-        )
-        interaction_id += 1
+class _Descend:
+    """Marker yielded by _span_events to visit a child span"""
 
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": "llm_call_end",
-                "name": child.get("name"),
-                "content": {"response": child.get("data", {}).get("output")},
-                "timestamp": child.get("end_time"),
-                "error": child.get("error"),
-            }
-        )
-        interaction_id += 1
+    __slots__ = ("child",)
 
-    elif child_type == "agent":
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": "agent_call_start",
-                "name": child.get("name"),
-                "content": None,
-                "timestamp": child.get("start_time"),
-                "error": child.get("error"),
-            }
-        )
-        interaction_id += 1
+    def __init__(self, child):
+        self.child = child
 
-        # Process nested children recursively
-        if "children" in child.get("data", {}):
-            for nested_child in child["data"]["children"]:
-                interaction_id = process_child_interactions(
-                    nested_child, interaction_id, interactions
-                )
-
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": "agent_call_end",
-                "name": child.get("name"),
-                "content": child.get("data", {}).get("output"),
-                "timestamp": child.get("end_time"),
-                "error": child.get("error"),
-            }
+
+def _interaction(span, interaction_type, content, timestamp):
+    # "id" is assigned once the workflow is sorted; the key keeps its position
+    return {
+        "id": None,
+        "span_id": _field(span, "id"),
+        "interaction_type": interaction_type,
+        "name": _field(span, "name"),
+        "content": content,
+        "timestamp": timestamp,
+        "error": _field(span, "error"),
+    }
+
+
+def _network_call_interaction(span, call, timestamp_key):
+    return {
+        "id": None,
+        "span_id": _field(span, "id"),
+        "interaction_type": "network_call",
+        "name": None,
+        "content": {
+            "request": {
+                "url": call.get("url"),
+                "method": call.get("method"),
+                "headers": call.get("headers"),
+            },
+            "response": {
+                "status_code": call.get("status_code"),
+                "headers": call.get("response_headers"),
+                "body": call.get("response_body"),
+            },
+        },
+        "timestamp": call.get(timestamp_key),
+        "error": call.get("error"),
+    }
+
+
+def _span_events(span, top_level):
+    span_type = _field(span, "type")
+    data = _field(span, "data") or {}
+    start_time = _field(span, "start_time")
+    end_time = _field(span, "end_time")
+
+    if span_type == "tool" and top_level:
+        content = {"prompt": data.get("input"), "response": data.get("output")}
+        yield _interaction(span, "tool_call_start", content, start_time)
+        yield _interaction(span, "tool_call_end", content, end_time)
+
+    elif span_type == "tool":
+        tool_input = data.get("input") or {}
+        yield _interaction(
+            span,
+            "tool_call_start",
+            {"parameters": [tool_input.get("args"), tool_input.get("kwargs")]},
+            start_time,
         )
-        interaction_id += 1
+        yield _interaction(span, "tool_call_end", {"returns": data.get("output")}, end_time)
+
+    elif span_type == "llm":
+        yield _interaction(span, "llm_call_start", {"prompt": data.get("input")}, start_time)
+        yield _interaction(span, "llm_call_end", {"response": data.get("output")}, end_time)
+
+    elif span_type == "agent":
+        yield _interaction(span, "agent_call_start", None, start_time)
+        for child in data.get("children") or []:
+            yield _Descend(child)
+        yield _interaction(span, "agent_call_end", data.get("output"), end_time)
 
     else:
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": f"{child_type}_call_start",
-                "name": child.get("name"),
-                "content": child.get("data", {}),
-                "timestamp": child.get("start_time"),
-                "error": child.get("error"),
+        # The span data is referenced, not copied
+        yield _interaction(span, f"{span_type}_call_start", data, start_time)
+        yield _interaction(span, f"{span_type}_call_end", data, end_time)
+
+    # Additional interactions and network calls
+    if top_level:
+        for span_interaction in _field(span, "interactions") or []:
+            if isinstance(span_interaction, dict):
+                interaction_type = span_interaction.get("type", span_interaction.get("interaction_type"))
+            else:
+                interaction_type = span_interaction.type
+            yield {
+                "id": None,
+                "span_id": _field(span, "id"),
+                "interaction_type": interaction_type,
+                "content": _field(span_interaction, "content"),
+                "timestamp": _field(span_interaction, "timestamp"),
+                "error": _field(span, "error"),
             }
+    else:
+        for span_interaction in span.get("interactions") or []:
+            span_interaction["span_id"] = span.get("id")
+            span_interaction["error"] = None
+            yield span_interaction
+
+    for call in _field(span, "network_calls") or []:
+        yield _network_call_interaction(
+            span, call, "timestamp" if top_level else "start_time"
         )
-        interaction_id += 1
 
-        interactions.append(
-            {
-                "id": str(interaction_id),
-                "span_id": child.get("id"),
-                "interaction_type": f"{child_type}_call_end",
-                "name": child.get("name"),
-                "content": child.get("data", {}),
-                "timestamp": child.get("end_time"),
-                "error": child.get("error"),
-            }
-        )
-        interaction_id += 1
 
-    # Process additional interactions and network calls
-    if "interactions" in child:
-        for interaction in child["interactions"]:
-            interaction["id"] = str(interaction_id)
-            interaction["span_id"] = child.get("id")
-            interaction["error"] = None
-            interactions.append(interaction)
-            interaction_id += 1
-
-    if "network_calls" in child:
-        for child_network_call in child["network_calls"]:
-            network_call = {}
-            network_call["id"] = str(interaction_id)
-            network_call["span_id"] = child.get("id")
-            network_call["interaction_type"] = "network_call"
-            network_call["name"] = None
-            network_call["content"] = {
-                "request": {
-                    "url": child_network_call.get("url"),
-                    "method": child_network_call.get("method"),
-                    "headers": child_network_call.get("headers"),
-                },
-                "response": {
-                    "status_code": child_network_call.get("status_code"),
-                    "headers": child_network_call.get("response_headers"),
-                    "body": child_network_call.get("response_body"),
-                },
-            }
-            network_call["timestamp"] = child_network_call.get("start_time")
-            network_call["error"] = child_network_call.get("error")
-            interactions.append(network_call)
-            interaction_id += 1
+def iter_span_interactions(span, top_level=True):
+    """
+    Lazily yield the workflow interactions of a span and all its descendants.
+
+    Accepts span objects (Component) as well as plain span dicts. The tree is
+    walked with an explicit stack, so deep agent nesting does not recurse, and
+    inputs/outputs/data are referenced by the interactions rather than copied.
+    Interaction ids are left as None; see `build_workflow`.
+    """
+    stack = [_span_events(span, top_level)]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+        elif isinstance(item, _Descend):
+            stack.append(_span_events(item.child, False))
+        else:
+            yield item
+
+
+def iter_workflow(spans):
+    """Lazily yield the unsorted workflow interactions of top-level `spans`"""
+    for span in spans:
+        yield from iter_span_interactions(span)
+
 
+def build_workflow(interactions) -> list:
+    """Sort interactions by timestamp and number them sequentially"""
+    sorted_interactions = sorted(
+        interactions, key=lambda x: x["timestamp"] if x["timestamp"] else ""
+    )
+    for idx, interaction in enumerate(sorted_interactions, 1):
+        interaction["id"] = str(idx)
+    return sorted_interactions
+
+
+def process_child_interactions(child, interaction_id, interactions):
+    """
+    Helper method to process child interactions recursively.
+    
+    Args:
+        child (dict): The child span to process
+        interaction_id (int): Current interaction ID
+        interactions (list): List of interactions to append to
+        
+    Returns:
+        int: Next interaction ID to use
+    """
+    for interaction in iter_span_interactions(child, top_level=False):
+        interaction["id"] = str(interaction_id)
+        interactions.append(interaction)
+        interaction_id += 1
     return interaction_id
 
 
@@ -254,183 +248,7 @@ def format_interactions(trace) -> dict:
         dict: A dictionary with "workflow" key containing a list of interactions
                 sorted by timestamp.
     """
-    interactions = []
-    interaction_id = 1
-
     if 'data' not in trace or not trace['data'][0]["spans"]:
         return {"workflow": []}
 
-    for span in trace['data'][0]["spans"]:
-        # Process agent spans
-        if span['type'] == "agent":
-            # Add agent_start interaction
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": "agent_call_start",
-                    "name": span['name'],
-                    "content": None,
-                    "timestamp": span['start_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-            # Process children of agent recursively
-            if "children" in span['data']:
-                for child in span['data']["children"]:
-                    interaction_id = process_child_interactions(
-                        child, interaction_id, interactions
-                    )
-
-            # Add agent_end interaction
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": "agent_call_end",
-                    "name": span['name'],
-                    "content": span['data'].get("output"),
-                    "timestamp": span['end_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-        elif span['type'] == "tool":
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": "tool_call_start",
-                    "name": span['name'],
-                    "content": {
-                        "prompt": span['data'].get("input"),
-                        "response": span['data'].get("output"),
-                    },
-                    "timestamp": span['start_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": "tool_call_end",
-                    "name": span['name'],
-                    "content": {
-                        "prompt": span['data'].get("input"),
-                        "response": span['data'].get("output"),
-                    },
-                    "timestamp": span['end_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-        elif span['type'] == "llm":
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": "llm_call_start",
-                    "name": span['name'],
-                    "content": {
-                        "prompt": span['data'].get("input"),
-                    },
-                    "timestamp": span['start_time'],
-                    "error": span['error']
-                }
-            )
-            interaction_id += 1
-
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": "llm_call_end",
-                    "name": span['name'],
-                    "content": {"response": span['data'].get("output")},
-                    "timestamp": span['end_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-        else:
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": f"{span['type']}_call_start",
-                    "name": span['name'],
-                    "content": span['data'],
-                    "timestamp": span['start_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-            interactions.append(
-                {
-                    "id": str(interaction_id),
-                    "span_id": span['id'],
-                    "interaction_type": f"{span['type']}_call_end",
-                    "name": span['name'],
-                    "content": span['data'],
-                    "timestamp": span['end_time'],
-                    "error": span['error'],
-                }
-            )
-            interaction_id += 1
-
-        # Process interactions from span.data if they exist
-        if 'interactions' in span:
-            for span_interaction in span['interactions']:
-                interaction = {}
-                interaction["id"] = str(interaction_id)
-                interaction["span_id"] = span['id']
-                interaction["interaction_type"] = span_interaction['type']
-                interaction["content"] = span_interaction['content']
-                interaction["timestamp"] = span_interaction['timestamp']
-                interaction["error"] = span['error']
-                interactions.append(interaction)
-                interaction_id += 1
-
-        if 'network_calls' in span:
-            for span_network_call in span['network_calls']:
-                network_call = {}
-                network_call["id"] = str(interaction_id)
-                network_call["span_id"] = span['id']
-                network_call["interaction_type"] = "network_call"
-                network_call["name"] = None
-                network_call["content"] = {
-                    "request": {
-                        "url": span_network_call.get("url"),
-                        "method": span_network_call.get("method"),
-                        "headers": span_network_call.get("headers"),
-                    },
-                    "response": {
-                        "status_code": span_network_call.get("status_code"),
-                        "headers": span_network_call.get("response_headers"),
-                        "body": span_network_call.get("response_body"),
-                    },
-                }
-                network_call["timestamp"] = span_network_call.get("timestamp")
-                network_call["error"] = span_network_call.get("error")
-                interactions.append(network_call)
-                interaction_id += 1
-
-    # Sort interactions by timestamp
-    sorted_interactions = sorted(
-        interactions, key=lambda x: x["timestamp"] if x["timestamp"] else ""
-    )
-
-    # Reassign IDs to maintain sequential order after sorting
-    for idx, interaction in enumerate(sorted_interactions, 1):
-        interaction["id"] = str(idx)
-
-    return {"workflow": sorted_interactions}
\ No newline at end of file
+    return {"workflow": build_workflow(iter_workflow(trace['data'][0]["spans"]))}
\ No newline at end of file
@@ -5,6 +5,17 @@ import re
 import tokenize
 import io
 import types
+import weakref
+
+# Argument content fed into the hash is capped; anything past the cap only
+# contributes its length, so huge prompts do not dominate instrumentation cost.
+MAX_HASH_ARGS_CHARS = 64 * 1024
+
+# Per-function caches keyed weakly by the function (or class) object. Each entry
+# stores the __code__ object it was computed for, so reassigning __code__
+# invalidates it. Code objects themselves cannot be weak-referenced.
+_source_prefix_cache = weakref.WeakKeyDictionary()
+_simple_hash_cache = weakref.WeakKeyDictionary()
 
 def normalize_source_code(source):
     """
@@ -35,53 +46,146 @@ def normalize_source_code(source):
     
     return ''.join(normalized_tokens)
 
+def _cache_get(cache, key, code):
+    try:
+        entry = cache.get(key)
+    except TypeError:  # Not weak-referenceable
+        return None
+    if entry is not None and entry[0] is code:
+        return entry[1]
+    return None
+
+
+def _cache_set(cache, key, code, value):
+    try:
+        cache[key] = (code, value)
+    except TypeError:
+        pass
+
+
+def _function_source_prefix(func):
+    """Name and normalized source of a function, as fed into generate_unique_hash"""
+    try:
+        normalized_source = normalize_source_code(inspect.getsource(func))
+    except (IOError, TypeError):
+        normalized_source = ""
+    return f"{func.__name__}_{normalized_source}_"
+
+
+def _class_source_prefix(cls):
+    try:
+        normalized_source = normalize_source_code(inspect.getsource(cls))
+        return f"{cls.__name__}_{normalized_source}"
+    except (IOError, TypeError):
+        return f"{cls.__name__}_{str(cls)}"
+
+
+def _get_prefix_hasher(func, build_prefix):
+    """
+    Return a fresh md5 object already fed with `build_prefix(func)`.
+    inspect.getsource and tokenization run once per function/code object.
+    """
+    key = func.__func__ if inspect.ismethod(func) else func
+    code = getattr(key, "__code__", None)
+    hasher = _cache_get(_source_prefix_cache, key, code)
+    if hasher is None:
+        hasher = hashlib.md5(build_prefix(key).encode('utf-8'))
+        _cache_set(_source_prefix_cache, key, code, hasher)
+    return hasher.copy()
+
+
+class _StreamingArgHasher:
+    """
+    Feeds normalized argument pieces into a hash object without building the
+    joined string. After `max_chars` characters only lengths are counted.
+    """
+
+    _FLUSH_CHARS = 8192
+
+    def __init__(self, hasher, max_chars=MAX_HASH_ARGS_CHARS):
+        self.hasher = hasher
+        self.remaining = max_chars
+        self.skipped = 0
+        self._buffer = []
+        self._buffered = 0
+
+    def feed(self, piece):
+        if self.remaining <= 0:
+            self.skipped += len(piece)
+            return
+        if len(piece) > self.remaining:
+            self.skipped += len(piece) - self.remaining
+            piece = piece[:self.remaining]
+        self.remaining -= len(piece)
+        self._buffer.append(piece)
+        self._buffered += len(piece)
+        if self._buffered >= self._FLUSH_CHARS:
+            self.flush()
+
+    def feed_arg(self, arg):
+        """Streaming equivalent of the former normalize_arg string builder"""
+        if isinstance(arg, (str, int, float, bool)):
+            self.feed(str(arg))
+        elif isinstance(arg, (list, tuple, set)):
+            for i, item in enumerate(arg):
+                if i:
+                    self.feed('_')
+                self.feed_arg(item)
+        elif isinstance(arg, dict):
+            try:
+                items = sorted(arg.items())
+            except TypeError:
+                items = list(arg.items())
+            for i, (k, v) in enumerate(items):
+                if i:
+                    self.feed('_')
+                self.feed_arg(k)
+                self.feed(':')
+                self.feed_arg(v)
+        elif callable(arg):
+            if hasattr(arg, "__name__"):
+                self.feed(arg.__name__)
+            else:
+                self.feed(str(type(arg).__name__))
+        else:
+            self.feed(str(type(arg).__name__))
+
+    def flush(self):
+        if self._buffer:
+            self.hasher.update(''.join(self._buffer).encode('utf-8'))
+            self._buffer = []
+            self._buffered = 0
+
+    def hexdigest(self):
+        if self.skipped:
+            self._buffer.append(f"...[{self.skipped} chars]")
+        self.flush()
+        return self.hasher.hexdigest()
+
+
 def generate_unique_hash(func, *args, **kwargs):
     """Generate a unique hash based on the original function and its arguments"""
     if inspect.ismethod(func) or inspect.isfunction(func):
-        # Get function name and source code
-        func_name = func.__name__
-        try:
-            func_source = inspect.getsource(func)
-            normalized_source = normalize_source_code(func_source)
-        except (IOError, TypeError):
-            normalized_source = ""
-        
-        # Normalize argument values
-        def normalize_arg(arg):
-            if isinstance(arg, (str, int, float, bool)):
-                return str(arg)
-            elif isinstance(arg, (list, tuple, set)):
-                return '_'.join(normalize_arg(x) for x in arg)
-            elif isinstance(arg, dict):
-                return '_'.join(f"{normalize_arg(k)}:{normalize_arg(v)}" 
-                              for k, v in sorted(arg.items()))
-            elif callable(arg):
-                if hasattr(arg, "__name__"):
-                    return arg.__name__
-                return str(type(arg).__name__)
-            else:
-                return str(type(arg).__name__)
+        # Name and normalized source are cached per function and code object
+        arg_hasher = _StreamingArgHasher(_get_prefix_hasher(func, _function_source_prefix))
+
+        # Stream normalized argument values into the hash
+        for i, arg in enumerate(args):
+            if i:
+                arg_hasher.feed('_')
+            arg_hasher.feed_arg(arg)
+        arg_hasher.feed('_')
+        for i, (k, v) in enumerate(sorted(kwargs.items())):
+            if i:
+                arg_hasher.feed('_')
+            arg_hasher.feed(f"{k}:")
+            arg_hasher.feed_arg(v)
+        return arg_hasher.hexdigest()
 
-        # Create normalized strings of arguments
-        args_str = '_'.join(normalize_arg(arg) for arg in args)
-        kwargs_str = '_'.join(f"{k}:{normalize_arg(v)}" 
-                            for k, v in sorted(kwargs.items()))
-        
-        # Combine all components
-        hash_input = f"{func_name}_{normalized_source}_{args_str}_{kwargs_str}"
-    
     elif inspect.isclass(func):
-        try:
-            class_source = inspect.getsource(func)
-            normalized_source = normalize_source_code(class_source)
-            hash_input = f"{func.__name__}_{normalized_source}"
-        except (IOError, TypeError):
-            hash_input = f"{func.__name__}_{str(func)}"
-    
-    else:
-        hash_input = str(func)
+        return _get_prefix_hasher(func, _class_source_prefix).hexdigest()
 
-    hash_obj = hashlib.md5(hash_input.encode('utf-8'))
+    hash_obj = hashlib.md5(str(func).encode('utf-8'))
     return hash_obj.hexdigest()
 
 def generate_unique_hash_simple(func):
@@ -94,7 +198,14 @@ def generate_unique_hash_simple(func):
     if hasattr(func, '__self__'):
         # Get the underlying function from the bound method
         func = func.__func__
-    
+
+    # Source lookup is the expensive part; reuse the digest for the same code object
+    cacheable = isinstance(func, types.FunctionType) or inspect.isclass(func)
+    code = getattr(func, "__code__", None)
+    if cacheable:
+        cached = _cache_get(_simple_hash_cache, func, code)
+        if cached is not None:
+            return cached
 
     # Get function name
     func_name = func.__name__
@@ -121,7 +232,10 @@ def generate_unique_hash_simple(func):
     
     # Generate MD5 hash
     hash_obj = hashlib.md5(hash_input.encode('utf-8'))
-    return hash_obj.hexdigest()
+    hash_id = hash_obj.hexdigest()
+    if cacheable:
+        _cache_set(_simple_hash_cache, func, code, hash_id)
+    return hash_id
 
 class UniqueIdentifier:
     _instance = None
@@ -0,0 +1,252 @@
+import os
+import sys
+import threading
+import contextvars
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+DEFAULT_MAX_VARIABLE_EVENTS = 1000
+
+# Only values of these types are recorded, as before
+_TRACEABLE_TYPES = (int, float, bool, str, list, dict, tuple, set)
+# Mutable values are copied so that a later in-place change is seen as a change
+_COPIED_TYPES = (list, dict, set)
+_MISSING = object()
+
+# Recorder of the traced call running in the current thread or task
+_active_recorder = contextvars.ContextVar("variable_recorder", default=None)
+
+
+class VariableRecorder:
+    """
+    Records the local variables of one traced call.
+
+    Only events of `code` are observed. A variable is recorded when its value
+    differs from the last recorded one, optionally restricted to the names in
+    `variables`, and recording stops after `max_events` entries. Each entry is
+    ``{"variables": {...changed values...}, "timestamp": ...}``.
+
+    Uses ``sys.monitoring`` on Python 3.12+, limited to the traced code
+    object, and a ``sys.settrace`` hook on older versions.
+    """
+
+    __slots__ = ("code", "variables", "max_events", "traces", "_last", "_token", "_backend")
+
+    def __init__(self, code, variables: Optional[Iterable[str]] = None,
+                 max_events: int = DEFAULT_MAX_VARIABLE_EVENTS):
+        self.code = code
+        self.variables = tuple(variables) if variables is not None else None
+        self.max_events = max_events
+        self.traces = []
+        self._last = {}
+        self._token = None
+        self._backend = None
+
+    @property
+    def full(self):
+        return len(self.traces) >= self.max_events
+
+    def start(self):
+        self._token = _active_recorder.set(self)
+        self._backend = _get_backend()
+        self._backend.acquire(self.code)
+        return self
+
+    def stop(self):
+        """Stop observing the call and return the recorded entries"""
+        if self._backend is not None:
+            self._backend.release(self.code)
+            self._backend = None
+        if self._token is not None:
+            _active_recorder.reset(self._token)
+            self._token = None
+        return self.traces
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def record(self, frame):
+        if self.full:
+            return
+        try:
+            f_locals = frame.f_locals
+            names = self.variables if self.variables is not None else f_locals
+            last = self._last
+            changed = {}
+            for name in names:
+                if name.startswith('__'):
+                    continue
+                value = f_locals.get(name, _MISSING)
+                if value is _MISSING or not isinstance(value, _TRACEABLE_TYPES):
+                    continue
+                previous = last.get(name, _MISSING)
+                if type(previous) is type(value) and previous == value:
+                    continue
+                if isinstance(value, _COPIED_TYPES):
+                    value = value.copy()
+                last[name] = value
+                changed[name] = value
+        except Exception as e:
+            logger.debug(f"Failed to record variables: {e}")
+            return
+
+        if changed:
+            self.traces.append({
+                'variables': changed,
+                'timestamp': datetime.now().astimezone().isoformat()
+            })
+            if self.full:
+                logger.debug(f"Variable tracing of {self.code.co_name} stopped after {self.max_events} events")
+
+    def _trace_lines(self, frame, event, arg):
+        if event == 'line' or event == 'return':
+            self.record(frame)
+        return None if self.full else self._trace_lines
+
+
+def _recorder_for(code):
+    recorder = _active_recorder.get()
+    if recorder is not None and recorder.code is code and not recorder.full:
+        return recorder
+    return None
+
+
+class _MonitoringBackend:
+    """Line events through sys.monitoring, enabled only on the traced code objects"""
+
+    TOOL_NAME = "ragaai_catalyst"
+
+    def __init__(self, tool_id):
+        self.tool_id = tool_id
+        self._events = sys.monitoring.events.LINE | sys.monitoring.events.PY_RETURN
+        self._counts = {}
+        self._lock = threading.Lock()
+        sys.monitoring.register_callback(tool_id, sys.monitoring.events.LINE, self._on_line)
+        sys.monitoring.register_callback(tool_id, sys.monitoring.events.PY_RETURN, self._on_return)
+
+    @classmethod
+    def create(cls):
+        monitoring = getattr(sys, "monitoring", None)
+        if monitoring is None:
+            return None
+        # Tool ids 3 and 4 are not reserved for debuggers, coverage, profilers or optimizers
+        for tool_id in (4, 3):
+            if monitoring.get_tool(tool_id) is None:
+                try:
+                    monitoring.use_tool_id(tool_id, cls.TOOL_NAME)
+                except ValueError:
+                    continue
+                return cls(tool_id)
+        logger.debug("No free sys.monitoring tool id, using sys.settrace for variable tracing")
+        return None
+
+    def acquire(self, code):
+        with self._lock:
+            count = self._counts.get(code, 0)
+            self._counts[code] = count + 1
+            if count == 0:
+                sys.monitoring.set_local_events(self.tool_id, code, self._events)
+
+    def release(self, code):
+        with self._lock:
+            count = self._counts.get(code, 0) - 1
+            if count > 0:
+                self._counts[code] = count
+                return
+            self._counts.pop(code, None)
+            sys.monitoring.set_local_events(self.tool_id, code, 0)
+
+    def _on_line(self, code, line_number):
+        recorder = _recorder_for(code)
+        if recorder is not None:
+            recorder.record(sys._getframe(1))
+
+    def _on_return(self, code, instruction_offset, retval):
+        recorder = _recorder_for(code)
+        if recorder is not None:
+            recorder.record(sys._getframe(1))
+
+
+class _SettraceBackend:
+    """
+    Fallback for Python < 3.12.
+
+    One global trace function per thread, installed while a traced call is
+    running. It attaches a line tracer only to frames of traced code objects
+    and hands every other frame to the trace function that was installed
+    before it, if any. Once the only traced call of a thread has recorded
+    `max_events` entries, the previous trace function is put back. A C tracer that reinstalls itself when called this way
+    (coverage.py does) takes the thread back, after which suspended
+    coroutines are no longer observed.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def acquire(self, code):
+        with self._lock:
+            self._counts[code] = self._counts.get(code, 0) + 1
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._local.previous = sys.gettrace()
+            sys.settrace(self._trace_calls)
+        elif getattr(self._local, "suspended", False):
+            sys.settrace(self._trace_calls)
+        self._local.suspended = False
+        self._local.depth = depth + 1
+
+    def release(self, code):
+        with self._lock:
+            count = self._counts.get(code, 0) - 1
+            if count > 0:
+                self._counts[code] = count
+            else:
+                self._counts.pop(code, None)
+        depth = getattr(self._local, "depth", 0) - 1
+        if depth <= 0:
+            sys.settrace(getattr(self._local, "previous", None))
+            self._local.previous = None
+            self._local.suspended = False
+            depth = 0
+        self._local.depth = depth
+
+    def _trace_calls(self, frame, event, arg):
+        recorder = _active_recorder.get()
+        if recorder is not None and recorder.full and self._local.depth == 1:
+            # Nothing left to record in this thread until another traced call starts
+            sys.settrace(self._local.previous)
+            self._local.suspended = True
+        else:
+            code = frame.f_code
+            if code in self._counts:
+                recorder = _recorder_for(code)
+                if recorder is not None:
+                    return recorder._trace_lines
+        previous = getattr(self._local, "previous", None)
+        if previous is not None:
+            return previous(frame, event, arg)
+        return None
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _MonitoringBackend.create() or _SettraceBackend()
+    return _backend
@@ -7,11 +7,21 @@ import re
 import ast
 import importlib.util
 import json
-import ipynbname
+import threading
 from copy import deepcopy
 
 from pathlib import Path
-from IPython import get_ipython
+
+
+def get_ipython():
+    """
+    The running IPython shell, or None.
+
+    A running shell has always imported IPython already, so IPython (and
+    ipykernel with it) is not imported here just to find out there is none.
+    """
+    ipython = sys.modules.get("IPython")
+    return ipython.get_ipython() if ipython is not None else None
 
 
 if 'get_ipython' in locals():
@@ -119,6 +129,7 @@ class JupyterNotebookHandler:
         try:
             # First try using ipynbname
             try:
+                import ipynbname
                 notebook_path = ipynbname.path()
                 if notebook_path:
                     # logger.info(f"Found notebook using ipynbname: {notebook_path}")
@@ -423,6 +434,14 @@ class TraceDependencyTracker:
 
         # Create zip in the appropriate location
         zip_filename = os.path.join(self.output_dir, f'{hash_id}.zip')
+        if os.path.exists(zip_filename):
+            # Zips are named by their code hash, so one made earlier, possibly by
+            # another process, already holds this code
+            logger.debug(f"Reusing zip file: {zip_filename}")
+            return hash_id, zip_filename
+
+        # Written under a temporary name, so other processes never see a partial zip
+        partial_filename = f"{zip_filename}.{os.getpid()}.{threading.get_ident()}.tmp"
         common_path = [os.path.abspath(p) for p in self.tracked_files if 'env' not in p]
 
         if common_path:
@@ -430,7 +449,7 @@ class TraceDependencyTracker:
         else:
             base_path = os.getcwd()
 
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(partial_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for filepath in sorted(self.tracked_files):
                 if env_location in filepath or catalyst_location in filepath:
                     continue
@@ -455,6 +474,7 @@ class TraceDependencyTracker:
                 zipf.writestr(colab_filename, self.colab_content)
                 logger.debug(f"Added Colab cell content to zip as: {colab_filename}")
 
+        os.replace(partial_filename, zip_filename)
 
         logger.info(" Zip file created successfully.")
         logger.debug(f"Zip file created successfully at: {zip_filename}")
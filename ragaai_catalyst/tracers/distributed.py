@@ -5,7 +5,7 @@ Provides simplified initialization and decorator-based tracing.
 
 import os
 import threading
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from functools import wraps
 from contextlib import contextmanager
 import uuid
@@ -13,16 +13,19 @@ from .agentic_tracing.utils.unique_decorator import generate_unique_hash_simple
 from datetime import datetime
 import asyncio
 
-from .tracer import Tracer
 from ..ragaai_catalyst import RagaAICatalyst
 
+if TYPE_CHECKING:
+    # Imported where needed, so the decorators work without loading the Tracer's frameworks
+    from .tracer import Tracer
+
 # Global state
-_global_tracer: Optional[Tracer] = None
+_global_tracer: Optional["Tracer"] = None
 _global_catalyst: Optional[RagaAICatalyst] = None
 _tracer_lock = threading.Lock()
 _active_spans = threading.local()
 
-def get_current_tracer() -> Optional[Tracer]:
+def get_current_tracer() -> Optional["Tracer"]:
     """Get the current global tracer instance."""
     return _global_tracer
 
@@ -36,7 +39,7 @@ def init_tracing(
     access_key: str = None,
     secret_key: str = None,
     base_url: str = None,
-    tracer: Tracer = None,
+    tracer: "Tracer" = None,
     catalyst: RagaAICatalyst = None, 
     **kwargs
 ) -> None:
@@ -53,7 +56,8 @@ def init_tracing(
         **kwargs: Additional tracer parameters
     """
     global _global_tracer, _global_catalyst
-    
+    from .tracer import Tracer
+
     with _tracer_lock:
         if tracer and catalyst:
             if isinstance(tracer, Tracer) and isinstance(catalyst, RagaAICatalyst):
@@ -233,8 +237,12 @@ def trace_tool(name: str = None, tool_type: str = "generic", version: str = "1.0
 
 
 
-def trace_custom(name: str = None, custom_type: str = "generic", version: str = "1.0.0", trace_variables: bool = False, **kwargs):
-    """Decorator for tracing custom functions."""
+def trace_custom(name: str = None, custom_type: str = "generic", version: str = "1.0.0", trace_variables: bool | List[str] = False, **kwargs):
+    """Decorator for tracing custom functions.
+
+    `trace_variables` records the function's local variables while it runs;
+    pass a list of names to record only those variables.
+    """
     def decorator(func):
         is_async = asyncio.iscoroutinefunction(func)
         
@@ -276,6 +284,25 @@ def trace_custom(name: str = None, custom_type: str = "generic", version: str =
     return decorator
 
 
+@contextmanager
+def trace_context(name: str = None):
+    """Record the calls made inside the block as a separate trace of the global tracer.
+
+    Each concurrent request, thread or asyncio task gets its own trace; see
+    Tracer.trace_context. Does nothing when tracing is not initialized.
+
+    Args:
+        name: Trace name, defaults to the tracer's trace name
+    """
+    tracer = get_current_tracer()
+    if not tracer:
+        yield None
+        return
+
+    with tracer.trace_context(name=name) as trace:
+        yield trace
+
+
 def current_span():
     """Get the current active span for adding metrics."""
     tracer = get_current_tracer()
@@ -41,7 +41,8 @@ class FileSpanExporter(SpanExporter):
         self.session_id = session_id if session_id is not None else str(uuid.uuid4())
         self.metadata = metadata
         self.pipeline = pipeline
-        self.sync_file = None
+        self.sync_file = None  # JSONL file of the latest trace, uploaded once the next trace starts
+        self._ids_added = False
         # Set the temp directory to be output dir
         os.makedirs(
             os.path.join(tempfile.gettempdir(), "raga_temp", "backup"), exist_ok=True
@@ -51,7 +52,10 @@ class FileSpanExporter(SpanExporter):
 
     def export(self, spans):
         """
-        Export spans to a JSON file with additional metadata and pipeline information.
+        Append spans, with metadata and pipeline information, to the trace's JSONL file.
+
+        The JSONL file is the only file written while tracing; `materialize` turns it
+        into the JSON array the upload expects.
 
         Args:
             spans (list): List of spans to be exported.
@@ -65,8 +69,7 @@ class FileSpanExporter(SpanExporter):
         self.filename = os.path.join(self.dir_name, trace_id + ".jsonl")
 
         # add the ids
-        self.metadata["id"] = get_unique_key(self.metadata)
-        self.pipeline["id"] = get_unique_key(self.pipeline)
+        self._add_ids()
 
         # add prompt id to each trace in trace_list
         for t in traces_list:
@@ -81,31 +84,75 @@ class FileSpanExporter(SpanExporter):
             "pipeline": self.pipeline,
         }
 
-        json_file_path = os.path.join(self.dir_name, trace_id + ".json")
+        new_trace = not os.path.exists(self.filename)
         with open(self.filename, "a", encoding="utf-8") as f:
             logger.debug(f"Writing jsonl file: {self.filename}")
             f.write(json.dumps(export_data) + "\n")
 
+        if new_trace:
+            if self.sync_file is not None:
+                previous_trace = self.materialize(self.sync_file)
+                if previous_trace is not None:
+                    self._run_async(self._upload_traces(json_file_path=previous_trace))
+            self.sync_file = self.filename
+
+    def _add_ids(self):
+        """Add the metadata and pipeline ids, hashing each only on the first export"""
+        if self._ids_added:
+            return
+        for data in (self.metadata, self.pipeline):
+            if isinstance(data, dict):
+                data["id"] = get_unique_key({k: v for k, v in data.items() if k != "id"})
+        self._ids_added = True
+
+    @staticmethod
+    def read_traces(jsonl_path):
+        """
+        Yield the export records of a trace from its JSONL file, in export order.
+
+        Args:
+            jsonl_path (str): Path of the trace's JSONL file.
+        """
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
-        tracer_json_file_path = os.path.join(os.getcwd(), "tracer_debug.json")
-        if os.path.exists(json_file_path):
-            with open(json_file_path, "r") as f:
-                data = json.load(f)
-                data.append(export_data)
-            with open(json_file_path, "w") as f:
-                logger.debug(f"Appending to json file: {json_file_path}")
-                json.dump(data, f)    
-        else:
-            with open(json_file_path, "w") as f:
-                logger.debug(f"Writing json  file: {json_file_path}")
-                json_data = [export_data]
-                json.dump(json_data, f)
-                if self.sync_file is not None:
-                    # self._upload_task = self._run_async(self._upload_traces(json_file_path= self.sync_file))
-                    self._run_async(self._upload_traces(json_file_path=self.sync_file))
-                self.sync_file = json_file_path
-        # asyncio.run(self.server_upload(json_file_path)
+    @staticmethod
+    def materialize(jsonl_path):
+        """
+        Write the JSON array of a trace's export records next to its JSONL file.
 
+        Lines are copied as they are, without being parsed, so the cost is one
+        sequential pass over the file.
+
+        Args:
+            jsonl_path (str): Path of the trace's JSONL file.
+
+        Returns:
+            str: Path of the JSON file, or None if the trace has no records.
+        """
+        if jsonl_path is None or not os.path.exists(jsonl_path):
+            return None
+        json_file_path = os.path.splitext(jsonl_path)[0] + ".json"
+        written = 0
+        with open(jsonl_path, "r", encoding="utf-8") as src, \
+                open(json_file_path, "w", encoding="utf-8") as dst:
+            logger.debug(f"Writing json file: {json_file_path}")
+            dst.write("[")
+            for line in src:
+                line = line.strip()
+                if not line:
+                    continue
+                if written:
+                    dst.write(", ")
+                dst.write(line)
+                written += 1
+            dst.write("]")
+        if not written:
+            os.remove(json_file_path)
+            return None
+        return json_file_path
 
     def _run_async(self, coroutine):
         """Run an asynchronous coroutine in a separate thread."""
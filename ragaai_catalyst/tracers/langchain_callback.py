@@ -12,18 +12,82 @@ import asyncio
 from langchain_core.documents import Document
 import logging
 import tempfile
+import threading
+import time
+import uuid
 import sys
+from array import array
 import importlib
 from importlib.util import find_spec
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters of streamed text kept per LLM run
+MAX_STREAMED_TEXT = 16 * 1024
+
+
+class TokenStream:
+    """Running aggregate of the tokens streamed by one LLM run"""
+
+    __slots__ = ("started_at", "first_token_at", "last_token_at", "count", "gaps",
+                 "parts", "text_length", "truncated", "max_text")
+
+    def __init__(self, started_at=None, max_text=MAX_STREAMED_TEXT):
+        self.started_at = started_at
+        self.first_token_at = None
+        self.last_token_at = None
+        self.count = 0
+        self.gaps = array("d")
+        self.parts = []
+        self.text_length = 0
+        self.truncated = False
+        self.max_text = max_text
+
+    def add(self, token, now):
+        if self.last_token_at is None:
+            self.first_token_at = now
+        else:
+            self.gaps.append(now - self.last_token_at)
+        self.last_token_at = now
+        self.count += 1
+        if not token:
+            return
+        room = self.max_text - self.text_length
+        if len(token) > room:
+            token = token[:room]
+            self.truncated = True
+        if token:
+            self.parts.append(token)
+            self.text_length += len(token)
+
+    def summary(self):
+        """Token count, time to first token and inter-token latency min/mean/p95, in seconds"""
+        gaps = sorted(self.gaps)
+        time_to_first_token = None
+        if self.started_at is not None and self.first_token_at is not None:
+            time_to_first_token = self.first_token_at - self.started_at
+        return {
+            "token_count": self.count,
+            "time_to_first_token": time_to_first_token,
+            "inter_token_latency": {
+                "min": gaps[0],
+                "mean": sum(gaps) / len(gaps),
+                "p95": gaps[min(len(gaps) - 1, int(0.95 * len(gaps)))],
+            } if gaps else None,
+            "text": "".join(self.parts),
+            "text_truncated": self.truncated,
+        }
+
 
 class LangchainTracer(BaseCallbackHandler):
     """
-    An enhanced callback handler for LangChain that traces all actions and saves them to a JSON file.
+    An enhanced callback handler for LangChain that traces all actions and returns them from stop().
     Includes improved error handling, async support, and configuration options.
+
+    Traces are kept in memory. They are only written to a JSON file when
+    asked to, by force_save() or with a save_interval, and each run gets
+    its own file so that concurrent runs never overwrite each other.
     """
 
     def __init__(
@@ -32,15 +96,20 @@ class LangchainTracer(BaseCallbackHandler):
         trace_all: bool = True,
         save_interval: Optional[int] = None,
         log_level: int = logging.INFO,
+        capture_token_events: Optional[bool] = None,
+        max_streamed_text: int = MAX_STREAMED_TEXT,
     ):
         """
         Initialize the tracer with enhanced configuration options.
 
         Args:
-            output_path (str): Directory where trace files will be saved
+            output_path (str): Directory where trace files are saved, when saving is requested
             trace_all (bool): Whether to trace all components or only specific ones
             save_interval (Optional[int]): Interval in seconds to auto-save traces
             log_level (int): Logging level for the tracer
+            capture_token_events (Optional[bool]): Also record every streamed token as an event in
+                "tokens". Meant for debugging; defaults to True only when DEBUG=1
+            max_streamed_text (int): Characters of streamed text kept per LLM run in "token_streams"
         """
         super().__init__()
         self.output_path = output_path
@@ -54,11 +123,19 @@ class LangchainTracer(BaseCallbackHandler):
         self._current_query = None
         self.filepath = None
         self.model_names = {}  # Store model names by component instance
+        if capture_token_events is None:
+            capture_token_events = os.getenv("DEBUG") == "1"
+        self.capture_token_events = capture_token_events
+        self.max_streamed_text = max_streamed_text
+        # Token streams of LLM runs that have not ended yet, and their start times, by run_id
+        self._token_streams = {}
+        self._llm_started_at = {}
+        # Identifies this run in the names of saved trace files
+        self.run_id = uuid.uuid4().hex
+        self._saves = 0
+        self._save_lock = threading.Lock()
         logger.setLevel(log_level)
 
-        if not os.path.exists(output_path):
-            os.makedirs(output_path)
-
         self.reset_trace()
         
 
@@ -89,6 +166,7 @@ class LangchainTracer(BaseCallbackHandler):
             "chat_model_calls": [],
             "retriever_actions": [],
             "tokens": [],
+            "token_streams": {},
             "errors": [],
             "query": self._current_query,
             "metadata": {
@@ -106,23 +184,16 @@ class LangchainTracer(BaseCallbackHandler):
 
     async def _async_save_trace(self, force: bool = False):
         """Asynchronously save the current trace to a JSON file"""
+        await asyncio.to_thread(self._save_trace, force)
+
+    def _save_trace(self, force: bool = False):
+        """Save the current trace to this run's JSON file"""
         if not self.current_trace["start_time"] and not force:
             return
 
         try:
             self.current_trace["end_time"] = datetime.now()
-            
-            # Use the query from the trace or fallback to a default
-            safe_query = self._current_query or "unknown"
-            
-            # Sanitize the query for filename
-            safe_query = ''.join(c for c in safe_query if c.isalnum() or c.isspace())[:50].strip()
 
-            # Add a timestamp to ensure unique filenames
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"langchain_callback_traces.json"
-            filepath = os.path.join(self.output_path, filename)
-            self.filepath = filepath
 
             trace_to_save = self.current_trace.copy()
             trace_to_save["start_time"] = str(trace_to_save["start_time"])
@@ -136,7 +207,13 @@ class LangchainTracer(BaseCallbackHandler):
                 or len(trace_to_save["errors"]) > 0
                 or force
             ):
-                async with asyncio.Lock():
+                with self._save_lock:
+                    # Every save starts a new trace, so each gets its own file
+                    self._saves += 1
+                    filepath = os.path.join(self.output_path,
+                                            f"langchain_callback_traces_{self.run_id}_{self._saves}.json")
+                    self.filepath = filepath
+                    os.makedirs(self.output_path, exist_ok=True)
                     with open(filepath, "w", encoding="utf-8") as f:
                         json.dump(trace_to_save, f, indent=2, default=str)
 
@@ -152,13 +229,6 @@ class LangchainTracer(BaseCallbackHandler):
             logger.error(f"Error saving trace: {e}")
             self.on_error(e, context="save_trace")
 
-    def _save_trace(self, force: bool = False):
-        """Synchronous version of trace saving"""
-        if asyncio.get_event_loop().is_running():
-            asyncio.create_task(self._async_save_trace(force))
-        else:
-            asyncio.run(self._async_save_trace(force))
-
     def _create_safe_wrapper(self, original_func, component_name, method_name):
         """Create a safely wrapped version of an original function with enhanced error handling"""
 
@@ -455,6 +525,10 @@ class LangchainTracer(BaseCallbackHandler):
         try:
             self.reset_trace()
             self.current_trace["start_time"] = datetime.now()
+            self.run_id = uuid.uuid4().hex
+            self._saves = 0
+            self._token_streams.clear()
+            self._llm_started_at.clear()
             self._active = True
             self._monkey_patch()
 
@@ -475,6 +549,9 @@ class LangchainTracer(BaseCallbackHandler):
             if self._save_task:
                 self._save_task.cancel()
             self._restore_original_methods()
+            for run_id in list(self._token_streams):
+                self._finish_token_stream(run_id)
+            self._llm_started_at.clear()
             # self._save_trace(force=True)
 
             return self.current_trace.copy(), self.additional_metadata
@@ -503,6 +580,7 @@ class LangchainTracer(BaseCallbackHandler):
         try:
             if not self.current_trace["start_time"]:
                 self.current_trace["start_time"] = datetime.now()
+            self._llm_started_at[str(run_id)] = time.perf_counter()
 
             self.current_trace["llm_calls"].append(
                 {
@@ -518,6 +596,7 @@ class LangchainTracer(BaseCallbackHandler):
             self.on_error(e, context="llm_start")
 
     def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_token_stream(str(run_id))
         try:
             self.current_trace["llm_calls"].append(
                 {
@@ -633,6 +712,7 @@ class LangchainTracer(BaseCallbackHandler):
         run_id: UUID,
         **kwargs: Any,
     ) -> None:
+        self._llm_started_at[str(run_id)] = time.perf_counter()
         try:
             messages_dict = [
                 [
@@ -782,17 +862,32 @@ class LangchainTracer(BaseCallbackHandler):
 
     def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
         try:
-            self.current_trace["tokens"].append(
-                {
-                    "timestamp": datetime.now(),
-                    "event": "new_token",
-                    "token": token,
-                    "additional_kwargs": kwargs,
-                }
-            )
+            run_id = str(kwargs.get("run_id"))
+            stream = self._token_streams.get(run_id)
+            if stream is None:
+                stream = self._token_streams[run_id] = TokenStream(
+                    self._llm_started_at.get(run_id), self.max_streamed_text
+                )
+            stream.add(token, time.perf_counter())
+            if self.capture_token_events:
+                self.current_trace["tokens"].append(
+                    {
+                        "timestamp": datetime.now(),
+                        "event": "new_token",
+                        "token": token,
+                        "additional_kwargs": kwargs,
+                    }
+                )
         except Exception as e:
             self.on_error(e, context="llm_new_token")
 
+    def _finish_token_stream(self, run_id):
+        """Move the aggregate of a finished LLM run's streamed tokens into the trace"""
+        self._llm_started_at.pop(run_id, None)
+        stream = self._token_streams.pop(run_id, None)
+        if stream is not None:
+            self.current_trace["token_streams"][run_id] = stream.summary()
+
     def on_error(self, error: Exception, context: str = "", **kwargs: Any) -> None:
         """Enhanced error handling with context"""
         try:
@@ -812,6 +907,8 @@ class LangchainTracer(BaseCallbackHandler):
         self.on_error(error, context="chain", **kwargs)
 
     def on_llm_error(self, error: Exception, **kwargs: Any) -> None:
+        if "run_id" in kwargs:
+            self._finish_token_stream(str(kwargs["run_id"]))
         self.on_error(error, context="llm", **kwargs)
 
     def on_tool_error(self, error: Exception, **kwargs: Any) -> None:
@@ -1,5 +1,7 @@
 from configparser import InterpolationMissingOptionError
+import os
 import json
+import logging
 from datetime import datetime
 from typing import Any, Optional, Dict, List, ClassVar
 from pydantic import Field
@@ -65,6 +67,85 @@ import uuid
 from .utils.extraction_logic_llama_index import extract_llama_index_data
 from .utils.convert_llama_instru_callback import convert_llamaindex_instrumentation_to_callback
 
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+
+def _first_node_text(nodes):
+    return nodes[0].text if nodes else None
+
+
+# Fields copied from each event type. Node, chunk and embedding lists are
+# reduced to what the trace conversion reads, so that events do not keep
+# retrieved documents and vectors alive.
+_EVENT_EXTRACTORS = {
+    AgentRunStepStartEvent: lambda e: {"task_id": e.task_id, "step": e.step, "input": e.input},
+    AgentRunStepEndEvent: lambda e: {"step_output": e.step_output},
+    AgentChatWithStepStartEvent: lambda e: {"user_msg": e.user_msg},
+    AgentChatWithStepEndEvent: lambda e: {"response": e.response},
+    AgentToolCallEvent: lambda e: {
+        "arguments": e.arguments,
+        "tool_name": e.tool.name,
+        "tool_description": e.tool.description,
+        "tool_openai": e.tool.to_openai_tool(),
+    },
+    StreamChatDeltaReceivedEvent: lambda e: {"delta": e.delta},
+    StreamChatErrorEvent: lambda e: {"exception": e.exception},
+    EmbeddingStartEvent: lambda e: {"model_dict": e.model_dict},
+    EmbeddingEndEvent: lambda e: {"chunk_count": len(e.chunks)},
+    LLMPredictStartEvent: lambda e: {"template": e.template, "template_args": e.template_args},
+    LLMPredictEndEvent: lambda e: {"output": e.output},
+    LLMStructuredPredictStartEvent: lambda e: {
+        "template": e.template,
+        "template_args": e.template_args,
+        "output_cls": e.output_cls,
+    },
+    LLMStructuredPredictEndEvent: lambda e: {"output": e.output},
+    LLMCompletionStartEvent: lambda e: {
+        "model_dict": e.model_dict,
+        "prompt": e.prompt,
+        "additional_kwargs": e.additional_kwargs,
+    },
+    LLMCompletionEndEvent: lambda e: {"response": e.response, "prompt": e.prompt},
+    LLMChatInProgressEvent: lambda e: {"messages": e.messages, "response": e.response},
+    LLMChatStartEvent: lambda e: {
+        "messages": e.messages,
+        "additional_kwargs": e.additional_kwargs,
+        "model_dict": e.model_dict,
+    },
+    LLMChatEndEvent: lambda e: {"messages": e.messages, "response": e.response},
+    RetrievalStartEvent: lambda e: {"str_or_query_bundle": e.str_or_query_bundle},
+    RetrievalEndEvent: lambda e: {
+        "str_or_query_bundle": e.str_or_query_bundle,
+        "node_count": len(e.nodes),
+        "text": _first_node_text(e.nodes),
+    },
+    ReRankStartEvent: lambda e: {"query": e.query, "node_count": len(e.nodes), "top_n": e.top_n,
+                                 "model_name": e.model_name},
+    ReRankEndEvent: lambda e: {"node_count": len(e.nodes)},
+    QueryStartEvent: lambda e: {"query": e.query},
+    QueryEndEvent: lambda e: {"response": e.response, "query": e.query},
+    SpanDropEvent: lambda e: {"err_str": e.err_str},
+    SynthesizeStartEvent: lambda e: {"query": e.query},
+    SynthesizeEndEvent: lambda e: {"response": e.response, "query": e.query},
+    GetResponseStartEvent: lambda e: {"query_str": e.query_str},
+}
+
+# Extractors by concrete event class, filled on the first event of each class
+_extractors_by_type: Dict[type, tuple] = {}
+
+
+def _extractors_for(event_type):
+    extractors = _extractors_by_type.get(event_type)
+    if extractors is None:
+        extractors = tuple(extract for event_class, extract in _EVENT_EXTRACTORS.items()
+                           if issubclass(event_type, event_class))
+        _extractors_by_type[event_type] = extractors
+    return extractors
+
+
 class EventHandler(BaseEventHandler):
     """Example event handler.
 
@@ -94,10 +175,8 @@ class EventHandler(BaseEventHandler):
     - QueryEndEvent
     """
 
-    events: List[BaseEvent] = []
     current_trace: List[Dict[str, Any]] = []  # Store events for the current trace
 
-
     @classmethod
     def class_name(cls) -> str:
         """Class name."""
@@ -105,12 +184,6 @@ class EventHandler(BaseEventHandler):
 
     def handle(self, event: BaseEvent) -> None:
         """Logic for handling event."""
-        # print("-----------------------")
-        # # all events have these attributes
-        # print(event.id_)
-        # print(event.timestamp)
-        # print(event.span_id)
-
         # Prepare event details dictionary
         event_details = {
             "id": event.id_,
@@ -120,155 +193,16 @@ class EventHandler(BaseEventHandler):
         }
 
         # event specific attributes
-        # print(f"Event type: {event.class_name()}")
-        if isinstance(event, AgentRunStepStartEvent):
-            event_details.update({
-                "task_id": event.task_id,
-                "step": event.step,
-                "input": event.input,
-            })
-        if isinstance(event, AgentRunStepEndEvent):
-            event_details.update({
-                "step_output": event.step_output,
-            })
-        if isinstance(event, AgentChatWithStepStartEvent):
-            event_details.update({
-                "user_msg": event.user_msg,
-            })
-        if isinstance(event, AgentChatWithStepEndEvent):
-            event_details.update({
-                "response": event.response,
-            })
-        if isinstance(event, AgentToolCallEvent):
-            event_details.update({
-                "arguments": event.arguments,
-                "tool_name": event.tool.name,
-                "tool_description": event.tool.description,
-                "tool_openai": event.tool.to_openai_tool(),
-            })
-        if isinstance(event, StreamChatDeltaReceivedEvent):
-            event_details.update({
-                "delta": event.delta,
-            })
-        if isinstance(event, StreamChatErrorEvent):
-            event_details.update({
-                "exception": event.exception,
-            })
-        if isinstance(event, EmbeddingStartEvent):
-            event_details.update({
-                "model_dict": event.model_dict,
-            })
-        if isinstance(event, EmbeddingEndEvent):
-            event_details.update({
-                "chunks": event.chunks,
-                "embeddings": event.embeddings[0][:5],
-            })
-        if isinstance(event, LLMPredictStartEvent):
-            event_details.update({
-                "template": event.template,
-                "template_args": event.template_args,
-            })
-        if isinstance(event, LLMPredictEndEvent):
-            event_details.update({
-                "output": event.output,
-            })
-        if isinstance(event, LLMStructuredPredictStartEvent):
-            event_details.update({
-                "template": event.template,
-                "template_args": event.template_args,
-                "output_cls": event.output_cls,
-            })
-        if isinstance(event, LLMStructuredPredictEndEvent):
-            event_details.update({
-                "output": event.output,
-            })
-        if isinstance(event, LLMCompletionStartEvent):
-            event_details.update({
-                "model_dict": event.model_dict,
-                "prompt": event.prompt,
-                "additional_kwargs": event.additional_kwargs,
-            })
-        if isinstance(event, LLMCompletionEndEvent):
-            event_details.update({
-                "response": event.response,
-                "prompt": event.prompt,
-            })
-        if isinstance(event, LLMChatInProgressEvent):
-            event_details.update({
-                "messages": event.messages,
-                "response": event.response,
-            })
-        if isinstance(event, LLMChatStartEvent):
-            event_details.update({
-                "messages": event.messages,
-                "additional_kwargs": event.additional_kwargs,
-                "model_dict": event.model_dict,
-            })
-        if isinstance(event, LLMChatEndEvent):
-            event_details.update({
-                "messages": event.messages,
-                "response": event.response,
-            })
-        if isinstance(event, RetrievalStartEvent):
-            event_details.update({
-                "str_or_query_bundle": event.str_or_query_bundle,
-            })
-        if isinstance(event, RetrievalEndEvent):
-            event_details.update({
-                "str_or_query_bundle": event.str_or_query_bundle,
-                "nodes": event.nodes,
-                "text": event.nodes[0].text
-            })
-        if isinstance(event, ReRankStartEvent):
-            event_details.update({
-                "query": event.query,
-                "nodes": event.nodes,
-                "top_n": event.top_n,
-                "model_name": event.model_name,
-            })
-        if isinstance(event, ReRankEndEvent):
-            event_details.update({
-                "nodes": event.nodes,
-            })
-        if isinstance(event, QueryStartEvent):
-            event_details.update({
-                "query": event.query,
-            })
-        if isinstance(event, QueryEndEvent):
-            event_details.update({
-                "response": event.response,
-                "query": event.query,
-            })
-        if isinstance(event, SpanDropEvent):
-            event_details.update({
-                "err_str": event.err_str,
-            })
-        if isinstance(event, SynthesizeStartEvent):
-            event_details.update({
-                "query": event.query,
-            })
-        if isinstance(event, SynthesizeEndEvent):
-            event_details.update({
-                "response": event.response,
-                "query": event.query,
-            })
-        if isinstance(event, GetResponseStartEvent):
-            event_details.update({
-                "query_str": event.query_str,
-            })
+        for extract in _extractors_for(type(event)):
+            event_details.update(extract(event))
 
         # Append event details to current_trace
         self.current_trace.append(event_details)
 
-        self.events.append(event)
-
-    def _get_events_by_span(self) -> Dict[str, List[BaseEvent]]:
-        events_by_span: Dict[str, List[BaseEvent]] = {}
-        for event in self.events:
-            if event.span_id in events_by_span:
-                events_by_span[event.span_id].append(event)
-            else:
-                events_by_span[event.span_id] = [event]
+    def _get_events_by_span(self) -> Dict[str, List[Dict[str, Any]]]:
+        events_by_span: Dict[str, List[Dict[str, Any]]] = {}
+        for event in self.current_trace:
+            events_by_span.setdefault(event["span_id"], []).append(event)
         return events_by_span
 
     # def _get_event_span_trees(self) -> List[Tree]:
@@ -366,8 +300,14 @@ class SpanHandler(BaseSpanHandler[SimpleSpan]):
 
 
 class LlamaIndexInstrumentationTracer:
-    def __init__(self, user_detail):
-        """Initialize the LlamaIndexTracer with handlers but don't start tracing yet."""
+    def __init__(self, user_detail, local_trace_dir=None):
+        """Initialize the LlamaIndexTracer with handlers but don't start tracing yet.
+
+        Args:
+            user_detail (dict): Project, metadata and pipeline details for the trace.
+            local_trace_dir (str, optional): Directory to also write the raw instrumentation
+                trace of every run to. Defaults to None, which keeps it in memory only.
+        """
         # Initialize the root dispatcher
         self.root_dispatcher = get_dispatcher()
 
@@ -379,6 +319,7 @@ class LlamaIndexInstrumentationTracer:
         self.is_tracing = False  # Flag to check if tracing is active
 
         self.user_detail = user_detail
+        self.local_trace_dir = local_trace_dir
 
     def start(self):
         """Start tracing by registering handlers."""
@@ -387,6 +328,7 @@ class LlamaIndexInstrumentationTracer:
             return
 
         # Register handlers
+        self.json_event_handler.current_trace = []
         self.root_dispatcher.add_span_handler(self.span_handler)
         self.root_dispatcher.add_span_handler(self.simple_span_handler)
         self.root_dispatcher.add_event_handler(self.json_event_handler)
@@ -400,7 +342,8 @@ class LlamaIndexInstrumentationTracer:
             print("Tracing is not active.")
             return
 
-        # Write current_trace to a JSON file
+        self._remove_handlers()
+
         final_traces = {
             "project_id": self.user_detail["project_id"],
             "trace_id": str(uuid.uuid4()),
@@ -411,14 +354,36 @@ class LlamaIndexInstrumentationTracer:
             "traces": self.json_event_handler.current_trace,
 
         }
+        self._save_local_trace(final_traces)
 
-        with open('new_llamaindex_traces.json', 'w') as f:
-            json.dump([final_traces], f, default=str, indent=4)
-        
         llamaindex_instrumentation_data = extract_llama_index_data([final_traces])
         converted_back_to_callback = convert_llamaindex_instrumentation_to_callback(llamaindex_instrumentation_data)
 
          # Just indicate tracing is stopped
         self.is_tracing = False
         print("Tracing stopped.")
-        return converted_back_to_callback
\ No newline at end of file
+        return converted_back_to_callback
+
+    def _remove_handlers(self):
+        # The dispatcher has no remove methods; handlers are pydantic models,
+        # so match them by identity rather than by (field) equality
+        ours = (self.span_handler, self.simple_span_handler, self.json_event_handler)
+        self.root_dispatcher.span_handlers[:] = [
+            handler for handler in self.root_dispatcher.span_handlers
+            if not any(handler is own for own in ours)
+        ]
+        self.root_dispatcher.event_handlers[:] = [
+            handler for handler in self.root_dispatcher.event_handlers
+            if not any(handler is own for own in ours)
+        ]
+
+    def _save_local_trace(self, final_traces):
+        if not self.local_trace_dir:
+            return
+        try:
+            os.makedirs(self.local_trace_dir, exist_ok=True)
+            filepath = os.path.join(self.local_trace_dir, f"new_llamaindex_traces_{final_traces['trace_id']}.json")
+            with open(filepath, 'w') as f:
+                json.dump([final_traces], f, default=str, indent=4)
+        except OSError as e:
+            logger.warning(f"Could not write llamaindex trace to {self.local_trace_dir}: {e}")
@@ -5,27 +5,23 @@ import logging
 import asyncio
 import aiohttp
 import requests
-from litellm import model_cost
 
 from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor
-from ragaai_catalyst.tracers.langchain_callback import LangchainTracer
 from ragaai_catalyst.tracers.utils.convert_langchain_callbacks_output import convert_langchain_callbacks_output
 
 from ragaai_catalyst.tracers.utils.langchain_tracer_extraction_logic import langchain_tracer_extraction
 from ragaai_catalyst.tracers.upload_traces import UploadTraces
 import tempfile
 import json
-import numpy as np
-from opentelemetry.sdk import trace as trace_sdk
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from ragaai_catalyst.tracers.exporters.file_span_exporter import FileSpanExporter
 from ragaai_catalyst.tracers.exporters.raga_exporter import RagaExporter
 from ragaai_catalyst.tracers.utils import get_unique_key
 # from ragaai_catalyst.tracers.llamaindex_callback import LlamaIndexTracer
-from ragaai_catalyst.tracers.llamaindex_instrumentation import LlamaIndexInstrumentationTracer
 from ragaai_catalyst import RagaAICatalyst
+from ragaai_catalyst.name_resolver import name_resolver
+from ragaai_catalyst.tracers.utils.model_prices import model_prices
 from ragaai_catalyst.tracers.agentic_tracing import AgenticTracing
+from ragaai_catalyst.tracers.agentic_tracing.tracers.base import TraceField
 from ragaai_catalyst.tracers.agentic_tracing.tracers.llm_tracer import LLMTracerMixin
 from ragaai_catalyst.tracers.exporters.ragaai_trace_exporter import RAGATraceExporter
 from ragaai_catalyst.tracers.agentic_tracing.utils.file_name_tracker import TrackName
@@ -58,6 +54,17 @@ class Tracer(AgenticTracing):
             'custom':True
         },
         interval_time=2,
+        memory_tracking="off",  # "off", "rss" or "tracemalloc"
+        memory_tracking_spans=None,  # span names to measure, None for all spans
+        network_metadata_only=False,  # skip request/response bodies of network calls
+        spool_components=False,  # stream finished components to disk instead of memory
+        max_variable_events=1000,  # cap on variable trace entries per trace_custom span
+        file_io_include=None,  # glob patterns of file paths to trace, None for all
+        file_io_exclude=None,  # glob patterns of file paths never to trace
+        file_io_metadata_only=False,  # record path, mode and size of file IO without content
+        file_io_max_content=64 * 1024,  # cap on file content kept per interaction, None for no cap
+        offline=False,  # skip the project lookup here and leave it to the upload
+        local_trace_dir=None,  # also write each final langchain/llamaindex trace here, None to keep them in memory only
         # auto_instrumentation=True/False  # to control automatic instrumentation of everything
 
     ):
@@ -72,7 +79,30 @@ class Tracer(AgenticTracing):
             metadata (dict, optional): The metadata. Defaults to None.
             description (str, optional): The description. Defaults to None.
             timeout (int, optional): The upload timeout in seconds. Defaults to 30.
-            update_llm_cost (bool, optional): Whether to update model costs from GitHub. Defaults to True.
+            update_llm_cost (bool, optional): Whether to update model costs from GitHub. The bundled prices are
+                refreshed from litellm's price table once per process, on the first cost calculation. Defaults to True.
+            memory_tracking (str, optional): Per-component memory accounting mode. "off" skips sampling,
+                "rss" samples process RSS and "tracemalloc" measures Python allocations. Defaults to "off".
+            memory_tracking_spans (list, optional): Only measure memory for these span names. Defaults to None (all spans).
+            network_metadata_only (bool, optional): Record only url, method, status, timings, sizes and headers
+                of network calls, without reading or storing bodies. Defaults to False.
+            spool_components (bool, optional): Append finished components to a JSONL segment on disk and
+                build the trace file from it in a streaming pass on stop. Useful for long-running traces.
+                Defaults to False.
+            max_variable_events (int, optional): Maximum number of variable trace entries recorded for one
+                trace_custom span. Defaults to 1000.
+            file_io_include (list, optional): Glob patterns matched against the path passed to open();
+                only matching files are traced. Defaults to None (all files).
+            file_io_exclude (list, optional): Glob patterns of file paths that are never traced. Defaults to None.
+            file_io_metadata_only (bool, optional): Record the path, mode and size of file reads and writes
+                without their content. Defaults to False.
+            file_io_max_content (int, optional): Maximum number of characters (or bytes) of file content kept
+                per interaction. Defaults to 65536; None keeps everything.
+            offline (bool, optional): Do not look up the project when the tracer is created. A project id
+                resolved earlier in the process (or found in the resolver's disk cache) is still used;
+                otherwise the project is looked up and validated when the trace is uploaded. Defaults to False.
+            local_trace_dir (str, optional): Directory to also write the final langchain or llamaindex trace of every run to,
+                in a file named after its trace id. Traces are uploaded from memory either way. Defaults to None.
         """
 
         user_detail = {
@@ -80,6 +110,17 @@ class Tracer(AgenticTracing):
             "project_id": None,  # Will be set after project validation
             "dataset_name": dataset_name,
             "interval_time": interval_time,
+            "memory_tracking": memory_tracking,
+            "memory_tracking_spans": memory_tracking_spans,
+            "network_metadata_only": network_metadata_only,
+            "spool_components": spool_components,
+            "max_variable_events": max_variable_events,
+            "file_io_include": file_io_include,
+            "file_io_exclude": file_io_exclude,
+            "file_io_metadata_only": file_io_metadata_only,
+            "file_io_max_content": file_io_max_content,
+            "offline": offline,
+            "local_trace_dir": local_trace_dir,
             "trace_name": trace_name if trace_name else f"trace_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}",
             "trace_user_detail": {"metadata": metadata} if metadata else {}
         }
@@ -133,40 +174,37 @@ class Tracer(AgenticTracing):
         self.pipeline = pipeline
         self.description = description
         self.timeout = timeout
+        self.memory_tracking = memory_tracking
+        self.memory_tracking_spans = memory_tracking_spans
+        self.network_metadata_only = network_metadata_only
+        self.spool_components = spool_components
+        self.max_variable_events = max_variable_events
+        self.file_io_include = file_io_include
+        self.file_io_exclude = file_io_exclude
+        self.file_io_metadata_only = file_io_metadata_only
+        self.file_io_max_content = file_io_max_content
+        self.offline = offline
+        self.update_llm_cost = update_llm_cost
+        self.local_trace_dir = local_trace_dir
+        if update_llm_cost:
+            model_prices.request_refresh()
         self.base_url = f"{RagaAICatalyst.BASE_URL}"
         self.num_projects = 99999
         self.start_time = datetime.datetime.now().astimezone().isoformat()
-        self.model_cost_dict = model_cost
         self.user_context = ""  # Initialize user_context to store context from add_context
         self.file_tracker = TrackName()
         
-        try:
-            response = requests.get(
-                f"{self.base_url}/v2/llm/projects?size={self.num_projects}",
-                headers={
-                    "Authorization": f'Bearer {os.getenv("RAGAAI_CATALYST_TOKEN")}',
-                },
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            logger.debug("Projects list retrieved successfully")
-
-            project_list = [
-                project["name"] for project in response.json()["data"]["content"]
-            ]
-            if project_name not in project_list:
+        if offline:
+            # Validated by the upload when it is not known yet
+            self.project_id = name_resolver.cached_project_id(project_name)
+        else:
+            try:
+                self.project_id = name_resolver.project_id(project_name, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Failed to retrieve projects list: {e}")
+                raise
+            if self.project_id is None:
                 raise ValueError("Project not found. Please enter a valid project name")
-            
-            self.project_id = [
-                project["id"] for project in response.json()["data"]["content"] if project["name"] == project_name
-            ][0]
-            # super().__init__(user_detail=self._pass_user_data())
-            # self.file_tracker = TrackName()
-            self._pass_user_data()
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to retrieve projects list: {e}")
-            raise
 
         if tracer_type == "langchain":
             # self.raga_client = RagaExporter(project_name=self.project_name, dataset_name=self.dataset_name)
@@ -337,6 +375,11 @@ class Tracer(AgenticTracing):
             self._upload_task = None
             # raise ValueError (f"Currently supported tracer types are 'langchain' and 'llamaindex'.")
 
+    @property
+    def model_cost_dict(self):
+        """Per-token prices by model name, from the shared price table"""
+        return model_prices
+
     def set_model_cost(self, cost_config):
         """
         Set custom cost values for a specific model.
@@ -397,7 +440,19 @@ class Tracer(AgenticTracing):
                 'pipeline': self.pipeline,
                 'metadata': self.metadata,
                 'description': self.description,
-                'timeout': self.timeout
+                'timeout': self.timeout,
+                'memory_tracking': self.memory_tracking,
+                'memory_tracking_spans': self.memory_tracking_spans,
+                'network_metadata_only': self.network_metadata_only,
+                'spool_components': self.spool_components,
+                'max_variable_events': self.max_variable_events,
+                'file_io_include': self.file_io_include,
+                'file_io_exclude': self.file_io_exclude,
+                'file_io_metadata_only': self.file_io_metadata_only,
+                'file_io_max_content': self.file_io_max_content,
+                'offline': self.offline,
+                'update_llm_cost': self.update_llm_cost,
+                'local_trace_dir': self.local_trace_dir
             }
             
             # Reinitialize self with new dataset_name and stored parameters
@@ -418,6 +473,10 @@ class Tracer(AgenticTracing):
         return data
 
     def _setup_provider(self):
+        from opentelemetry.sdk import trace as trace_sdk
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from ragaai_catalyst.tracers.exporters.file_span_exporter import FileSpanExporter
+
         self.filespanx = FileSpanExporter(
             project_name=self.project_name,
             metadata=self.metadata,
@@ -439,7 +498,7 @@ class Tracer(AgenticTracing):
         return instrumentors[tracer_type]().get()
 
     @contextmanager
-    def trace(self):
+    def _trace(self):
         """
         Synchronous context manager for tracing.
         Usage:
@@ -452,6 +511,22 @@ class Tracer(AgenticTracing):
         finally:
             self.stop()
 
+    # The trace data once started, the context manager above until then
+    trace = TraceField(fallback=_trace)
+
+    def trace_context(self, name=None):
+        """
+        Record the calls made inside the block as a separate trace, for example one
+        per request in a web server. Only supported for the agentic tracer types;
+        see BaseTracer.trace_context.
+
+        Raises:
+            ValueError: If tracer_type is 'langchain' or 'llamaindex'.
+        """
+        if self.tracer_type in ["langchain", "llamaindex"]:
+            raise ValueError("trace_context is not supported for 'langchain' and 'llamaindex' tracer types")
+        return super().trace_context(name)
+
     def start(self):
         """Start the tracer."""
         if self.tracer_type == "langchain":
@@ -459,10 +534,15 @@ class Tracer(AgenticTracing):
             #     self._instrumentor().instrument(tracer_provider=self._tracer_provider)
             #     self.is_instrumented = True
             # print(f"Tracer started for project: {self.project_name}")
+            from ragaai_catalyst.tracers.langchain_callback import LangchainTracer
+
             self.langchain_tracer = LangchainTracer()
             return self.langchain_tracer.start()
         elif self.tracer_type == "llamaindex":
-            self.llamaindex_tracer = LlamaIndexInstrumentationTracer(self._pass_user_data())
+            from ragaai_catalyst.tracers.llamaindex_instrumentation import LlamaIndexInstrumentationTracer
+
+            self.llamaindex_tracer = LlamaIndexInstrumentationTracer(self._pass_user_data(),
+                                                                    local_trace_dir=self.local_trace_dir)
             return self.llamaindex_tracer.start()
         else:
             super().start()
@@ -481,6 +561,7 @@ class Tracer(AgenticTracing):
             # self.is_active = False
             # self.dataset_name = None
             
+            self._resolve_project_id()
             user_detail = self._pass_user_data()
             data, additional_metadata = self.langchain_tracer.stop()
 
@@ -545,14 +626,11 @@ class Tracer(AgenticTracing):
                 final_result[0]['session_id'] = None
                 final_result[0]['metadata'] = combined_metadata
                 final_result[0]['pipeline'] = user_detail.get('trace_user_detail', {}).get('pipeline')
-
-                filepath_3 = os.path.join(os.getcwd(), "final_result.json")
-                with open(filepath_3, 'w') as f:
-                    json.dump(final_result, f, indent=2)
-                
-                # print(filepath_3)
             else:
                 logger.warning("No valid langchain traces found in final_result")
+                return
+
+            filepath_3 = self._save_local_trace(final_result, f"final_result_{final_result[0]['trace_id']}.json")
 
             # additional_metadata_keys = list(additional_metadata.keys()) if additional_metadata else None
             additional_metadata_dict = additional_metadata if additional_metadata else {}
@@ -562,7 +640,8 @@ class Tracer(AgenticTracing):
                          project_id=self.project_id,
                          dataset_name=self.dataset_name,
                          user_detail=self._pass_user_data(),
-                         base_url=self.base_url
+                         base_url=self.base_url,
+                         traces=final_result
                          ).upload_traces(additional_metadata_keys=additional_metadata_dict)
             
             return 
@@ -571,25 +650,40 @@ class Tracer(AgenticTracing):
             if self.llamaindex_tracer is None:
                 raise ValueError("LlamaIndex tracer was not started")
 
+            self._resolve_project_id()
             user_detail = self._pass_user_data()
             converted_back_to_callback = self.llamaindex_tracer.stop()
 
-            filepath_3 = os.path.join(os.getcwd(), "llama_final_result.json")
-            with open(filepath_3, 'w') as f:
-                json.dump(converted_back_to_callback, f, default=str, indent=2)
-
             if converted_back_to_callback:
+                trace_id = converted_back_to_callback[0]["trace_id"]
+                filepath_3 = self._save_local_trace(converted_back_to_callback,
+                                                    f"llama_final_result_{trace_id}.json")
                 UploadTraces(json_file_path=filepath_3,
                              project_name=self.project_name,
                              project_id=self.project_id,
                              dataset_name=self.dataset_name,
                              user_detail=user_detail,
-                             base_url=self.base_url
+                             base_url=self.base_url,
+                             traces=converted_back_to_callback
                              ).upload_traces()
             return 
         else:
             super().stop()
 
+    def _save_local_trace(self, traces, filename):
+        """Write `traces` to `filename` in local_trace_dir; returns the path, or None when not configured"""
+        if not self.local_trace_dir:
+            return None
+        try:
+            os.makedirs(self.local_trace_dir, exist_ok=True)
+            filepath = os.path.join(self.local_trace_dir, filename)
+            with open(filepath, 'w') as f:
+                json.dump(traces, f, default=str, indent=2)
+            return filepath
+        except OSError as e:
+            logger.warning(f"Could not write trace to {self.local_trace_dir}: {e}")
+            return None
+
     def get_upload_status(self):
         """Check the status of the trace upload."""
         if self.tracer_type == "langchain":
@@ -637,10 +731,11 @@ class Tracer(AgenticTracing):
                 )
 
             try:
+                json_file_path = self.filespanx.materialize(self.filespanx.sync_file)
                 upload_stat = await asyncio.wait_for(
                     self.raga_client.check_and_upload_files(
                         session=session,
-                        file_paths=[self.filespanx.sync_file],
+                        file_paths=[json_file_path] if json_file_path else [],
                     ),
                     timeout=self.timeout,
                 )
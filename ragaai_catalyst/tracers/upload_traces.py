@@ -5,14 +5,23 @@ from datetime import datetime
 
 
 class UploadTraces:
+    """
+    Uploads langchain or llamaindex traces to a dataset.
+
+    The traces are either read from `json_file_path` or, when `traces` is
+    given, serialized straight from memory without touching the disk.
+    """
+
     def __init__(self, 
                  json_file_path,
                  project_name,
                  project_id,
                  dataset_name,
                  user_detail,
-                 base_url):
+                 base_url,
+                 traces=None):
         self.json_file_path = json_file_path
+        self.traces = traces
         self.project_name = project_name
         self.project_id = project_id
         self.dataset_name = dataset_name
@@ -98,7 +107,13 @@ class UploadTraces:
             presignedUrls = response.json()["data"]["presignedUrls"][0]
             return presignedUrls
 
-    def _put_presigned_url(self, presignedUrl, filename):
+    def _payload(self, filename):
+        if self.traces is not None:
+            return json.dumps(self.traces, default=str).encode()
+        with open(filename) as f:
+            return f.read().replace("\n", "").replace("\r", "").encode()
+
+    def _put_presigned_url(self, presignedUrl, filename=None):
         headers = {
                 "Content-Type": "application/json",
             }
@@ -106,9 +121,8 @@ class UploadTraces:
         if "blob.core.windows.net" in presignedUrl:  # Azure
             headers["x-ms-blob-type"] = "BlockBlob"
         print(f"Uploading traces...")
-        with open(filename) as f:
-            payload = f.read().replace("\n", "").replace("\r", "").encode()
-            
+        payload = self._payload(filename)
+
 
         response = requests.request("PUT", 
                                     presignedUrl, 
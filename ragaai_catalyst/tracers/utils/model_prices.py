@@ -0,0 +1,112 @@
+import os
+import json
+import logging
+import threading
+from collections.abc import Mapping
+from importlib import resources
+
+logger = logging.getLogger(__name__)
+logging_level = (
+    logger.setLevel(logging.DEBUG) if os.getenv("DEBUG") == "1" else logging.INFO
+)
+
+PRICES_FILE = "model_prices_and_context_window_backup.json"
+COST_FIELDS = ("input_cost_per_token", "output_cost_per_token")
+
+
+def _cost_entry(spec):
+    """The cost fields of one price table entry, or None if it has no per-token prices"""
+    if not isinstance(spec, dict) or not any(field in spec for field in COST_FIELDS):
+        return None
+    try:
+        return {field: float(spec.get(field) or 0.0) for field in COST_FIELDS}
+    except (TypeError, ValueError):
+        return None
+
+
+class ModelPrices(Mapping):
+    """
+    Per-token prices by model name, shared by every tracer in the process.
+
+    The bundled price table is parsed on the first lookup, not at import,
+    and only the per-token cost fields of each model are kept. Alias keys
+    that callers look models up by, such as "azure-gpt-4o" for
+    "azure/gpt-4o", are indexed up front so every lookup is a single dict
+    access.
+
+    After `request_refresh()`, the next lookup also merges in litellm's
+    price table, which litellm itself may fetch from GitHub. Refreshed
+    prices then apply to the whole process.
+    """
+
+    def __init__(self, package="ragaai_catalyst.tracers.utils", file=PRICES_FILE):
+        self._package = package
+        self._file = file
+        self._prices = None
+        self._refresh_requested = False
+        self._refreshed = False
+        self._lock = threading.Lock()
+
+    def request_refresh(self) -> None:
+        """Merge litellm's prices in on the next lookup"""
+        self._refresh_requested = True
+
+    def __getitem__(self, model_name):
+        return self._loaded()[model_name]
+
+    def __iter__(self):
+        return iter(self._loaded())
+
+    def __len__(self):
+        return len(self._loaded())
+
+    def __contains__(self, model_name):
+        return model_name in self._loaded()
+
+    def get(self, model_name, default=None):
+        return self._loaded().get(model_name, default)
+
+    def _loaded(self):
+        prices = self._prices
+        if prices is not None and (self._refreshed or not self._refresh_requested):
+            return prices
+        with self._lock:
+            if self._prices is None:
+                self._prices = self._index(self._read_bundled())
+            if self._refresh_requested and not self._refreshed:
+                self._refreshed = True
+                self._prices = self._index(self._read_litellm(), self._prices)
+            return self._prices
+
+    def _read_bundled(self):
+        try:
+            with resources.open_text(self._package, self._file) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load model prices from {self._file}: {e}")
+            return {}
+
+    @staticmethod
+    def _read_litellm():
+        try:
+            from litellm import model_cost
+            return model_cost
+        except Exception as e:
+            logger.warning(f"Could not update model prices from litellm, using bundled prices: {e}")
+            return {}
+
+    @staticmethod
+    def _index(table, prices=None):
+        prices = dict(prices or {})
+        for model_name, spec in table.items():
+            entry = _cost_entry(spec)
+            if entry is None:
+                continue
+            prices[model_name] = entry
+            if model_name.startswith("azure/"):
+                prices["azure-" + model_name[len("azure/"):]] = entry
+        return prices
+
+
+# The single pricing source for LLM cost calculation
+model_prices = ModelPrices()
@@ -179,13 +179,7 @@ def get_spans(input_trace, custom_model_cost):
         if "model" in final_span["info"]:
             model_name = final_span["info"]["model"] 
         
-        model_costs = {
-                "default": {"input_cost_per_token": 0.0, "output_cost_per_token": 0.0}
-            }
-        try:
-            model_costs = get_model_cost()
-        except Exception as e:
-           pass 
+        model_costs = get_model_cost()
        
         if "resource" in span:
             final_span["info"].update(span["resource"])
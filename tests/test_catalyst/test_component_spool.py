@@ -0,0 +1,137 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.tracers.base import BaseTracer
+from ragaai_catalyst.tracers.agentic_tracing.data.data_structure import Component
+
+@pytest.fixture
+def user_details():
+    return {
+        "project_name": "test_project",
+        "dataset_name": "test_dataset",
+        "project_id": "test_id",
+        "trace_name": "test_trace",
+        "interval_time": 0.01
+    }
+
+def _llm(id, name, model, prompt, response, start, interactions=None):
+    return {
+        "id": id, "hash_id": f"hash_{name}", "source_hash_id": None, "type": "llm", "name": name,
+        "start_time": start, "end_time": start, "parent_id": None,
+        "info": {"model": model, "cost": {"total_cost": 0.5}, "tokens": {"total_tokens": 10}},
+        "data": {"input": prompt, "output": response},
+        "network_calls": [], "interactions": interactions or [],
+    }
+
+def _components():
+    tool_child = {
+        "id": "c1", "hash_id": "hash_tool", "source_hash_id": None, "type": "tool", "name": "search",
+        "start_time": "2025-01-01T00:00:02", "end_time": "2025-01-01T00:00:03", "parent_id": "a1",
+        "info": {}, "data": {"input": {"args": ["q"], "kwargs": {}}, "output": "found"},
+        "network_calls": [], "interactions": [],
+    }
+    agent = {
+        "id": "a1", "hash_id": "hash_agent", "source_hash_id": None, "type": "agent", "name": "agent",
+        "start_time": "2025-01-01T00:00:01", "end_time": "2025-01-01T00:00:04", "parent_id": None,
+        "info": {}, "data": {"children": [tool_child, _llm("c2", "inner", "gpt-4o", "p", "r", "2025-01-01T00:00:03")]},
+        "network_calls": [], "interactions": [],
+    }
+    output = {"id": "i1", "interaction_type": "output", "content": "printed", "timestamp": "2025-01-01T00:00:06"}
+    return [
+        Component(**agent),
+        Component(**_llm("l1", "chat", "default", "hello", "hi", "2025-01-01T00:00:05")),
+        Component(**_llm("l2", "chat", "default", "hello", "hi", "2025-01-01T00:00:06", [output])),
+        Component(**_llm("l3", "chat", "gpt-4o", "other", "answer", "2025-01-01T00:00:07")),
+    ]
+
+def _run(user_details, spool):
+    user_details = dict(user_details, spool_components=spool)
+    with patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.ensure_uploader_running"), \
+         patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.zip_list_of_unique_files", return_value=("code_hash", "code.zip")), \
+         patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.submit_upload_task", return_value="task") as mock_submit:
+        tracer = BaseTracer(user_details)
+        tracer.start()
+        for component in _components():
+            tracer.add_component(component)
+        if spool:
+            assert tracer.components == []
+            assert len(list(tracer.iter_components())) == 4
+        tracer.stop()
+        filepath = mock_submit.call_args.kwargs["filepath"]
+    with open(filepath) as f:
+        trace = json.load(f)
+    os.remove(filepath)
+    return trace
+
+def test_spooled_trace_matches_in_memory_trace(user_details):
+    in_memory = _run(user_details, spool=False)
+    spooled = _run(user_details, spool=True)
+
+    assert spooled["data"][0]["spans"] == in_memory["data"][0]["spans"]
+    assert spooled["workflow"] == in_memory["workflow"]
+    assert spooled["metadata"]["cost"] == in_memory["metadata"]["cost"]
+    assert spooled["metadata"]["tokens"] == in_memory["metadata"]["tokens"]
+    assert spooled["metadata"]["system_info"]["source_code"] == "code_hash"
+
+    # The duplicate with interactions replaced the first one, and default-model spans became custom
+    spans = spooled["data"][0]["spans"]
+    assert [span["type"] for span in spans] == ["agent", "custom", "llm"]
+    assert spans[1]["interactions"][0]["content"] == "printed"
+
+def test_spool_file_removed_after_stop(user_details):
+    with patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.ensure_uploader_running"), \
+         patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.zip_list_of_unique_files", return_value=("h", "z")), \
+         patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.submit_upload_task", return_value="task") as mock_submit:
+        tracer = BaseTracer(dict(user_details, spool_components=True))
+        tracer.start()
+        spool_path = tracer._component_spool.path
+        tracer.add_component(_components()[1])
+        tracer.stop()
+        os.remove(mock_submit.call_args.kwargs["filepath"])
+    assert not os.path.exists(spool_path)
+    assert tracer._component_spool is None
+
+def test_spooling_waits_only_for_queued_span_metrics(user_details):
+    def results(project_id, requests):
+        return {"data": {"data": [{"score": 0.9, "metric_config": {"threshold": {}}} for _ in requests]}}
+
+    with patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.ensure_uploader_running"), \
+         patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.zip_list_of_unique_files", return_value=("h", "z")), \
+         patch("ragaai_catalyst.tracers.agentic_tracing.tracers.base.submit_upload_task", return_value="task") as mock_submit, \
+         patch("ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor.calculate_metrics",
+               side_effect=results) as mock_calculate:
+        tracer = BaseTracer(dict(user_details, spool_components=True))
+        tracer.start()
+        tracer.span("inner").local_metrics.append({"name": "Correctness", "displayName": "Correctness", "mapping": {}})
+        # A result queued for a span that is still running does not hold up other components
+        running = []
+        tracer.queue_span_metrics("inner", running)
+
+        agent, plain = _components()[:2]
+        tracer.add_component(plain)
+        mock_calculate.assert_not_called()
+
+        # The queued result belongs to a child span, so spooling the agent waits for it
+        child = agent.data["children"][1]
+        child["metrics"] = []
+        tracer.queue_span_metrics("inner", child["metrics"])
+        tracer.add_component(agent)
+        mock_calculate.assert_called_once()
+
+        spooled = {component.id: component for component in tracer.iter_components()}
+        assert spooled["a1"].data["children"][1]["metrics"][0]["score"] == 0.9
+        assert len(running) == 1
+        assert tracer._queued_metric_lists == {}
+        tracer.stop()
+        os.remove(mock_submit.call_args.kwargs["filepath"])
+
+def test_clean_trace_dedup_uses_precomputed_digest(user_details):
+    tracer = BaseTracer(user_details)
+    first, second = _components()[1], _components()[2]
+    # A precomputed digest is used as-is instead of stringifying input/output again
+    first._content_digest = second._content_digest = "same"
+    second.data = {"input": "changed", "output": "changed"}
+    trace = {"data": [{"spans": [first, second]}]}
+    spans = tracer._clean_trace(trace)["data"][0]["spans"]
+    assert spans == [second]
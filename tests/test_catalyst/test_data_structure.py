@@ -0,0 +1,49 @@
+import json
+import pytest
+from ragaai_catalyst.tracers.agentic_tracing.tracers.base import TracerJSONEncoder
+from ragaai_catalyst.tracers.agentic_tracing.data.data_structure import (
+    LLMComponent,
+    MemoryInfo,
+    Metadata,
+)
+
+def _component(**overrides):
+    fields = dict(
+        id="1", hash_id="h", source_hash_id=None, type="llm", name="chat",
+        start_time="s", end_time="e", parent_id=None, info={"model": "m"},
+        data={"input": "in", "output": "out"},
+        interactions=[{"interaction_type": "output", "content": "x", "timestamp": "t"}],
+    )
+    fields.update(overrides)
+    return LLMComponent(**fields)
+
+def test_components_have_no_instance_dict():
+    component = _component()
+    assert not hasattr(component, "__dict__")
+    assert not hasattr(component.interactions[0], "__dict__")
+    with pytest.raises(AttributeError):
+        component.unknown_attribute = 1
+
+def test_component_reads_like_span_dict():
+    component = _component()
+    assert component["type"] == "llm"
+    assert component.get("data")["input"] == "in"
+    assert component.get("missing", "default") == "default"
+    assert "hash_id" in component and "missing" not in component
+    assert dict(component) == component.to_dict()
+    with pytest.raises(KeyError):
+        component["missing"]
+
+def test_to_dict_references_nested_values():
+    component = _component()
+    as_dict = component.to_dict()
+    assert as_dict["data"] is component.data
+    assert as_dict["network_calls"] is component.network_calls
+
+def test_slotted_dataclasses_serialize_without_none_fields():
+    metadata = Metadata(cost={}, tokens={}, system_info=None, resources=MemoryInfo(total=1.0, free=None))
+    assert json.loads(json.dumps(metadata, cls=TracerJSONEncoder)) == {
+        "cost": {}, "tokens": {}, "resources": {"total": 1.0}
+    }
+    metadata.total_cost = 0.5
+    assert json.loads(json.dumps(metadata, cls=TracerJSONEncoder))["total_cost"] == 0.5
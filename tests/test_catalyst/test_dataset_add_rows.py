@@ -0,0 +1,94 @@
+import os
+import csv
+import pytest
+from unittest.mock import Mock, patch
+from ragaai_catalyst.dataset import Dataset
+
+
+@pytest.fixture
+def dataset():
+    dataset = Dataset.__new__(Dataset)
+    dataset.project_name = "project"
+    dataset.project_id = "project-id"
+    dataset.jobId = None
+    return dataset
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+def test_only_header_read_for_column_check(dataset, tmp_path):
+    csv_path = write_csv(tmp_path / "rows.csv", [["prompt", "response"], ["hi", "hello"]])
+    with patch.object(dataset, "get_dataset_columns", return_value=["prompt", "response"]), \
+            patch.object(Dataset, "_add_empty_columns") as add_empty, \
+            patch.object(Dataset, "_add_rows_from_csv") as add_rows:
+        dataset.add_rows(csv_path, "dataset")
+
+    add_empty.assert_not_called()
+    add_rows.assert_called_once_with(csv_path, "dataset")
+    assert Dataset._read_csv_header(csv_path) == ["prompt", "response"]
+
+
+def test_missing_columns_filled_in_temporary_copy(dataset, tmp_path):
+    csv_path = write_csv(tmp_path / "rows.csv", [["prompt"], ["a, b"], ["c"]])
+    uploaded = {}
+
+    def read_upload(path, dataset_name):
+        with open(path, newline="") as f:
+            uploaded["rows"] = list(csv.reader(f))
+        uploaded["path"] = path
+
+    with patch.object(dataset, "get_dataset_columns", return_value=["prompt", "response", "context"]), \
+            patch.object(Dataset, "_add_rows_from_csv", side_effect=read_upload):
+        dataset.add_rows(csv_path, "dataset")
+
+    assert uploaded["rows"] == [["prompt", "response", "context"], ["a, b", "", ""], ["c", "", ""]]
+    assert uploaded["path"] != csv_path and not os.path.exists(uploaded["path"])
+    with open(csv_path, newline="") as f:
+        assert next(csv.reader(f)) == ["prompt"]
+
+
+def test_blank_and_short_rows_keep_columns_aligned(tmp_path):
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("prompt,response\na,b\n\nc\n")
+
+    copy_path = Dataset._add_empty_columns(str(csv_path), ["context"])
+    try:
+        with open(copy_path, newline="") as f:
+            rows = list(csv.reader(f))
+    finally:
+        os.remove(copy_path)
+    assert rows == [["prompt", "response", "context"], ["a", "b", ""], ["c", "", ""]]
+
+
+def test_unreadable_csv_raises_value_error(dataset, tmp_path):
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    with patch.object(dataset, "get_dataset_columns", return_value=["prompt"]):
+        with pytest.raises(ValueError, match="Unable to read CSV file"):
+            dataset.add_rows(str(empty), "dataset")
+
+
+def test_csv_streamed_to_presigned_url(dataset, tmp_path):
+    csv_path = write_csv(tmp_path / "rows.csv", [["prompt"], ["hi"]])
+    presigned = Mock(json=Mock(return_value={"success": True, "data": {"presignedUrl": "https://blob", "fileName": "f.csv"}}))
+    dataset_details = Mock(json=Mock(return_value={"data": {"datasetColumnsResponses": [{"displayName": "prompt", "columnType": "text"}]}}))
+    datasets = Mock(status_code=200, json=Mock(return_value={"data": {"content": [{"id": 1, "name": "dataset"}]}}))
+    added = Mock(status_code=200, json=Mock(return_value={"success": True, "message": "ok", "data": {"jobId": 7}}))
+    bodies = []
+
+    def put(url, headers, data, timeout):
+        bodies.append((data.name, isinstance(data, bytes)))
+        return Mock(status_code=200)
+
+    with patch.object(dataset, "get_dataset_columns", return_value=["prompt"]), \
+            patch("ragaai_catalyst.dataset.requests.get", side_effect=[presigned, dataset_details]), \
+            patch("ragaai_catalyst.dataset.requests.post", side_effect=[datasets, added]), \
+            patch("ragaai_catalyst.dataset.requests.put", side_effect=put):
+        dataset.add_rows(csv_path, "dataset")
+
+    assert bodies == [(csv_path, False)]
+    assert dataset.jobId == 7
@@ -0,0 +1,53 @@
+import inspect
+import weakref
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.utils import file_name_tracker
+from ragaai_catalyst.tracers.agentic_tracing.utils.file_name_tracker import TrackName
+
+def test_decorated_call_records_caller_file():
+    tracker = TrackName()
+
+    @tracker.trace_decorator
+    def decorated():
+        return "done"
+
+    assert decorated() == "done"
+    assert tracker.get_unique_files() == [__file__]
+
+def test_stack_is_not_inspected_per_call():
+    """The frame fast path never builds the full inspect.stack()"""
+    tracker = TrackName()
+
+    @tracker.trace_decorator
+    def decorated():
+        pass
+
+    with patch.object(inspect, "stack") as mock_stack:
+        for _ in range(10):
+            decorated()
+        tracker.trace_main_file()
+        mock_stack.assert_not_called()
+
+def test_notebook_detection_runs_once():
+    tracker = TrackName()
+
+    @tracker.trace_decorator
+    def decorated():
+        pass
+
+    with patch.object(file_name_tracker, "_notebook_checked", False), \
+         patch.object(file_name_tracker, "_running_in_notebook", False), \
+         patch("IPython.get_ipython", create=True) as mock_get_ipython:
+        decorated()
+        decorated()
+        assert mock_get_ipython.call_count == 1
+
+def test_file_names_do_not_keep_code_alive():
+    namespace = {}
+    exec(compile("def generated():\n    pass\n", __file__, "exec"), namespace)
+    code = namespace.pop("generated").__code__
+    assert file_name_tracker._code_file_name(code) == __file__
+
+    code_ref = weakref.ref(code)
+    del code
+    assert code_ref() is None
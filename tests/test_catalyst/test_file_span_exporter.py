@@ -0,0 +1,62 @@
+import os
+import json
+import pytest
+from unittest.mock import Mock, patch
+from ragaai_catalyst.tracers.exporters.file_span_exporter import FileSpanExporter
+from ragaai_catalyst.tracers.utils import get_unique_key
+
+
+def span(trace_id, name):
+    return Mock(to_json=Mock(return_value=json.dumps({"name": name, "context": {"trace_id": trace_id}})))
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    exporter = FileSpanExporter(project_name="project", metadata={"log_source": "test"},
+                                pipeline={"llm_model": "gpt-4o"})
+    exporter.dir_name = str(tmp_path)
+    with patch.object(FileSpanExporter, "_run_async") as run_async, \
+            patch.object(FileSpanExporter, "_upload_traces", Mock(side_effect=lambda json_file_path: json_file_path)):
+        exporter.run_async = run_async
+        yield exporter
+
+
+def test_batches_appended_to_jsonl_only(exporter, tmp_path):
+    for name in ("a", "b", "c"):
+        exporter.export([span("t1", name)])
+
+    assert os.listdir(tmp_path) == ["t1.jsonl"]
+    records = list(FileSpanExporter.read_traces(str(tmp_path / "t1.jsonl")))
+    assert [r["traces"][0]["name"] for r in records] == ["a", "b", "c"]
+    exporter.run_async.assert_not_called()
+
+
+def test_ids_hashed_once_and_stable(exporter):
+    with patch("ragaai_catalyst.tracers.exporters.file_span_exporter.get_unique_key",
+               wraps=get_unique_key) as unique_key:
+        for name in ("a", "b"):
+            exporter.export([span("t1", name)])
+    records = list(FileSpanExporter.read_traces(exporter.filename))
+
+    assert unique_key.call_count == 2 + 2  # metadata and pipeline once, plus one prompt id per span
+    assert records[0]["metadata"]["id"] == records[1]["metadata"]["id"] == get_unique_key({"log_source": "test"})
+    assert records[1]["pipeline"]["id"] == get_unique_key({"llm_model": "gpt-4o"})
+
+
+def test_previous_trace_materialized_when_next_starts(exporter, tmp_path):
+    exporter.export([span("t1", "a")])
+    exporter.export([span("t1", "b")])
+    exporter.export([span("t2", "c")])
+
+    exporter.run_async.assert_called_once_with(str(tmp_path / "t1.json"))
+    with open(tmp_path / "t1.json") as f:
+        assert [r["traces"][0]["name"] for r in json.load(f)] == ["a", "b"]
+    assert exporter.sync_file == str(tmp_path / "t2.jsonl")
+
+
+def test_materialize_without_records(tmp_path):
+    empty = tmp_path / "t1.jsonl"
+    empty.write_text("")
+    assert FileSpanExporter.materialize(str(empty)) is None
+    assert FileSpanExporter.materialize(None) is None
+    assert os.listdir(tmp_path) == ["t1.jsonl"]
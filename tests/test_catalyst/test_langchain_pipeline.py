@@ -0,0 +1,113 @@
+import os
+import json
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+from ragaai_catalyst.tracers.tracer import Tracer
+from ragaai_catalyst.tracers.upload_traces import UploadTraces
+from ragaai_catalyst.tracers.langchain_callback import LangchainTracer
+from ragaai_catalyst.name_resolver import name_resolver
+
+
+def callback_trace():
+    handler = LangchainTracer()
+    handler.reset_trace()
+    handler.current_trace["start_time"] = "2024-01-01 00:00:00"
+    handler.on_chain_start({"name": "chain"}, {"query": "hi"}, run_id="run")
+    return handler.current_trace
+
+
+@pytest.fixture
+def langchain_tracer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tracer = Tracer("project", "dataset", tracer_type="langchain", offline=True)
+    tracer.langchain_tracer = Mock(stop=Mock(return_value=(callback_trace(), {})))
+    with patch.object(name_resolver, "project_id", return_value="project-id"):
+        yield tracer
+
+
+def test_stop_uploads_from_memory(langchain_tracer, tmp_path):
+    with patch("ragaai_catalyst.tracers.tracer.UploadTraces") as upload:
+        langchain_tracer.stop()
+
+    traces = upload.call_args.kwargs["traces"]
+    assert upload.call_args.kwargs["json_file_path"] is None
+    assert traces[0]["project_name"] == "project"
+    assert traces[0]["traces"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_stop_writes_a_file_per_run_when_asked(langchain_tracer, tmp_path):
+    langchain_tracer.local_trace_dir = str(tmp_path / "traces")
+    with patch("ragaai_catalyst.tracers.tracer.UploadTraces") as upload:
+        langchain_tracer.stop()
+        langchain_tracer.stop()
+
+    paths = [call.kwargs["json_file_path"] for call in upload.call_args_list]
+    assert len(set(paths)) == 2
+    for path, call in zip(paths, upload.call_args_list):
+        with open(path) as f:
+            assert json.load(f)[0]["trace_id"] == call.kwargs["traces"][0]["trace_id"]
+
+
+def test_upload_sends_in_memory_traces():
+    traces = [{"trace_id": "t1", "traces": [{"name": "line\nbreak"}]}]
+    uploader = UploadTraces(json_file_path=None, project_name="project", project_id="project-id",
+                            dataset_name="dataset", user_detail={}, base_url="https://catalyst.test/api",
+                            traces=traces)
+    with patch("ragaai_catalyst.tracers.upload_traces.requests.request") as request:
+        uploader._put_presigned_url("https://bucket.test/upload")
+    assert json.loads(request.call_args.kwargs["data"]) == traces
+
+
+def test_callback_saves_go_to_separate_files(tmp_path):
+    first, second = LangchainTracer(output_path=str(tmp_path)), LangchainTracer(output_path=str(tmp_path))
+    for handler in (first, second, first):
+        handler.current_trace["start_time"] = "2024-01-01 00:00:00"
+        handler.force_save()
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_save_inside_running_loop_writes_right_away(tmp_path):
+    handler = LangchainTracer(output_path=str(tmp_path))
+    handler.current_trace["start_time"] = "2024-01-01 00:00:00"
+
+    async def save():
+        handler.force_save()
+        return os.listdir(tmp_path)
+
+    assert len(asyncio.run(save())) == 1
+
+
+def stream_tokens(handler, run_id, tokens):
+    handler.on_llm_start({}, ["prompt"], run_id=run_id)
+    for token in tokens:
+        handler.on_llm_new_token(token, run_id=run_id, chunk=None)
+
+
+def test_streamed_tokens_aggregated_per_run():
+    handler = LangchainTracer(capture_token_events=False, max_streamed_text=10)
+    handler.reset_trace()
+    stream_tokens(handler, "run-a", ["Hello", " wor", "ld", "!"])
+    stream_tokens(handler, "run-b", ["x"])
+    handler.on_llm_error(ValueError("stopped"), run_id="run-b")
+    handler._finish_token_stream("run-a")
+
+    streams = handler.current_trace["token_streams"]
+    assert handler.current_trace["tokens"] == []
+    assert streams["run-a"]["token_count"] == 4
+    assert streams["run-a"]["text"] == "Hello worl"
+    assert streams["run-a"]["text_truncated"] is True
+    assert streams["run-a"]["time_to_first_token"] >= 0
+    latency = streams["run-a"]["inter_token_latency"]
+    assert 0 <= latency["min"] <= latency["mean"] <= latency["p95"]
+    assert streams["run-b"]["token_count"] == 1
+    assert streams["run-b"]["inter_token_latency"] is None
+
+
+def test_token_events_captured_in_debug_mode(monkeypatch):
+    monkeypatch.setenv("DEBUG", "1")
+    handler = LangchainTracer()
+    handler.reset_trace()
+    stream_tokens(handler, "run", ["a", "b"])
+    assert [event["token"] for event in handler.current_trace["tokens"]] == ["a", "b"]
@@ -3,6 +3,8 @@ import sys
 sys.path.append('/Users/ragaai_user/work/ragaai-catalyst/')
 import time
 import json
+import glob
+import shutil
 import pandas as pd
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -54,6 +56,19 @@ def create_rag_pipeline(pdf_path):
     
     return qa_chain
 
+TRACE_DIR = 'langchain_tracing_test_traces'
+
+
+def final_result_path():
+    files = glob.glob(os.path.join(TRACE_DIR, 'final_result_*.json'))
+    return files[0] if len(files) == 1 else None
+
+
+def load_final_result():
+    with open(final_result_path(), 'r') as f:
+        return json.load(f)
+
+
 def run_pipeline():
     global tracer
     tracer = Tracer(
@@ -68,7 +83,8 @@ def run_pipeline():
             "llm_model": "gpt-3.5-turbo",
             "vector_store": "faiss",
             "embed_model": "text-embedding-ada-002",
-        }
+        },
+        local_trace_dir=TRACE_DIR
     )
 
     tracer.start()
@@ -91,26 +107,22 @@ def run_pipeline():
 class TestLangchainTracing:
     @classmethod
     def setup_class(cls):
-        if os.path.exists('final_result.json'):
-            os.remove('final_result.json')
+        shutil.rmtree(TRACE_DIR, ignore_errors=True)
         run_pipeline()
     
     @classmethod
     def teardown_class(cls):
-        if os.path.exists('final_result.json'):
-            os.remove('final_result.json')
+        shutil.rmtree(TRACE_DIR, ignore_errors=True)
     
     def test_final_result(self):
-        assert os.path.exists('final_result.json'), "Final result file not created"
+        assert final_result_path() is not None, "Final result file not created"
     
     def test_final_result_content(self):
-        with open('final_result.json', 'r') as f:
-            final_result = json.load(f)
+        final_result = load_final_result()
         assert len(final_result) > 0, "Final result is empty"
     
     def test_traces_presence(self):
-        with open('final_result.json', 'r') as f:
-            final_result = json.load(f)
+        final_result = load_final_result()
         assert 'traces' in final_result[0], "traces key not found in final result"
         traces = final_result[0]['traces']
         assert len(traces) > 0, "No traces found in final result"
@@ -122,8 +134,7 @@ class TestLangchainTracing:
         "ChatOpenAI.langchain.task"
         ])
     def test_trace_parts(self, part_name):
-        with open('final_result.json', 'r') as f:
-            final_result = json.load(f)
+        final_result = load_final_result()
         traces = final_result[0]['traces']
         parts = [trace['name'] for trace in traces]
         assert part_name in parts, f"{part_name} not found in final result"
@@ -134,16 +145,14 @@ class TestLangchainTracing:
         ("ChatOpenAI.langchain.task", 2)
         ])
     def test_traces(self, part_name, attr_len):
-        with open('final_result.json', 'r') as f:
-            final_result = json.load(f)
+        final_result = load_final_result()
         traces = final_result[0]['traces']
         for trace in traces:
             if trace['name'] == part_name:
                 assert len(trace['attributes']) == attr_len, f"{part_name} has incorrect number of attributes"
 
     def test_trace_metrics(self):
-        with open('final_result.json', 'r') as f:
-            final_result = json.load(f)
+        final_result = load_final_result()
         trace_id = final_result[0]['trace_id']
         evaluation = Evaluation(
             project_name="langchain_tracing_test",
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import ragaai_catalyst
+
+FRAMEWORKS = ["litellm", "openai", "langchain_core", "llama_index.core", "google.genai", "pandas"]
+
+
+def loaded_frameworks(statement):
+    """Frameworks in sys.modules after running `statement` in a fresh interpreter"""
+    code = f"import json, sys\n{statement}\nprint(json.dumps([m for m in {FRAMEWORKS!r} if m in sys.modules]))"
+    env = dict(os.environ, LITELLM_LOCAL_MODEL_COST_MAP="True")
+    completed = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("statement", [
+    "import ragaai_catalyst",
+    "from ragaai_catalyst import init_tracing, trace_tool, trace_llm, trace_agent, trace_custom, current_span",
+    "from ragaai_catalyst import Tracer",
+])
+def test_no_frameworks_loaded_until_used(statement):
+    assert loaded_frameworks(statement) == []
+
+
+def test_public_names_resolve():
+    from ragaai_catalyst.tracers.tracer import Tracer
+    assert ragaai_catalyst.Tracer is Tracer
+    assert all(hasattr(ragaai_catalyst, name) for name in ragaai_catalyst.__all__)
+    assert set(ragaai_catalyst.__all__) <= set(dir(ragaai_catalyst))
+
+
+def test_unknown_name_raises_attribute_error():
+    with pytest.raises(AttributeError):
+        ragaai_catalyst.NoSuchThing
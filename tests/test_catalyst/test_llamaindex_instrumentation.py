@@ -0,0 +1,95 @@
+import os
+import json
+import pytest
+from unittest.mock import patch
+from llama_index.core.base.llms.types import ChatMessage
+from llama_index.core.base.response.schema import Response
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.instrumentation.events.llm import LLMChatStartEvent
+from llama_index.core.instrumentation.events.query import QueryStartEvent, QueryEndEvent
+from llama_index.core.instrumentation.events.retrieval import RetrievalEndEvent
+from llama_index.core.instrumentation.events.embedding import EmbeddingEndEvent
+from llama_index.core.schema import NodeWithScore, TextNode
+from ragaai_catalyst.tracers.llamaindex_instrumentation import LlamaIndexInstrumentationTracer
+from ragaai_catalyst.tracers.tracer import Tracer
+from ragaai_catalyst.name_resolver import name_resolver
+
+USER_DETAIL = {
+    "project_id": "project-id",
+    "trace_user_detail": {"metadata": {"log_source": "test"}, "pipeline": None},
+}
+
+
+def run_query(query="What is RAG?"):
+    dispatcher = get_dispatcher()
+    dispatcher.event(QueryStartEvent(query=query))
+    dispatcher.event(EmbeddingEndEvent(chunks=["chunk"] * 3, embeddings=[[0.1] * 1536] * 3))
+    dispatcher.event(RetrievalEndEvent(str_or_query_bundle=query,
+                                       nodes=[NodeWithScore(node=TextNode(text="context"), score=1.0)]))
+    dispatcher.event(RetrievalEndEvent(str_or_query_bundle=query, nodes=[]))
+    dispatcher.event(LLMChatStartEvent(messages=[ChatMessage(role="system", content="Be brief")],
+                                       additional_kwargs={}, model_dict={}))
+    dispatcher.event(QueryEndEvent(query=query, response=Response("answer")))
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tracer = LlamaIndexInstrumentationTracer(USER_DETAIL)
+    yield tracer
+    if tracer.is_tracing:
+        tracer.stop()
+
+
+def test_events_reduced_to_traced_fields(tracer):
+    tracer.start()
+    run_query()
+    events = {}
+    for event in tracer.json_event_handler.current_trace:
+        events.setdefault(event["event_type"], []).append(event)
+
+    assert events["EmbeddingEndEvent"][0]["chunk_count"] == 3
+    assert "embeddings" not in events["EmbeddingEndEvent"][0]
+    assert [e["text"] for e in events["RetrievalEndEvent"]] == ["context", None]
+    assert [e["node_count"] for e in events["RetrievalEndEvent"]] == [1, 0]
+    assert not hasattr(tracer.json_event_handler, "events")
+
+
+def test_stop_converts_in_memory_and_unregisters(tracer, tmp_path):
+    tracer.start()
+    run_query()
+    converted = tracer.stop()
+
+    trace = converted[0]
+    assert trace["project_id"] == "project-id"
+    assert trace["traces"][0]["payload"]["query_str"] == "What is RAG?"
+    assert trace["traces"][2]["payload"]["nodes"][0]["node"]["text"] == "context"
+    assert os.listdir(tmp_path) == []
+
+    dispatcher = get_dispatcher()
+    assert all(handler is not tracer.json_event_handler for handler in dispatcher.event_handlers)
+    assert all(handler is not tracer.span_handler for handler in dispatcher.span_handlers)
+
+
+def test_stop_writes_raw_trace_when_asked(tmp_path):
+    tracer = LlamaIndexInstrumentationTracer(USER_DETAIL, local_trace_dir=str(tmp_path))
+    tracer.start()
+    run_query()
+    trace_id = tracer.stop()[0]["trace_id"]
+
+    with open(tmp_path / f"new_llamaindex_traces_{trace_id}.json") as f:
+        assert len(json.load(f)[0]["traces"]) == 6
+
+
+def test_tracer_uploads_llamaindex_trace_from_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tracer = Tracer("project", "dataset", tracer_type="llamaindex", offline=True)
+    with patch.object(name_resolver, "project_id", return_value="project-id"), \
+            patch("ragaai_catalyst.tracers.tracer.UploadTraces") as upload:
+        tracer.start()
+        run_query()
+        tracer.stop()
+
+    assert upload.call_args.kwargs["json_file_path"] is None
+    assert upload.call_args.kwargs["traces"][0]["traces"][0]["payload"]["query_str"] == "What is RAG?"
+    assert os.listdir(tmp_path) == []
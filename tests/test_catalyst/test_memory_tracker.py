@@ -0,0 +1,77 @@
+import tracemalloc
+import pytest
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.tracers.base import BaseTracer
+from ragaai_catalyst.tracers.agentic_tracing.utils.memory_tracker import MemoryTracker
+
+@pytest.fixture
+def user_details():
+    return {
+        "project_name": "test_project",
+        "dataset_name": "test_dataset",
+        "project_id": "test_id",
+        "trace_name": "test_trace",
+        "interval_time": 1
+    }
+
+def test_off_mode_does_not_sample():
+    """Off mode never touches psutil and always reports 0"""
+    tracker = MemoryTracker()
+    with patch("ragaai_catalyst.tracers.agentic_tracing.utils.memory_tracker.psutil.Process") as mock_process:
+        sample = tracker.start("tool")
+        assert sample is None
+        assert tracker.stop(sample) == 0
+        mock_process.assert_not_called()
+
+def test_rss_mode_reuses_process_handle():
+    """RSS mode creates the psutil.Process handle once"""
+    tracker = MemoryTracker(mode="rss")
+    with patch("ragaai_catalyst.tracers.agentic_tracing.utils.memory_tracker.psutil.Process") as mock_process:
+        mock_process.return_value.memory_info.side_effect = [
+            type("mem", (), {"rss": rss})() for rss in (100, 250, 300, 200)
+        ]
+        assert tracker.stop(tracker.start("a")) == 150
+        # Negative deltas are clamped to 0
+        assert tracker.stop(tracker.start("b")) == 0
+        assert mock_process.call_count == 1
+
+def test_tracemalloc_mode_scoped_to_spans():
+    """tracemalloc only runs while a selected span is active"""
+    assert not tracemalloc.is_tracing()
+    tracker = MemoryTracker(mode="tracemalloc", span_names=["heavy"])
+
+    assert tracker.start("light") is None
+
+    sample = tracker.start("heavy")
+    assert tracemalloc.is_tracing()
+    data = [bytearray(1024) for _ in range(100)]
+    assert tracker.stop(sample) >= 100 * 1024
+    assert not tracemalloc.is_tracing()
+    del data
+
+def test_stop_is_idempotent():
+    """Stopping a sample twice returns 0 and does not release tracemalloc twice"""
+    tracker = MemoryTracker(mode="tracemalloc")
+    outer = tracker.start("outer")
+    inner = tracker.start("inner")
+    tracker.stop(inner)
+    assert tracker.stop(inner) == 0
+    assert tracemalloc.is_tracing()
+    tracker.stop(outer)
+    assert not tracemalloc.is_tracing()
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        MemoryTracker(mode="heap")
+
+def test_base_tracer_defaults_to_off(user_details):
+    tracer = BaseTracer(user_details)
+    assert tracer.memory_tracker.mode == "off"
+
+def test_base_tracer_reads_mode_from_user_details(user_details):
+    user_details["memory_tracking"] = "rss"
+    user_details["memory_tracking_spans"] = ["search"]
+    tracer = BaseTracer(user_details)
+    assert tracer.memory_tracker.mode == "rss"
+    assert tracer.memory_tracker.is_enabled_for("search")
+    assert not tracer.memory_tracker.is_enabled_for("other")
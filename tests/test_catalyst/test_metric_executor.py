@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.tracers.base import BaseTracer
+from ragaai_catalyst.tracers.agentic_tracing.data.data_structure import ToolComponent
+from ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor import DeferredMetricExecutor
+
+CALCULATE_METRICS = "ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor.calculate_metrics"
+
+
+@pytest.fixture
+def user_details():
+    return {
+        "project_name": "test_project",
+        "dataset_name": "test_dataset",
+        "project_id": "test_id",
+        "trace_name": "test_trace",
+        "interval_time": 1
+    }
+
+
+def echo_results(project_id, metric_requests):
+    return {"data": {"data": [{"score": request["score"]} for request in metric_requests]}}
+
+
+def test_submit_defers_until_flush():
+    """Requests are only sent on flush, together, and results keep their order"""
+    executor = DeferredMetricExecutor(batch_size=10)
+    results = []
+    with patch(CALCULATE_METRICS, side_effect=echo_results) as mock_calculate:
+        for score in range(3):
+            executor.submit("p1", {"score": score}, results.append)
+        mock_calculate.assert_not_called()
+
+        executor.flush()
+        assert mock_calculate.call_count == 1
+        assert results == [{"score": 0}, {"score": 1}, {"score": 2}]
+        assert len(executor) == 0
+
+
+def test_full_batch_is_sent_in_background():
+    """A full batch goes to the worker; flush waits for it and sends the rest"""
+    executor = DeferredMetricExecutor(batch_size=2)
+    results = []
+    with patch(CALCULATE_METRICS, side_effect=echo_results) as mock_calculate:
+        for score in range(5):
+            executor.submit("p1", {"score": score}, results.append)
+        executor.flush()
+        executor.shutdown()
+
+    assert [len(call.args[1]) for call in mock_calculate.call_args_list] == [2, 2, 1]
+    assert [r["score"] for r in results] == [0, 1, 2, 3, 4]
+
+
+def test_batches_are_split_per_project():
+    executor = DeferredMetricExecutor()
+    with patch(CALCULATE_METRICS, side_effect=echo_results) as mock_calculate:
+        executor.submit("p1", {"score": 1}, lambda result: None)
+        executor.submit("p2", {"score": 2}, lambda result: None)
+        executor.submit("p1", {"score": 3}, lambda result: None)
+        executor.flush()
+
+    assert {call.args[0]: len(call.args[1]) for call in mock_calculate.call_args_list} == {"p1": 2, "p2": 1}
+
+
+def test_failed_request_does_not_raise():
+    executor = DeferredMetricExecutor()
+    results = []
+    with patch(CALCULATE_METRICS, side_effect=Exception("boom")):
+        executor.submit("p1", {"score": 1}, results.append)
+        executor.flush()
+    assert results == []
+
+
+def test_span_metrics_attached_on_flush(user_details):
+    """queue_span_metrics appends formatted results to the span's metric list"""
+    tracer = BaseTracer(user_details)
+    tracer.span("llm_call").local_metrics.append({
+        "name": "Hallucination",
+        "displayName": "Hallucination",
+        "model": "gpt-4o-mini",
+        "provider": "openai",
+        "mapping": {"prompt": "question", "response": "answer"},
+    })
+    response = {"data": {"data": [{
+        "score": 0.2,
+        "reason": "grounded",
+        "metric_config": {"displayName": "Hallucination", "threshold": {"isEditable": True, "lte": 0.3}},
+    }]}}
+
+    metrics = []
+    with patch(CALCULATE_METRICS, return_value=response) as mock_calculate:
+        tracer.queue_span_metrics("llm_call", metrics)
+        tracer.queue_span_metrics("other_span", metrics)
+        assert metrics == []
+        mock_calculate.assert_not_called()
+
+        tracer.metric_executor.flush()
+
+    request = mock_calculate.call_args.args[1][0]
+    assert request["metric_name"] == "Hallucination"
+    assert request["variable_mapping"] == {"prompt": "question", "response": "answer"}
+    assert len(metrics) == 1
+    assert metrics[0]["name"] == "Hallucination"
+    assert metrics[0]["score"] == 0.2
+    assert metrics[0]["config"]["threshold"] == {"is_editable": True, "lte": 0.3}
+
+
+def test_span_metrics_reach_component_added_before_flush(user_details):
+    """A component created with the still empty metric list gets the results"""
+    tracer = BaseTracer(user_details)
+    tracer.span("tool_call").local_metrics.append({
+        "name": "Toxicity", "displayName": "Toxicity", "model": "gpt-4o-mini", "provider": "openai", "mapping": {},
+    })
+
+    metrics = []
+    tracer.queue_span_metrics("tool_call", metrics)
+    component = ToolComponent(
+        id="1", hash_id="hash", source_hash_id=None, type="tool", name="tool_call",
+        start_time="2025-01-01T00:00:01", end_time="2025-01-01T00:00:02", parent_id=None,
+        info={}, data={"input": {}, "output": None}, metrics=metrics,
+    )
+    tracer.add_component(component)
+    with patch(CALCULATE_METRICS, return_value={"data": {"data": [{"score": 0.1, "metric_config": {"threshold": {}}}]}}):
+        tracer.metric_executor.flush()
+
+    assert [(metric["name"], metric["score"]) for metric in component.metrics] == [("Toxicity", 0.1)]
@@ -0,0 +1,59 @@
+import sys
+import types
+import pytest
+from unittest.mock import patch
+from ragaai_catalyst.tracers.utils.model_prices import ModelPrices, COST_FIELDS
+from ragaai_catalyst.tracers.agentic_tracing.utils.llm_utils import calculate_llm_cost
+
+USAGE = {"prompt_tokens": 1000, "completion_tokens": 100, "total_tokens": 1100}
+
+
+@pytest.fixture
+def prices():
+    return ModelPrices()
+
+
+def test_loaded_on_first_lookup_with_cost_fields_only(prices):
+    with patch.object(ModelPrices, "_read_bundled", wraps=prices._read_bundled) as read:
+        assert prices._prices is None
+        entry = prices["gpt-4o"]
+        prices["gpt-4o-mini"]
+    assert read.call_count == 1
+    assert set(entry) == set(COST_FIELDS)
+    assert all(set(entry) == set(COST_FIELDS) for entry in prices.values())
+
+
+def test_azure_alias_indexed(prices):
+    assert prices["azure-gpt-4o"] is prices["azure/gpt-4o"]
+    cost = calculate_llm_cost(USAGE, "azure-gpt-4o", prices)
+    assert cost["total_cost"] > 0
+
+
+def test_custom_cost_does_not_change_shared_prices(prices):
+    custom = {"gpt-4o": {"input_cost_per_token": 1.0, "output_cost_per_token": 2.0}}
+    original = dict(prices["gpt-4o"])
+    assert calculate_llm_cost(USAGE, "gpt-4o", prices, custom)["total_cost"] == 1200.0
+    assert prices["gpt-4o"] == original
+    assert calculate_llm_cost(USAGE, "unknown-model", prices)["total_cost"] == 0.0
+
+
+def test_refresh_merges_litellm_prices_once(prices):
+    fake_litellm = types.ModuleType("litellm")
+    fake_litellm.model_cost = {
+        "gpt-4o": {"input_cost_per_token": 0.5, "output_cost_per_token": 1.0, "mode": "chat"},
+        "brand-new-model": {"input_cost_per_token": 0.1},
+        "image-model": {"output_cost_per_pixel": 0.1},
+    }
+    bundled_mini = prices["gpt-4o-mini"]
+    prices.request_refresh()
+    with patch.dict(sys.modules, {"litellm": fake_litellm}):
+        assert prices["gpt-4o"] == {"input_cost_per_token": 0.5, "output_cost_per_token": 1.0}
+    assert prices["brand-new-model"] == {"input_cost_per_token": 0.1, "output_cost_per_token": 0.0}
+    assert prices["gpt-4o-mini"] == bundled_mini
+    assert "image-model" not in prices
+
+
+def test_failed_refresh_keeps_bundled_prices(prices):
+    prices.request_refresh()
+    with patch.object(ModelPrices, "_read_litellm", return_value={}):
+        assert prices["gpt-4o"]["input_cost_per_token"] > 0
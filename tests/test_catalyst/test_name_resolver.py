@@ -0,0 +1,107 @@
+import os
+import stat
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from ragaai_catalyst import RagaAICatalyst
+from ragaai_catalyst.name_resolver import NameResolver
+from ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor import DeferredMetricExecutor
+
+REQUESTS = "ragaai_catalyst.name_resolver.requests"
+
+
+def listing(*names):
+    response = Mock()
+    response.json.return_value = {
+        "data": {"content": [{"name": name, "id": f"id-{name}"} for name in names]}
+    }
+    return response
+
+
+@pytest.fixture(autouse=True)
+def base_url():
+    with patch.object(RagaAICatalyst, "BASE_URL", "https://catalyst.test/api"):
+        yield
+
+
+def test_project_list_fetched_once_within_ttl():
+    resolver = NameResolver(ttl=60)
+    with patch(f"{REQUESTS}.get", return_value=listing("alpha", "beta")) as mock_get:
+        assert resolver.project_id("alpha") == "id-alpha"
+        assert resolver.project_id("beta") == "id-beta"
+    assert mock_get.call_count == 1
+    assert "/v2/llm/projects" in mock_get.call_args.args[0]
+
+
+def test_unknown_name_is_looked_up_again():
+    resolver = NameResolver(ttl=60)
+    with patch(f"{REQUESTS}.get", side_effect=[listing("alpha"), listing("alpha", "new"), listing("alpha", "new")]) as mock_get:
+        assert resolver.project_id("alpha") == "id-alpha"
+        assert resolver.project_id("new") == "id-new"
+        assert resolver.project_id("missing") is None
+    assert mock_get.call_count == 3
+
+
+def test_expired_list_is_fetched_again():
+    resolver = NameResolver(ttl=0)
+    with patch(f"{REQUESTS}.get", return_value=listing("alpha")) as mock_get:
+        resolver.project_id("alpha")
+        resolver.project_id("alpha")
+    assert mock_get.call_count == 2
+
+
+def test_request_errors_propagate():
+    resolver = NameResolver(ttl=60)
+    with patch(f"{REQUESTS}.get", side_effect=requests.exceptions.ConnectionError("down")):
+        with pytest.raises(requests.exceptions.RequestException):
+            resolver.project_id("alpha")
+    assert resolver.cached_project_id("alpha") is None
+
+
+def test_dataset_ids_cached_per_project():
+    resolver = NameResolver(ttl=60)
+    with patch(f"{REQUESTS}.post", side_effect=[listing("ds"), listing("other")]) as mock_post:
+        assert resolver.dataset_id("p1", "ds") == "id-ds"
+        assert resolver.dataset_id("p1", "ds") == "id-ds"
+        assert resolver.dataset_id("p2", "other") == "id-other"
+    assert mock_post.call_count == 2
+    assert mock_post.call_args.kwargs["headers"]["X-Project-Id"] == "p2"
+
+
+def test_disk_cache_shared_between_processes(tmp_path):
+    cache_path = str(tmp_path / "resolver.json")
+    with patch(f"{REQUESTS}.get", return_value=listing("alpha")) as mock_get:
+        NameResolver(ttl=60, cache_path=cache_path).project_id("alpha")
+        fresh_process = NameResolver(ttl=60, cache_path=cache_path)
+        assert fresh_process.cached_project_id("alpha") == "id-alpha"
+        assert fresh_process.project_id("alpha") == "id-alpha"
+    assert mock_get.call_count == 1
+
+    with patch.object(RagaAICatalyst, "BASE_URL", "https://other.test/api"):
+        assert NameResolver(ttl=60, cache_path=cache_path).cached_project_id("alpha") is None
+
+
+def test_cache_kept_per_account(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "resolver.json")
+    monkeypatch.setenv("RAGAAI_CATALYST_ACCESS_KEY", "key-a")
+    with patch(f"{REQUESTS}.get", return_value=listing("alpha")):
+        NameResolver(ttl=60, cache_path=cache_path).project_id("alpha")
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+    assert NameResolver(ttl=60, cache_path=cache_path).cached_project_id("alpha") == "id-alpha"
+
+    monkeypatch.setenv("RAGAAI_CATALYST_ACCESS_KEY", "key-b")
+    other_account = NameResolver(ttl=60, cache_path=cache_path)
+    assert other_account.cached_project_id("alpha") is None
+    with patch(f"{REQUESTS}.get", return_value=listing("beta")) as mock_get:
+        assert other_account.project_id("alpha") is None
+    mock_get.assert_called_once()
+
+
+def test_unset_project_id_resolved_when_metrics_are_sent():
+    executor = DeferredMetricExecutor(resolve_project_id=lambda: "resolved-id")
+    response = {"data": {"data": [{"score": 1}]}}
+    with patch("ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor.calculate_metrics",
+               return_value=response) as mock_calculate:
+        executor.submit(None, {"score": 1}, lambda result: None)
+        executor.flush()
+    assert mock_calculate.call_args.args[0] == "resolved-id"
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from datetime import datetime
+from ragaai_catalyst.tracers.agentic_tracing.tracers.network_tracer import NetworkTracer
+
+def _record(tracer, url, **kwargs):
+    now = datetime.now().astimezone()
+    tracer.record_call(method="GET", url=url, start_time=now, end_time=now, **kwargs)
+
+def test_calls_go_to_component_collector():
+    tracer = NetworkTracer()
+    _record(tracer, "http://outside")
+    tracer.start_collecting("agent")
+    _record(tracer, "http://agent")
+    tracer.start_collecting("tool")
+    _record(tracer, "http://tool")
+    assert [c["url"] for c in tracer.stop_collecting("tool")] == ["http://tool"]
+    _record(tracer, "http://agent-again")
+    assert [c["url"] for c in tracer.stop_collecting("agent")] == ["http://agent", "http://agent-again"]
+    assert tracer.stop_collecting("agent") == []
+    # The call made outside of any component was not kept
+    assert not hasattr(tracer, "network_calls")
+
+def test_parallel_threads_do_not_share_calls():
+    tracer = NetworkTracer()
+
+    def tool(name):
+        tracer.start_collecting(name)
+        for _ in range(50):
+            _record(tracer, f"http://{name}")
+        results[name] = tracer.stop_collecting(name)
+
+    results = {}
+    threads = [threading.Thread(target=tool, args=(f"tool{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for name, calls in results.items():
+        assert len(calls) == 50
+        assert {c["url"] for c in calls} == {f"http://{name}"}
+
+def test_parallel_tasks_do_not_share_calls():
+    tracer = NetworkTracer()
+
+    async def tool(name):
+        tracer.start_collecting(name)
+        _record(tracer, f"http://{name}")
+        await asyncio.sleep(0)
+        _record(tracer, f"http://{name}")
+        return tracer.stop_collecting(name)
+
+    async def main():
+        return await asyncio.gather(tool("a"), tool("b"))
+
+    calls_a, calls_b = asyncio.run(main())
+    assert [c["url"] for c in calls_a] == ["http://a", "http://a"]
+    assert [c["url"] for c in calls_b] == ["http://b", "http://b"]
+
+def test_byte_counts_use_content_length_and_body_length():
+    tracer = NetworkTracer()
+    tracer.start_collecting("llm")
+    _record(
+        tracer,
+        "https://api",
+        request_headers={"Content-Length": "1000"},
+        request_body={"not": "stringified"},
+        response_headers={},
+        response_body=b"12345",
+    )
+    call = tracer.stop_collecting("llm")[0]
+    assert call["bytes_sent"] == len("Content-Length") + len("1000") + 4 + 1000
+    assert call["bytes_received"] == 5
+
+def test_metadata_only_drops_bodies():
+    tracer = NetworkTracer(capture_bodies=False)
+    tracer.start_collecting("llm")
+    _record(tracer, "https://api", request_body="abc", response_body="defg")
+    call = tracer.stop_collecting("llm")[0]
+    assert call["request"]["body"] is None
+    assert call["response"]["body"] is None
+    assert call["bytes_sent"] == 3
+    assert call["bytes_received"] == 4
@@ -0,0 +1,152 @@
+import sys
+import types
+import asyncio
+import pytest
+from ragaai_catalyst.tracers.agentic_tracing.tracers.llm_tracer import LLMTracerMixin
+from ragaai_catalyst.tracers.agentic_tracing.utils.patch_registry import PatchRegistry, llm_patches
+
+
+class Client:
+    def create(self, prompt):
+        return f"created {prompt}"
+
+    async def acreate(self, prompt):
+        return f"acreated {prompt}"
+
+
+class SubClient(Client):
+    pass
+
+
+class FakeTracer(LLMTracerMixin):
+    """Only the parts of the LLM tracer that patched methods call into"""
+
+    def __init__(self):
+        self._llm_patched = False
+        self._import_hooks = set()
+        self.calls = []
+
+    def trace_llm_call_sync(self, original_func, *args, **kwargs):
+        self.calls.append(original_func.__name__)
+        return original_func(*args, **kwargs)
+
+    async def trace_llm_call(self, original_func, *args, **kwargs):
+        self.calls.append(original_func.__name__)
+        return await original_func(*args, **kwargs)
+
+
+@pytest.fixture
+def tracers():
+    created = [FakeTracer(), FakeTracer()]
+    yield created
+    for tracer in created:
+        tracer.unpatch_llm_calls()
+    assert len(llm_patches) == 0
+
+
+def test_patching_twice_does_not_stack(tracers):
+    first, second = tracers
+    first.wrap_method(Client, "create")
+    wrapper = Client.__dict__["create"]
+    first.wrap_method(Client, "create")
+    second.wrap_method(Client, "create")
+
+    assert Client.__dict__["create"] is wrapper
+    assert first.find_double_wrapped_methods() == []
+    assert Client().create("x") == "created x"
+    # The latest tracer holding the patch traces the call, once
+    assert (first.calls, second.calls) == ([], ["create"])
+
+
+def test_unpatch_restores_exactly(tracers):
+    first, second = tracers
+    original = Client.__dict__["create"]
+    first.wrap_method(Client, "create")
+    second.wrap_method(Client, "create")
+
+    second.unpatch_llm_calls()
+    Client().create("x")
+    assert first.calls == ["create"]
+    assert Client.__dict__["create"] is not original
+
+    first.unpatch_llm_calls()
+    assert Client.__dict__["create"] is original
+
+
+def test_inherited_method_wraps_the_original(tracers):
+    tracer = tracers[0]
+    tracer.wrap_method(Client, "create")
+    tracer.wrap_method(SubClient, "create")
+
+    assert tracer.find_double_wrapped_methods() == []
+    SubClient().create("x")
+    assert tracer.calls == ["create"]
+
+    tracer.unpatch_llm_calls()
+    # Inherited before patching, so inherited again afterwards
+    assert "create" not in SubClient.__dict__
+    assert SubClient.create is Client.create
+
+
+def test_async_methods_and_instances(tracers):
+    tracer = tracers[0]
+    client = Client()
+    tracer.wrap_method(client, "acreate")
+
+    assert asyncio.run(client.acreate("x")) == "acreated x"
+    assert tracer.calls == ["acreate"]
+
+    tracer.unpatch_llm_calls()
+    assert "acreate" not in vars(client)
+
+
+def test_released_wrapper_replaced_by_someone_else_calls_through():
+    registry = PatchRegistry()
+    holder = object()
+    calls = []
+
+    def make_wrapper(original, patch):
+        def wrapper(self, prompt):
+            if patch.holder is not None:
+                calls.append(prompt)
+            return original(self, prompt)
+        wrapper.__wrapped__ = original
+        return wrapper
+
+    original = Client.__dict__["create"]
+    registry.patch(holder, Client, "create", make_wrapper)
+    ours = Client.create
+    try:
+        Client.create = lambda self, prompt: ours(self, prompt)
+        registry.release(holder)
+
+        assert Client().create("x") == "created x"
+        assert calls == []
+        assert len(registry) == 0
+    finally:
+        Client.create = original
+
+
+def test_anthropic_patched_per_client_class(tracers, monkeypatch):
+    class Messages(Client):
+        pass
+
+    class AsyncMessages:
+        async def create(self, prompt):
+            return f"acreated {prompt}"
+
+    resources = types.ModuleType("anthropic.resources")
+    resources.Messages, resources.AsyncMessages = Messages, AsyncMessages
+    anthropic = types.ModuleType("anthropic")
+    anthropic.resources = resources
+    anthropic.Anthropic = type("Anthropic", (), {})
+    anthropic.AsyncAnthropic = type("AsyncAnthropic", (), {})
+    monkeypatch.setitem(sys.modules, "anthropic", anthropic)
+    monkeypatch.setitem(sys.modules, "anthropic.resources", resources)
+
+    tracer = tracers[0]
+    tracer.patch_anthropic_methods(anthropic)
+
+    assert Messages().create("x") == "created x"
+    assert asyncio.run(AsyncMessages().create("y")) == "acreated y"
+    assert tracer.calls == ["create", "create"]
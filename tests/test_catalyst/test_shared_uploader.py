@@ -0,0 +1,170 @@
+import os
+import json
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from ragaai_catalyst.tracers.agentic_tracing.upload import trace_uploader
+
+pytestmark = pytest.mark.skipif(trace_uploader.fcntl is None, reason="the shared uploader needs fcntl")
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    monkeypatch.setenv(trace_uploader.SHARED_UPLOADER_ENV, "1")
+    monkeypatch.setenv(trace_uploader.UPLOADER_DIR_ENV, str(tmp_path / "spool"))
+    monkeypatch.setattr(trace_uploader, "_sidecar_started_at", None)
+    monkeypatch.setattr(trace_uploader, "_code_uploaded", set())
+    monkeypatch.setattr(trace_uploader, "_code_uploading", {})
+    monkeypatch.setattr(trace_uploader.subprocess, "Popen", Mock())
+    return tmp_path
+
+
+def submit(tmp_path, n, hash_id="code_hash"):
+    trace_file = tmp_path / f"trace_{n}.json"
+    trace_file.write_text("{}")
+    return trace_uploader.submit_upload_task(
+        filepath=str(trace_file), hash_id=hash_id, zip_path=str(tmp_path / "code.zip"),
+        project_name="project", project_id="project-id", dataset_name="dataset",
+        user_details={"trace_user_detail": {"metadata": {}}}, base_url="https://catalyst.test/api",
+    )
+
+
+def spooled_task(tmp_path, n):
+    task_id = submit(tmp_path, n)
+    with open(tmp_path / "spool" / "pending" / f"{task_id}.json") as f:
+        return json.load(f)
+
+
+def test_submit_spools_task_for_shared_uploader(spool):
+    with patch.object(trace_uploader, "get_executor") as get_executor:
+        task_id = submit(spool, 0)
+
+    get_executor.assert_not_called()
+    # No shared uploader was running, so one is started for the task
+    trace_uploader.subprocess.Popen.assert_called_once()
+    with open(spool / "spool" / "pending" / f"{task_id}.json") as f:
+        task = json.load(f)
+    assert task["task_id"] == task_id and task["dataset_name"] == "dataset"
+    assert trace_uploader.get_task_status(task_id)["status"] == trace_uploader.STATUS_PENDING
+
+
+def test_daemon_uploads_spooled_tasks_and_code_once(spool):
+    (spool / "code.zip").write_text("zip")
+    task_ids = [submit(spool, n) for n in range(5)]
+
+    with patch.object(trace_uploader, "create_dataset_schema_with_trace"), \
+            patch.object(trace_uploader, "upload_trace_metric"), \
+            patch.object(trace_uploader, "UploadAgenticTraces") as upload_traces, \
+            patch.object(trace_uploader, "upload_code") as upload_code:
+        trace_uploader.run_daemon(poll_interval=0.01, idle_timeout=0.05)
+
+    assert upload_traces.call_count == 5
+    upload_code.assert_called_once()
+    assert os.listdir(spool / "spool" / "pending") == []
+    assert os.listdir(spool / "spool" / "processing") == []
+    for task_id in task_ids:
+        assert trace_uploader.get_task_status(task_id)["status"] == trace_uploader.STATUS_COMPLETED
+
+
+def test_code_upload_retried_after_failure(spool):
+    key = ("url", "project", "dataset", "hash")
+    assert trace_uploader._claim_code_upload(key)
+    waiter = ThreadPoolExecutor(max_workers=1).submit(trace_uploader._claim_code_upload, key)
+    assert not waiter.done()
+    # The waiting task takes the upload over once the first one failed
+    trace_uploader._finish_code_upload(key, uploaded=False)
+    assert waiter.result(timeout=5)
+    trace_uploader._finish_code_upload(key, uploaded=True)
+    assert not trace_uploader._claim_code_upload(key)
+
+
+def test_concurrent_tasks_upload_code_after_failed_upload(spool):
+    (spool / "code.zip").write_text("zip")
+    second_waiting = threading.Event()
+
+    def upload_code(**kwargs):
+        if upload.call_count == 1:
+            # Fail only once the other task is waiting for this upload
+            second_waiting.wait(timeout=5)
+            raise ConnectionError("upload failed")
+        return "uploaded"
+
+    claim_code_upload = trace_uploader._claim_code_upload
+
+    def claim(key):
+        if trace_uploader._code_uploading.get(key) is not None:
+            second_waiting.set()
+        return claim_code_upload(key)
+
+    with patch.object(trace_uploader, "create_dataset_schema_with_trace"), \
+            patch.object(trace_uploader, "upload_trace_metric"), \
+            patch.object(trace_uploader, "UploadAgenticTraces"), \
+            patch.object(trace_uploader, "_claim_code_upload", side_effect=claim), \
+            patch.object(trace_uploader, "upload_code", side_effect=upload_code) as upload:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            tasks = [pool.submit(trace_uploader.process_upload, **task) for task in (spooled_task(spool, 0), spooled_task(spool, 1))]
+            for task in tasks:
+                task.result(timeout=10)
+
+    assert upload.call_count == 2
+    assert trace_uploader._claim_code_upload(("https://catalyst.test/api", "project", "dataset", "code_hash")) is False
+
+
+def test_only_one_shared_uploader_runs(spool):
+    spool_dir, pending, processing = trace_uploader._spool_dirs()
+    lock_file = trace_uploader._try_daemon_lock(spool_dir)
+    try:
+        with patch.object(trace_uploader, "_claim_spooled_tasks") as claim, \
+                patch.object(trace_uploader.subprocess, "Popen") as popen:
+            trace_uploader.run_daemon(poll_interval=0.01, idle_timeout=0.01)
+            trace_uploader.ensure_uploader_running()
+        claim.assert_not_called()
+        popen.assert_not_called()
+    finally:
+        lock_file.close()
+
+    with patch.object(trace_uploader.subprocess, "Popen") as popen:
+        trace_uploader.ensure_uploader_running()
+        trace_uploader.ensure_uploader_running()
+    popen.assert_called_once()
+    assert popen.call_args.args[0][-1] == "--daemon"
+
+
+def test_daemon_requeues_unfinished_tasks(spool):
+    task_id = submit(spool, 0)
+    _, pending, processing = trace_uploader._spool_dirs()
+    os.replace(os.path.join(pending, f"{task_id}.json"), os.path.join(processing, f"{task_id}.json"))
+
+    with patch.object(trace_uploader, "process_upload") as process_upload:
+        trace_uploader.run_daemon(poll_interval=0.01, idle_timeout=0.05)
+    assert process_upload.call_args.kwargs["task_id"] == task_id
+
+
+def test_daemon_takes_tasks_spooled_while_exiting(spool):
+    serve_spool = trace_uploader._serve_spool
+    task_ids = []
+
+    def exit_as_task_arrives(*args):
+        if not task_ids:
+            # The uploader still holds the lock, so the worker starts no other one
+            task_ids.append(submit(spool, 0))
+            return
+        serve_spool(*args)
+
+    with patch.object(trace_uploader, "_serve_spool", side_effect=exit_as_task_arrives), \
+            patch.object(trace_uploader, "process_upload") as process_upload:
+        trace_uploader.run_daemon(poll_interval=0.01, idle_timeout=0.05)
+
+    trace_uploader.subprocess.Popen.assert_not_called()
+    assert process_upload.call_args.kwargs["task_id"] == task_ids[0]
+
+
+def test_rate_limiter_spaces_out_uploads():
+    limiter = trace_uploader._RateLimiter(per_minute=60)
+    with patch.object(trace_uploader.time, "sleep") as sleep, \
+            patch.object(trace_uploader.time, "monotonic", return_value=100.0):
+        for _ in range(3):
+            limiter.acquire()
+    assert [call.args[0] for call in sleep.call_args_list] == [1.0, 2.0]
+    assert trace_uploader._RateLimiter(per_minute=0).interval == 0.0
@@ -0,0 +1,87 @@
+import re
+import asyncio
+import logging
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.utils import llm_utils
+from ragaai_catalyst.tracers.agentic_tracing.utils.llm_utils import (
+    IncrementalTokenCounter,
+    TokenCountingStream,
+    get_encoding_for_model,
+    num_tokens_from_messages,
+)
+
+
+class FakeEncoding:
+    """Splits like a tiktoken pre-tokenizer: words keep their leading space"""
+
+    def encode(self, text):
+        return re.findall(r" ?\S+|\s+", text)
+
+
+@pytest.fixture(autouse=True)
+def fake_encoders():
+    with patch.dict(llm_utils._encoders, {"fake-model": FakeEncoding()}, clear=True), \
+            patch.object(llm_utils, "_warned_models", set()):
+        yield
+
+
+def chat_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def test_encoder_cached_and_unknown_model_warned_once(caplog):
+    with patch.object(llm_utils.tiktoken, "encoding_for_model", side_effect=KeyError("unknown")) as lookup, \
+            patch.object(llm_utils.tiktoken, "get_encoding", return_value=FakeEncoding()):
+        with caplog.at_level(logging.WARNING):
+            first = get_encoding_for_model("my-model")
+            second = get_encoding_for_model("my-model")
+
+    assert first is second
+    assert lookup.call_count == 1
+    assert sum("my-model not found" in record.message for record in caplog.records) == 1
+
+
+def test_model_alias_warned_once(caplog):
+    llm_utils._encoders["gpt-4o-mini"] = FakeEncoding()
+    llm_utils._encoders["gpt-4o-mini-2024-07-18"] = FakeEncoding()
+    messages = [{"role": "user", "content": "hello there"}]
+    with caplog.at_level(logging.WARNING):
+        for _ in range(3):
+            num_tokens_from_messages("gpt-4o-mini", messages)
+    assert sum("may update over time" in record.message for record in caplog.records) == 1
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 50])
+def test_incremental_count_matches_full_encoding(size):
+    text = "The quick  brown fox\njumps over the lazy dog, twice! Then   it rests."
+    counter = IncrementalTokenCounter("fake-model")
+    for i in range(0, len(text), size):
+        counter.feed(text[i:i + size])
+    assert counter.tokens == len(FakeEncoding().encode(text))
+
+
+def test_stream_counts_tokens_as_it_is_consumed():
+    completed = []
+    chunks = [chat_chunk("Hello"), chat_chunk(" world"), chat_chunk(None), chat_chunk(" again")]
+    stream = TokenCountingStream(iter(chunks), IncrementalTokenCounter("fake-model"), completed.append)
+
+    assert completed == []
+    assert list(stream) == chunks
+    assert completed == [3]
+
+
+def test_async_stream_counts_tokens():
+    completed = []
+
+    async def chunks():
+        for text in ("one", " two", " three"):
+            yield chat_chunk(text)
+
+    async def consume():
+        stream = TokenCountingStream(chunks(), IncrementalTokenCounter("fake-model"), completed.append)
+        return [chunk async for chunk in stream]
+
+    assert len(asyncio.run(consume())) == 3
+    assert completed == [3]
@@ -0,0 +1,188 @@
+import json
+import os
+import asyncio
+import tempfile
+import threading
+import contextvars
+import time
+import pytest
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.tracers.base import BaseTracer
+from ragaai_catalyst.tracers.agentic_tracing.data.data_structure import Component
+
+BASE = "ragaai_catalyst.tracers.agentic_tracing.tracers.base"
+
+
+@pytest.fixture
+def user_details():
+    return {
+        "project_name": "test_project",
+        "dataset_name": "test_dataset",
+        "project_id": "test_id",
+        "trace_name": "test_trace",
+        "interval_time": 0.01
+    }
+
+
+def _tool(id, name):
+    return Component(**{
+        "id": id, "hash_id": f"hash_{name}", "source_hash_id": None, "type": "tool", "name": name,
+        "start_time": "2025-01-01T00:00:01", "end_time": "2025-01-01T00:00:02", "parent_id": None,
+        "info": {}, "data": {"input": {"args": [], "kwargs": {}}, "output": name},
+        "network_calls": [], "interactions": [],
+    })
+
+
+@pytest.fixture
+def traced(user_details, tmp_path):
+    code_zip = tmp_path / "code.zip"
+    code_zip.write_text("")
+    with patch(f"{BASE}.ensure_uploader_running"), \
+         patch(f"{BASE}.zip_list_of_unique_files", return_value=("code_hash", str(code_zip))) as mock_zip, \
+         patch(f"{BASE}.submit_upload_task", side_effect=lambda **kw: f"task_{kw['filepath']}") as mock_submit:
+        tracer = BaseTracer(user_details)
+        tracer.start()
+        yield tracer, mock_zip, mock_submit
+        tracer.stop()
+        for call in mock_submit.call_args_list:
+            os.remove(call.kwargs["filepath"])
+
+
+def _saved_traces(mock_submit):
+    traces = {}
+    for call in mock_submit.call_args_list:
+        with open(call.kwargs["filepath"]) as f:
+            trace = json.load(f)
+        traces[trace["trace_name"]] = trace
+    return traces
+
+
+def _span_names(trace):
+    return sorted(span["name"] for span in trace["data"][0]["spans"])
+
+
+def test_concurrent_tasks_get_separate_traces(traced):
+    tracer, mock_zip, mock_submit = traced
+
+    async def request(n):
+        with tracer.trace_context(name=f"request-{n}") as trace:
+            tracer.add_component(_tool(f"{n}-a", f"tool-{n}-a"))
+            await asyncio.sleep(0)
+            # Work in child tasks and worker threads belongs to the same trace
+            await asyncio.to_thread(tracer.add_component, _tool(f"{n}-b", f"tool-{n}-b"))
+            tracer.add_metrics(name="quality", score=n)
+        return trace
+
+    async def main():
+        return await asyncio.gather(*(request(n) for n in range(20)))
+
+    states = asyncio.run(main())
+    traces = _saved_traces(mock_submit)
+
+    assert len(traces) == 20
+    for n, state in enumerate(states):
+        trace = traces[f"request-{n}"]
+        assert trace["id"] == state.trace_id
+        assert _span_names(trace) == [f"tool-{n}-a", f"tool-{n}-b"]
+        assert [metric["score"] for metric in trace["metrics"]] == [n]
+        assert trace["metadata"]["system_info"]["id"] == f"sys_{state.trace_id}"
+        assert state.upload_task_id == f"task_{tempfile.gettempdir()}/{state.trace_id}.json"
+
+    # The source code is zipped once for all the request traces
+    assert mock_zip.call_count == 1
+    # Nothing leaked into the tracer's own trace
+    assert tracer.components == [] and tracer.trace_metrics == []
+
+
+def test_threads_use_their_own_context(traced):
+    tracer, _, mock_submit = traced
+    barrier = threading.Barrier(4)
+
+    def request(n):
+        with tracer.trace_context(name=f"thread-{n}"):
+            barrier.wait()
+            tracer.add_component(_tool(str(n), f"tool-{n}"))
+
+    threads = [threading.Thread(target=request, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    traces = _saved_traces(mock_submit)
+    assert {name: _span_names(trace) for name, trace in traces.items()} == {
+        f"thread-{n}": [f"tool-{n}"] for n in range(4)
+    }
+
+
+def test_outside_a_context_the_tracer_trace_is_used(traced):
+    tracer, _, mock_submit = traced
+    default_trace_id = tracer.trace_id
+
+    with tracer.trace_context():
+        context_trace_id = tracer.trace_id
+        contextvars.copy_context().run(tracer.add_component, _tool("inner", "inner"))
+    tracer.add_component(_tool("outer", "outer"))
+
+    assert context_trace_id != default_trace_id
+    assert tracer.trace_id == default_trace_id
+    assert [component.name for component in tracer.components] == ["outer"]
+    trace = _saved_traces(mock_submit)["test_trace"]
+    assert _span_names(trace) == ["inner"]
+
+
+def test_span_attributes_kept_per_trace(traced):
+    tracer, _, _ = traced
+    tracer.span("answer").add_tags(["shared"])
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    def request(name):
+        with tracer.trace_context(name=name):
+            tracer.span("answer").add_gt(name)
+            barrier.wait()
+            seen[name] = (tracer.span("answer").gt, tracer.span("answer").tags)
+
+    threads = [threading.Thread(target=request, args=(name,)) for name in ("A", "B")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {"A": ("A", ["shared"]), "B": ("B", ["shared"])}
+    assert tracer.span("answer").gt is None
+
+
+def test_each_trace_waits_for_its_span_metrics(traced):
+    tracer, _, mock_submit = traced
+    tracer.span("answer").local_metrics.append({
+        "name": "Correctness", "displayName": "Correctness", "mapping": {},
+    })
+    barrier = threading.Barrier(2)
+
+    def slow_results(project_id, requests):
+        # Keeps the first flush busy while the other request ends
+        time.sleep(0.2)
+        return {"data": {"data": [{"score": 1.0, "metric_config": {"threshold": {}}} for _ in requests]}}
+
+    def request(name):
+        with tracer.trace_context(name=name):
+            metrics = []
+            tracer.queue_span_metrics("answer", metrics)
+            component = _tool(name, "answer")
+            component.metrics = metrics
+            tracer.add_component(component)
+            barrier.wait()
+
+    with patch("ragaai_catalyst.tracers.agentic_tracing.utils.metric_executor.calculate_metrics",
+               side_effect=slow_results):
+        threads = [threading.Thread(target=request, args=(name,)) for name in ("A", "B")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    traces = _saved_traces(mock_submit)
+    for name in ("A", "B"):
+        spans = traces[name]["data"][0]["spans"]
+        assert [metric["name"] for metric in spans[0]["metrics"]] == ["Correctness"]
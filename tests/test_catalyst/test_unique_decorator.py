@@ -0,0 +1,41 @@
+from unittest.mock import patch
+from ragaai_catalyst.tracers.agentic_tracing.utils import unique_decorator
+from ragaai_catalyst.tracers.agentic_tracing.utils.unique_decorator import (
+    generate_unique_hash,
+    generate_unique_hash_simple,
+)
+
+def sample_function(a, b=2):
+    return a + b
+
+def other_function(a, b=2):
+    return a * b
+
+def test_source_is_read_once_per_function():
+    """inspect.getsource runs once per function, not on every call"""
+    def local_function(x):
+        return x
+
+    with patch.object(unique_decorator.inspect, "getsource", wraps=unique_decorator.inspect.getsource) as mock_getsource:
+        first = generate_unique_hash(local_function, (1,), {"k": "v"})
+        second = generate_unique_hash(local_function, (1,), {"k": "v"})
+        generate_unique_hash(local_function, (2,), {})
+        assert first == second
+        assert mock_getsource.call_count == 1
+
+def test_code_reassignment_invalidates_cache():
+    def local_function(a, b=2):
+        return a + b
+
+    before = generate_unique_hash_simple(local_function)
+    local_function.__code__ = other_function.__code__
+    assert generate_unique_hash_simple(local_function) != before
+
+def test_arguments_change_hash():
+    assert generate_unique_hash(sample_function, (1,), {}) != generate_unique_hash(sample_function, (2,), {})
+    assert generate_unique_hash(sample_function, {"a": 1, "b": 2}) == generate_unique_hash(sample_function, {"b": 2, "a": 1})
+
+def test_large_arguments_are_capped_but_distinct():
+    limit = unique_decorator.MAX_HASH_ARGS_CHARS
+    prompt = "x" * (limit * 4)
+    assert generate_unique_hash(sample_function, prompt) != generate_unique_hash(sample_function, prompt + "y")
@@ -0,0 +1,100 @@
+import builtins
+import threading
+from ragaai_catalyst.tracers.agentic_tracing.tracers.user_interaction_tracer import (
+    FilePathMatcher,
+    TracedFile,
+    UserInteractionTracer,
+)
+
+def test_interactions_are_bucketed_by_component():
+    tracer = UserInteractionTracer()
+    tracer.original_print = lambda *args, **kwargs: None
+
+    tracer.component_id.set("tool-1")
+    tracer.traced_print("hello")
+    tracer.component_id.set("tool-2")
+    tracer.traced_print("world")
+
+    assert [i["content"] for i in tracer.component_interactions["tool-1"]] == ["hello"]
+    assert [i["content"] for i in tracer.component_interactions["tool-2"]] == ["world"]
+    assert len(tracer.interactions) == 2
+
+def test_release_component_drops_bucket():
+    tracer = UserInteractionTracer()
+    tracer.original_print = lambda *args, **kwargs: None
+    tracer.component_id.set("tool-1")
+    tracer.traced_print("hello")
+
+    released = tracer.release_component("tool-1")
+    assert [i["content"] for i in released] == ["hello"]
+    assert "tool-1" not in tracer.component_interactions
+    assert tracer.release_component("tool-1") == []
+
+def test_file_writes_merge_within_component():
+    tracer = UserInteractionTracer()
+    tracer.component_id.set("tool-1")
+    tracer.trace_file_operation("write", "out.txt", content="a")
+    tracer.trace_file_operation("write", "out.txt", content="b")
+    tracer.component_id.set("tool-2")
+    tracer.trace_file_operation("write", "out.txt", content="c")
+
+    assert [i["content"] for i in tracer.component_interactions["tool-1"]] == ["ab"]
+    assert [i["content"] for i in tracer.component_interactions["tool-2"]] == ["c"]
+
+def test_file_path_matcher_filters_and_caches():
+    matcher = FilePathMatcher(include=["*.txt", "*/data/*"], exclude=["*/secret*"])
+    assert matcher("notes.txt")
+    assert matcher("/srv/data/rows.csv")
+    assert not matcher("/srv/other/rows.csv")
+    assert not matcher("/srv/data/secret.txt")
+    assert not matcher("/venv/lib/site-packages/pkg/notes.txt")
+    assert matcher._decisions["notes.txt"] is True
+
+def test_file_metadata_only_records_sizes():
+    tracer = UserInteractionTracer(file_io_metadata_only=True)
+    tracer.component_id.set("tool-1")
+    tracer.trace_file_operation("read", "in.txt", content="abc", mode="r")
+    tracer.trace_file_operation("read", "in.txt", content="de", mode="r")
+
+    [interaction] = tracer.component_interactions["tool-1"]
+    assert "content" not in interaction
+    assert interaction["size"] == 5
+    assert interaction["mode"] == "r"
+
+def test_file_content_is_capped():
+    tracer = UserInteractionTracer(file_io_max_content=4)
+    tracer.component_id.set("tool-1")
+    tracer.trace_file_operation("write", "out.txt", content="abc")
+    tracer.trace_file_operation("write", "out.txt", content="def")
+
+    [interaction] = tracer.component_interactions["tool-1"]
+    assert interaction["content"] == "abcd"
+    assert interaction["truncated"] is True
+    assert interaction["size"] == 6
+
+def test_file_tracing_is_scoped_to_context(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("hello")
+    original_open = builtins.open
+    tracer = UserInteractionTracer()
+    tracer.component_id.set("tool-1")
+
+    opened_in_thread = []
+    def open_in_thread():
+        with open(path) as f:
+            opened_in_thread.append(f)
+
+    tracer.start_file_tracing()
+    try:
+        with open(path) as f:
+            assert isinstance(f, TracedFile)
+            assert f.read() == "hello"
+        thread = threading.Thread(target=open_in_thread)
+        thread.start()
+        thread.join()
+    finally:
+        tracer.stop_file_tracing()
+
+    assert not isinstance(opened_in_thread[0], TracedFile)
+    assert builtins.open is original_open
+    assert [i["content"] for i in tracer.component_interactions["tool-1"]] == ["hello"]
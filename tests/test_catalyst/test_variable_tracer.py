@@ -0,0 +1,118 @@
+import sys
+import asyncio
+import pytest
+from ragaai_catalyst.tracers.agentic_tracing.tracers.custom_tracer import CustomTracerMixin
+from ragaai_catalyst.tracers.agentic_tracing.utils.variable_tracer import VariableRecorder
+
+
+def counting(n):
+    total = 0
+    unchanged = "same"
+    for i in range(n):
+        total += i
+    unchanged = "same"
+    return total, unchanged
+
+
+def mutating():
+    items = []
+    items.append(1)
+    items.append(2)
+    return items
+
+
+def noop():
+    pass
+
+
+def call_heavy(n):
+    for i in range(n):
+        noop()
+    return sys.gettrace()
+
+
+def recorded(func, *args, **kwargs):
+    with VariableRecorder(func.__code__, **kwargs) as recorder:
+        func(*args)
+    return recorder.traces
+
+
+def values_of(traces, name):
+    return [entry["variables"][name] for entry in traces if name in entry["variables"]]
+
+
+def test_records_only_changes():
+    traces = recorded(counting, 4)
+    assert values_of(traces, "total") == [0, 1, 3, 6]
+    assert values_of(traces, "unchanged") == ["same"]
+    assert all(entry["variables"] for entry in traces)
+
+
+def test_allow_list():
+    traces = recorded(counting, 3, variables=["total"])
+    assert {name for entry in traces for name in entry["variables"]} == {"total"}
+
+
+def test_in_place_mutation_is_a_change():
+    traces = recorded(mutating)
+    assert values_of(traces, "items") == [[], [1], [1, 2]]
+
+
+def test_event_cap():
+    traces = recorded(counting, 100, max_events=5)
+    assert len(traces) == 5
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 12), reason="sys.monitoring only observes the traced code")
+def test_trace_function_removed_once_full():
+    previous = sys.gettrace()
+    with VariableRecorder(call_heavy.__code__, max_events=2) as recorder:
+        trace_function = call_heavy(10)
+    assert len(recorder.traces) == 2
+    assert trace_function is previous
+    assert sys.gettrace() is previous
+
+
+def test_previous_trace_function_restored():
+    previous = sys.gettrace()
+    recorded(counting, 2)
+    assert sys.gettrace() is previous
+
+
+def test_async_function():
+    async def compute():
+        value = 1
+        await asyncio.sleep(0)
+        value = 2
+        return value
+
+    async def run():
+        with VariableRecorder(compute.__code__) as recorder:
+            await compute()
+        return recorder.traces
+
+    # A coverage tracer installed by the test runner takes the thread's trace
+    # function back while the coroutine is suspended, so run without it
+    previous = sys.gettrace()
+    sys.settrace(None)
+    try:
+        traces = asyncio.run(run())
+    finally:
+        sys.settrace(previous)
+    assert values_of(traces, "value") == [1, 2]
+
+
+def test_custom_tracer_variable_tracing_options():
+    tracer = CustomTracerMixin()
+    tracer.max_variable_events = 2
+
+    assert tracer._start_variable_tracing(counting, False) is None
+    assert tracer.trace_custom()(counting).metadata["trace_variables"] is False
+
+    recorder = tracer._start_variable_tracing(counting, ["total"])
+    try:
+        counting(10)
+    finally:
+        tracer._stop_variable_tracing(recorder)
+    assert recorder.variables == ("total",)
+    assert values_of(recorder.traces, "total") == [0, 1]
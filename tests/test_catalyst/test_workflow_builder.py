@@ -0,0 +1,30 @@
+from ragaai_catalyst.tracers.agentic_tracing.utils.trace_utils import (
+    format_interactions,
+    iter_span_interactions,
+)
+
+def _agent(id, children):
+    return {"id": id, "type": "agent", "name": f"agent_{id}", "start_time": str(id), "end_time": str(id),
+            "error": None, "data": {"output": None, "children": children}}
+
+def test_deeply_nested_agents_do_not_recurse():
+    span = _agent(0, [])
+    node = span
+    for depth in range(1, 3000):
+        child = _agent(depth, [])
+        node["data"]["children"].append(child)
+        node = child
+
+    interactions = list(iter_span_interactions(span))
+    assert len(interactions) == 2 * 3000
+    assert interactions[0]["interaction_type"] == "agent_call_start"
+    assert interactions[-1]["span_id"] == 0
+
+def test_custom_span_data_is_referenced_not_copied():
+    data = {"input": "x" * 1000, "output": "y"}
+    trace = {"data": [{"spans": [{"id": 1, "type": "custom", "name": "c", "start_time": "1", "end_time": "2",
+                                  "error": None, "data": data}]}]}
+    workflow = format_interactions(trace)["workflow"]
+    assert [i["interaction_type"] for i in workflow] == ["custom_call_start", "custom_call_end"]
+    assert all(i["content"] is data for i in workflow)
+    assert [i["id"] for i in workflow] == ["1", "2"]